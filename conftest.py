@@ -0,0 +1,17 @@
+import os
+
+# Variables de entorno que las lambdas leen al importarse; los tests no llaman a AWS
+# (las respuestas se simulan con botocore.stub.Stubber o servidores locales).
+for name, value in {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_ACCESS_KEY_ID': 'testing',
+    'AWS_SECRET_ACCESS_KEY': 'testing',
+    'AWS_MAX_ATTEMPTS': '1',
+    'S3_BUCKET_NAME': 'test-bucket',
+    'RESULT_TABLE': 'results',
+    'SUMMARY_TABLE': 'summaries',
+    'CONNECTIONS_TABLE': 'connections',
+    'USER_POOL_ID': 'us-east-1_test',
+    'COGNITO_APP_CLIENT_ID': 'test-client',
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,131 @@
+"""
+Mensajes de progreso enviados frente a eventos producidos por operaciones con cientos de archivos.
+
+Simula los cambios de estado de cada archivo en RESULT_TABLE (pending → processing → processed o
+error), los agrupa en lotes como el event source mapping del stream (batchSize y
+maximumBatchingWindow de serverless.yml) y los pasa por handler_function. El resumen se mantiene
+en memoria y los mensajes se cuentan en lugar de enviarse. Con un push por archivo, cada evento
+sería un mensaje.
+
+Uso: python -m lambda_actualizar_resumen.benchmark_progress [archivos] [operaciones]
+"""
+import os
+import sys
+import json
+import random
+import logging
+
+# El handler lee sus tablas al importarse
+for _name, _value in (('SUMMARY_TABLE', 'summaries'), ('RESULT_TABLE', 'results')):
+    os.environ.setdefault(_name, _value)
+
+from shared.summary_metrics import SUMMARY_METRICS  # noqa: E402
+from . import handler, progress  # noqa: E402
+
+BATCH_SIZE = 100
+BATCHING_WINDOW_SECONDS = 2.0
+
+
+def _image(user_operation: str, file_name: str, status: str, pages: int = 0) -> dict:
+    image = {'user#operation': {'S': user_operation}, 'file': {'S': file_name}, 'status': {'S': status}}
+    if status == 'processed':
+        image['data'] = {'M': {'page_count': {'N': str(pages)}}}
+    elif status == 'error':
+        image['error'] = {'S': 'No se pudo leer el archivo.'}
+    return image
+
+
+def generate_events(files: int, operations: int, error_rate: float = 0.05, seed: int = 7) -> list:
+    """
+    Registros del stream (vista NEW_AND_OLD_IMAGES) en orden de llegada, con su instante en segundos.
+    """
+    generator = random.Random(seed)
+    events = []
+    for operation in range(operations):
+        user_operation = f"user-1#op-{operation}"
+        for index in range(files):
+            file_name = f"escaneo_{index:05d}.tiff"
+            uploaded = generator.uniform(0, 30)
+            started = uploaded + generator.uniform(0, 10)
+            finished = started + generator.uniform(0.5, 5)
+            final = 'error' if generator.random() < error_rate else 'processed'
+            states = [(uploaded, 'pending'), (started, 'processing'), (finished, final)]
+            previous = None
+            for moment, status in states:
+                new = _image(user_operation, file_name, status, pages=generator.randint(1, 20))
+                change = {'Keys': {'user#operation': {'S': user_operation}, 'file': {'S': file_name}}, 'NewImage': new}
+                if previous:
+                    change['OldImage'] = previous
+                events.append((moment, {'eventName': 'MODIFY' if previous else 'INSERT', 'dynamodb': change}))
+                previous = new
+    events.sort(key=lambda event: event[0])
+    for sequence, (_, record) in enumerate(events, start=1):
+        record['dynamodb']['SequenceNumber'] = str(sequence)
+    return events
+
+
+def stream_batches(events: list, batch_size: int = BATCH_SIZE, window: float = BATCHING_WINDOW_SECONDS) -> list:
+    """
+    Agrupa los registros como el event source mapping: un lote se entrega al llenarse o al
+    cumplirse la ventana desde su primer registro.
+    """
+    batches = []
+    current = []
+    opened_at = 0.0
+    for moment, record in events:
+        if current and (len(current) >= batch_size or moment - opened_at >= window):
+            batches.append(current)
+            current = []
+        if not current:
+            opened_at = moment
+        current.append(record)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def run(files: int = 500, operations: int = 2) -> dict:
+    """
+    Retorna los eventos producidos, los lotes entregados y los mensajes y bytes enviados.
+    """
+    events = generate_events(files, operations)
+    batches = stream_batches(events)
+    summaries = {}
+    messages = []
+
+    def apply_delta(db_name, user_id, operation, changes):
+        summary = summaries.setdefault((user_id, operation), dict.fromkeys(SUMMARY_METRICS, 0))
+        for _, delta in changes:
+            for metric, value in delta.items():
+                summary[metric] += value
+        return {"status": "success", "version": 0, "data": dict(summary)}
+
+    def notify_operation(user_id, operation, message):
+        messages.append(message)
+        return {"status": "success"}
+
+    original = handler.apply_delta, progress.notify_operation
+    handler.apply_delta, progress.notify_operation = apply_delta, notify_operation
+    logging.disable(logging.INFO)
+    try:
+        for batch in batches:
+            handler.handler_function({'Records': batch}, None)
+    finally:
+        handler.apply_delta, progress.notify_operation = original
+        logging.disable(logging.NOTSET)
+
+    return {
+        'events': len(events),
+        'batches': len(batches),
+        'messages': len(messages),
+        'message_kb': sum(len(json.dumps(message)) for message in messages) / 1024,
+        'final_done': sum(summary['files_processed'] + summary['files_error'] for summary in summaries.values()),
+    }
+
+
+if __name__ == "__main__":
+    result = run(*[int(argument) for argument in sys.argv[1:3]])
+    print(f"Eventos producidos: {result['events']} (un push por archivo enviaría {result['events']} mensajes)")
+    print(f"Lotes del stream: {result['batches']}")
+    print(f"Mensajes enviados: {result['messages']} ({result['message_kb']:.1f} KB), "
+          f"{result['events'] / max(result['messages'], 1):.1f} eventos por mensaje")
@@ -0,0 +1,100 @@
+"""
+Compara el recálculo vectorizado del resumen (load_columns + aggregate) con un recorrido
+ingenuo archivo por archivo sobre los mismos resultados.
+
+Uso: python -m lambda_actualizar_resumen.benchmark_recompute [n_archivos] [repeticiones]
+"""
+import sys
+import random
+import time
+from decimal import Decimal
+from shared.summary_metrics import SUMMARY_METRICS, file_metrics
+from .recompute import DISTRIBUTION_METRICS, UNKNOWN_FORMAT, aggregate, load_columns
+
+
+def generate_items(count: int, seed: int = 7) -> list:
+    """
+    Resultados sintéticos con la forma que retorna la consulta del recálculo.
+    """
+    generator = random.Random(seed)
+    items = []
+    for i in range(count):
+        file_format = generator.choice(('xlsx', 'xls', 'docx', 'pdf'))
+        data = {'format': file_format, 'truncated': generator.random() < 0.05}
+        if file_format in ('xlsx', 'xls'):
+            data['row_count'] = Decimal(generator.randint(0, 5000))
+        elif file_format == 'pdf':
+            data['page_count'] = Decimal(generator.randint(1, 300))
+        else:
+            data['paragraph_count'] = Decimal(generator.randint(1, 2000))
+        status = 'error' if generator.random() < 0.03 else 'processed'
+        items.append({'file': f"archivo-{i}.{file_format}", 'status': status, 'data': data})
+    return items
+
+
+def naive_summary(items: list) -> dict:
+    """
+    Recorrido por archivo: aplica file_metrics y acumula totales y estadísticas por formato en dicts.
+    """
+    totals = dict.fromkeys(SUMMARY_METRICS, 0)
+    by_format = {}
+    for item in items:
+        metrics = file_metrics(item)
+        for metric in SUMMARY_METRICS:
+            totals[metric] += metrics[metric]
+        file_format = item.get('data', {}).get('format') or UNKNOWN_FORMAT
+        entry = by_format.setdefault(file_format, {'files': 0, 'values': {m: [] for m in DISTRIBUTION_METRICS}})
+        entry['files'] += 1
+        for metric in DISTRIBUTION_METRICS:
+            entry[metric] = entry.get(metric, 0) + metrics[metric]
+            if metrics['files_processed']:
+                entry['values'][metric].append(metrics[metric])
+
+    for entry in by_format.values():
+        values = entry.pop('values')
+        distribution = {
+            metric: {
+                'min': min(column),
+                'max': max(column),
+                'mean': Decimal(str(round(sum(column) / len(column), 3)))
+            }
+            for metric, column in values.items()
+            if column and max(column)
+        }
+        if any(values.values()):
+            entry['distribution'] = distribution
+    totals['stats'] = {'by_format': by_format}
+    return totals
+
+
+def vectorized_summary(items: list) -> dict:
+    return aggregate(*load_columns(items))
+
+
+def _best_of(function, items: list, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(items)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(count: int = 50000, repeat: int = 5) -> dict:
+    """
+    Ejecuta ambos recorridos y retorna el mejor tiempo de cada uno, en segundos.
+    """
+    items = generate_items(count)
+    return {
+        'files': count,
+        'naive': _best_of(naive_summary, items, repeat),
+        'vectorized': _best_of(vectorized_summary, items, repeat),
+    }
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:3]]
+    result = run(*arguments)
+    print(f"{result['files']} archivos: recorrido por archivo {result['naive']:.3f} s, "
+          f"vectorizado {result['vectorized']:.3f} s "
+          f"({result['naive'] / result['vectorized']:.1f}x)")
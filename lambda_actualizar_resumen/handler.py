@@ -0,0 +1,73 @@
+import logging
+import os
+from .progress import collect_file_states, send_progress
+from .service import apply_delta, collect_deltas
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+BD_NAME = os.environ['SUMMARY_TABLE']
+RESULT_TABLE = os.environ['RESULT_TABLE']
+
+
+def handler_function(event, context):
+    """
+    Lambda disparada por el stream de RESULT_TABLE que mantiene actualizado el resumen
+    (atributo 'data' de SUMMARY_TABLE) de cada operación aplicando deltas.
+
+    Tras actualizar cada resumen se envía un único mensaje de progreso por operación a las
+    conexiones WebSocket del usuario; la ventana de agrupación del stream define cada cuánto
+    se envía, sin importar cuántos archivos cambiaron.
+
+    Si el delta de alguna operación no se pudo aplicar se reportan sus registros en
+    'batchItemFailures' (ReportBatchItemFailures) para que Lambda reintente desde el primero de
+    ellos; las operaciones ya aplicadas omiten en el reintento los registros que ya sumaron
+    (ver apply_delta).
+    """
+    records = event.get('Records', [])
+    deltas = collect_deltas(records)
+    file_states = collect_file_states(records)
+
+    failed = []
+    failed_sequences = []
+    for (user_id, operation), changes in deltas.items():
+        result = apply_delta(BD_NAME, user_id, operation, changes)
+        if result["status"] == "error":
+            failed.append(f"{user_id}/{operation}")
+            failed_sequences.extend(sequence for sequence, _ in changes)
+        elif result["status"] == "success":
+            send_progress(user_id, operation, result["data"], file_states.get((user_id, operation), {}))
+
+    logger.info(f"Resúmenes actualizados: {len(deltas) - len(failed)}, con error: {len(failed)}")
+    if failed:
+        logger.error(f"No se pudieron actualizar los resúmenes: {', '.join(failed)}")
+    return {"batchItemFailures": [{"itemIdentifier": sequence} for sequence in failed_sequences]}
+
+
+def recompute_handler(event, context):
+    """
+    Lambda de invocación manual que recalcula desde cero el resumen de una o varias operaciones,
+    por ejemplo tras un cambio de esquema o una reparación.
+    Se espera que el evento incluya:
+      - user_id y operation, o
+      - operations: lista de {"user_id", "operation"}.
+    """
+    # Importado aquí para que el consumidor del stream no cargue NumPy
+    from .recompute import recompute_summary
+
+    operations = event.get('operations') or [
+        {'user_id': event.get('user_id'), 'operation': event.get('operation')}
+    ]
+
+    results = []
+    for entry in operations:
+        user_id = entry.get('user_id')
+        operation = entry.get('operation')
+        if not user_id or not operation:
+            results.append({"status": "error", "error": "Se requieren 'user_id' y 'operation'."})
+            continue
+        result = recompute_summary(RESULT_TABLE, BD_NAME, user_id, operation)
+        results.append(dict(result, user_id=user_id, operation=operation))
+
+    logger.info(f"Resúmenes recalculados: {sum(result['status'] == 'success' for result in results)} de {len(results)}")
+    return {"results": results}
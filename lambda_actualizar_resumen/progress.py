@@ -0,0 +1,75 @@
+import os
+import logging
+from shared.summary_metrics import split_user_operation
+from shared.websocket_notifier import notify_operation
+from .service import deserialize_image
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Máximo de errores recientes incluidos en cada mensaje de progreso
+PROGRESS_MAX_ERRORS = int(os.environ.get('PROGRESS_MAX_ERRORS', '5'))
+
+
+def collect_file_states(records: list) -> dict:
+    """
+    Último estado de cada archivo modificado en el lote, agrupado por operación.
+
+    Los estados intermedios de un mismo archivo dentro del lote se descartan.
+
+    :return: {(user_id, operation): {file: elemento actual o None si se eliminó}}.
+    """
+    states = {}
+    for record in records:
+        change = record.get('dynamodb', {})
+        keys = change.get('Keys', {})
+        summary_key = split_user_operation(keys.get('user#operation', {}).get('S', ''))
+        file_name = keys.get('file', {}).get('S')
+        if summary_key is None or not file_name:
+            continue
+        states.setdefault(summary_key, {})[file_name] = deserialize_image(change.get('NewImage'))
+    return states
+
+
+def build_progress_message(operation: str, summary: dict, files: dict) -> dict:
+    """
+    Construye el mensaje de progreso agregado de una operación.
+
+    :param operation: Nombre de la operación.
+    :param summary: Atributo 'data' del resumen ya actualizado.
+    :param files: Último estado de los archivos modificados en el lote.
+    """
+    processed = int(summary.get('files_processed', 0))
+    errors = int(summary.get('files_error', 0))
+    latest_errors = [
+        {"file": file_name, "error": item.get('error')}
+        for file_name, item in files.items()
+        if item and item.get('status') == 'error'
+    ]
+    return {
+        "type": "progress",
+        "operation": operation,
+        "done": processed + errors,
+        "total": int(summary.get('files', 0)),
+        "processed": processed,
+        "errors": errors,
+        "updated_files": len(files),
+        "latest_errors": latest_errors[-PROGRESS_MAX_ERRORS:]
+    }
+
+
+def send_progress(user_id: str, operation: str, summary: dict, files: dict):
+    """
+    Envía un único mensaje de progreso por operación a las conexiones suscritas a ella.
+
+    Nunca lanza excepciones: el resumen ya se actualizó y un fallo al notificar no debe hacer
+    que Lambda reintente el lote del stream.
+    """
+    try:
+        result = notify_operation(user_id, operation, build_progress_message(operation, summary, files))
+    except Exception as e:
+        logger.exception(f"Error inesperado al enviar el progreso de {user_id}/{operation}")
+        return {"status": "error", "error": str(e)}
+    if result["status"] == "error":
+        logger.warning(f"No se pudo enviar el progreso de {user_id}/{operation}: {result['error']}")
+    return result
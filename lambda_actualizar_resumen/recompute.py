@@ -0,0 +1,239 @@
+import time
+import logging
+from datetime import datetime, timezone
+from decimal import Decimal
+import numpy as np
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from shared.aws_clients import get_table
+from shared.dynamodb_batch import backoff_delay, batch_get_items
+from shared.summary_metrics import SUMMARY_METRICS, file_metrics
+from .service import SUMMARY_MAX_RETRIES
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Métricas por archivo de las que se calculan mínimo, máximo, promedio y agrupación por formato
+DISTRIBUTION_METRICS = ('rows', 'pages', 'paragraphs')
+UNKNOWN_FORMAT = 'unknown'
+
+# Solo se leen de cada resultado los atributos que aportan a las métricas; las filas de las hojas
+# no se proyectan: basta con 'row_count' (total de filas que guarda el procesamiento)
+_PROJECTION = '#file, #status, #data.#format, #data.#truncated, #data.#row_count, #data.#page_count, #data.#paragraph_count'
+_PROJECTION_NAMES = {
+    '#file': 'file',
+    '#status': 'status',
+    '#data': 'data',
+    '#format': 'format',
+    '#truncated': 'truncated',
+    '#row_count': 'row_count',
+    '#page_count': 'page_count',
+    '#paragraph_count': 'paragraph_count',
+}
+# Formatos de hoja de cálculo cuyos resultados antiguos no tienen 'row_count' y deben leer 'sheets'
+SHEET_FORMATS = ('xlsx', 'xls')
+
+
+def iter_results(db_name: str, user_operation: str):
+    """
+    Recorre, página por página, los resultados de la partición 'user#operation'.
+    """
+    table = get_table(db_name)
+    query_kwargs = {
+        'KeyConditionExpression': Key('user#operation').eq(user_operation),
+        'ProjectionExpression': _PROJECTION,
+        'ExpressionAttributeNames': _PROJECTION_NAMES,
+    }
+    while True:
+        response = table.query(**query_kwargs)
+        items = response.get('Items', [])
+        _fill_legacy_row_counts(db_name, user_operation, items)
+        yield from items
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def _fill_legacy_row_counts(db_name: str, user_operation: str, items: list):
+    """
+    Completa 'row_count' en las hojas de cálculo guardadas antes de que existiera, leyendo sus
+    hojas por lotes. Los resultados nuevos ya lo incluyen y no se vuelven a leer.
+    """
+    legacy = {
+        item['file']: item for item in items
+        if isinstance(item.get('data'), dict)
+        and item['data'].get('format') in SHEET_FORMATS
+        and 'row_count' not in item['data']
+    }
+    if not legacy:
+        return
+    found, _ = batch_get_items(
+        db_name,
+        [{'user#operation': user_operation, 'file': file} for file in legacy],
+        ProjectionExpression='#file, #data.#sheets',
+        ExpressionAttributeNames={'#file': 'file', '#data': 'data', '#sheets': 'sheets'}
+    )
+    for item in found:
+        legacy[item['file']]['data']['row_count'] = file_metrics(
+            {'data': item.get('data', {})}
+        )['rows']
+
+
+def load_columns(items) -> tuple:
+    """
+    Carga las métricas de cada resultado en columnas de NumPy.
+
+    Cada resultado se recorre una sola vez para extraer sus valores crudos; las métricas derivadas
+    (archivos procesados, con error, truncados) se calculan después sobre las columnas completas.
+    Equivale a aplicar file_metrics a cada resultado.
+
+    :return: (matriz int64 de n_archivos x len(SUMMARY_METRICS), arreglo con el formato de cada archivo).
+    """
+    statuses = []
+    formats = []
+    counts = []
+    for item in items:
+        data = item.get('data') if isinstance(item.get('data'), dict) else {}
+        statuses.append(item.get('status'))
+        formats.append(data.get('format') or UNKNOWN_FORMAT)
+        counts.append((
+            bool(data.get('truncated')),
+            data.get('row_count', 0),
+            data.get('page_count', 0),
+            data.get('paragraph_count', 0),
+        ))
+
+    size = len(statuses)
+    status = np.array(statuses, dtype=object)
+    counts = np.array(counts, dtype=np.int64).reshape(size, 4)
+    columns = {
+        'files': 1,
+        'files_processed': status == 'processed',
+        'files_error': status == 'error',
+        'files_truncated': counts[:, 0],
+        'rows': counts[:, 1],
+        'pages': counts[:, 2],
+        'paragraphs': counts[:, 3],
+    }
+    matrix = np.empty((size, len(SUMMARY_METRICS)), dtype=np.int64)
+    for i, metric in enumerate(SUMMARY_METRICS):
+        matrix[:, i] = columns[metric]
+    return matrix, np.array(formats, dtype=object)
+
+
+def aggregate(matrix: np.ndarray, formats: np.ndarray) -> dict:
+    """
+    Calcula el resumen con operaciones vectorizadas sobre las columnas.
+
+    Los totales tienen las mismas claves que mantiene apply_delta. En 'stats.by_format' se agregan,
+    por formato, los totales y el mínimo, máximo y promedio por archivo procesado de las métricas
+    que aplican a ese formato (por ejemplo, filas en hojas de cálculo y páginas en PDF); esos
+    valores corresponden al último recálculo y no se actualizan con los deltas del stream.
+    """
+    totals = matrix.sum(axis=0)
+    data = {metric: int(total) for metric, total in zip(SUMMARY_METRICS, totals)}
+
+    stats = {}
+    if len(matrix):
+        categories, inverse = np.unique(formats, return_inverse=True)
+        columns = [SUMMARY_METRICS.index(metric) for metric in DISTRIBUTION_METRICS]
+        values = matrix[:, columns]
+        files_per_category = np.bincount(inverse, minlength=len(categories))
+        sums = np.zeros((len(categories), len(columns)), dtype=np.int64)
+        np.add.at(sums, inverse, values)
+
+        # Distribución por formato, solo sobre los archivos procesados
+        processed = matrix[:, SUMMARY_METRICS.index('files_processed')] == 1
+        processed_inverse = inverse[processed]
+        processed_values = values[processed]
+        processed_per_category = np.bincount(processed_inverse, minlength=len(categories))
+        processed_sums = np.zeros_like(sums)
+        np.add.at(processed_sums, processed_inverse, processed_values)
+        minimums = np.full_like(sums, np.iinfo(np.int64).max)
+        np.minimum.at(minimums, processed_inverse, processed_values)
+        maximums = np.zeros_like(sums)
+        np.maximum.at(maximums, processed_inverse, processed_values)
+
+        by_format = {}
+        for i, category in enumerate(categories):
+            entry = {
+                'files': int(files_per_category[i]),
+                **{metric: int(sums[i, j]) for j, metric in enumerate(DISTRIBUTION_METRICS)}
+            }
+            if processed_per_category[i]:
+                entry['distribution'] = {
+                    metric: {
+                        'min': int(minimums[i, j]),
+                        'max': int(maximums[i, j]),
+                        'mean': Decimal(str(round(processed_sums[i, j] / processed_per_category[i], 3)))
+                    }
+                    for j, metric in enumerate(DISTRIBUTION_METRICS)
+                    if maximums[i, j]
+                }
+            by_format[str(category)] = entry
+        stats['by_format'] = by_format
+
+    stats['recomputed_at'] = datetime.now(timezone.utc).isoformat()
+    data['stats'] = stats
+    return data
+
+
+def recompute_summary(result_table: str, summary_table: str, user_id: str, operation: str,
+                      max_retries: int = SUMMARY_MAX_RETRIES) -> dict:
+    """
+    Recalcula desde cero el resumen de una operación a partir de todos sus resultados.
+
+    La versión del resumen se lee antes de recorrer los resultados y la escritura se condiciona a
+    ella: si el stream aplicó un delta durante el recálculo, este se descarta y se repite.
+
+    Retorna:
+      dict: {"status": "success", "version": <nueva versión>, "files": <archivos>},
+            {"status": "skipped"} si la operación no existe, o
+            {"status": "error", "error": <detalle>} si no se pudo escribir.
+    """
+    table = get_table(summary_table)
+    key = {'user_id': user_id, 'operation': operation}
+
+    for attempt in range(max_retries + 1):
+        item = table.get_item(
+            Key=key,
+            ProjectionExpression='#version',
+            ExpressionAttributeNames={'#version': 'version'},
+            ConsistentRead=True
+        ).get('Item')
+        if item is None:
+            logger.info(f"La operación {user_id}/{operation} no existe; no se recalcula.")
+            return {"status": "skipped"}
+
+        started = time.perf_counter()
+        matrix, formats = load_columns(iter_results(result_table, f"{user_id}#{operation}"))
+        data = aggregate(matrix, formats)
+        logger.info(f"Resumen {user_id}/{operation} recalculado: {len(matrix)} archivos en "
+                    f"{time.perf_counter() - started:.3f} s.")
+
+        version = item.get('version')
+        values = {':data': data, ':one': 1}
+        if version is None:
+            condition = 'attribute_not_exists(#version)'
+        else:
+            condition = '#version = :expected'
+            values[':expected'] = version
+
+        try:
+            table.update_item(
+                Key=key,
+                UpdateExpression='SET #data = :data ADD #version :one',
+                ConditionExpression=condition,
+                ExpressionAttributeNames={'#data': 'data', '#version': 'version'},
+                ExpressionAttributeValues=values
+            )
+            return {"status": "success", "version": (version or 0) + 1, "files": len(matrix)}
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                logger.error(f"Error al guardar el resumen {user_id}/{operation}: {e}")
+                return {"status": "error", "error": str(e)}
+            if attempt < max_retries:
+                time.sleep(backoff_delay(attempt))
+
+    logger.error(f"Conflicto de versión persistente al recalcular {user_id}/{operation}.")
+    return {"status": "error", "error": "Conflicto de versión persistente."}
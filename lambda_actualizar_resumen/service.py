@@ -0,0 +1,170 @@
+import os
+import time
+import logging
+from botocore.exceptions import ClientError
+from boto3.dynamodb.types import TypeDeserializer
+from shared.aws_clients import get_table
+from shared.dynamodb_batch import backoff_delay
+from shared.summary_metrics import SUMMARY_METRICS, file_metrics, split_user_operation
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Reintentos ante conflictos de versión al actualizar un resumen
+SUMMARY_MAX_RETRIES = int(os.environ.get('SUMMARY_MAX_RETRIES', '5'))
+# Atributo del resumen con el último número de secuencia del stream ya aplicado.
+# Basta un único valor por resumen (y no uno por shard) porque todos los registros de una operación
+# comparten la clave de partición de RESULT_TABLE ('user#operation'): DynamoDB Streams los publica
+# en orden y Lambda procesa esa clave en orden, también con parallelizationFactor > 1. Cuando un
+# shard se divide, Lambda termina el shard padre antes de leer los hijos, así que los números de
+# secuencia de una operación siguen llegando crecientes. Si RESULT_TABLE cambiara de clave de
+# partición este supuesto dejaría de cumplirse (ver test_actualizar_resumen_service.py).
+APPLIED_SEQUENCE_ATTRIBUTE = 'stream_sequence'
+SEQUENCE_WIDTH = 40
+
+deserializer = TypeDeserializer()
+
+
+def deserialize_image(image: dict):
+    """
+    Convierte una imagen del stream (DynamoDB-JSON) en un diccionario de Python; None si no hay imagen.
+    """
+    if not image:
+        return None
+    return {name: deserializer.deserialize(value) for name, value in image.items()}
+
+
+def sequence_key(sequence_number: str) -> str:
+    """
+    Número de secuencia del stream rellenado con ceros para compararlo como cadena.
+
+    Los números de secuencia son enteros decimales de longitud variable (hasta 40 dígitos),
+    demasiado grandes para un atributo numérico de DynamoDB sin perder precisión.
+    """
+    return sequence_number.zfill(SEQUENCE_WIDTH)
+
+
+def collect_deltas(records: list) -> dict:
+    """
+    Agrupa los registros del stream de RESULT_TABLE por operación, con el delta de métricas de cada uno.
+
+    Cada registro aporta (métricas de NewImage - métricas de OldImage): un INSERT suma el archivo,
+    un REMOVE lo resta y un MODIFY aplica solo la diferencia. Los deltas se conservan por registro
+    (con su SequenceNumber) para que apply_delta descarte los que ya se aplicaron en un intento previo.
+
+    :param records: Registros del evento de DynamoDB Streams (vista NEW_AND_OLD_IMAGES).
+    :return: {(user_id, operation): [(sequence_number, {métrica: delta})]} en el orden del stream,
+             sin los registros cuyo delta es cero.
+    """
+    deltas = {}
+    for record in records:
+        change = record.get('dynamodb', {})
+        user_operation = change.get('Keys', {}).get('user#operation', {}).get('S', '')
+        summary_key = split_user_operation(user_operation)
+        if summary_key is None:
+            logger.warning(f"Registro con clave inválida, se omite: {user_operation}")
+            continue
+
+        old = file_metrics(deserialize_image(change.get('OldImage')))
+        new = file_metrics(deserialize_image(change.get('NewImage')))
+        delta = {metric: new[metric] - old[metric] for metric in SUMMARY_METRICS}
+        if any(delta.values()):
+            deltas.setdefault(summary_key, []).append((change.get('SequenceNumber', ''), delta))
+
+    return deltas
+
+
+def apply_delta(db_name: str, user_id: str, operation: str, changes: list,
+                max_retries: int = SUMMARY_MAX_RETRIES) -> dict:
+    """
+    Aplica los deltas de métricas de una operación a su resumen sin recalcularlo.
+
+    Las métricas se actualizan con expresiones atómicas sobre 'data' y 'version' se incrementa
+    con ADD. La escritura está condicionada a la versión leída (concurrencia optimista): si otro
+    proceso modificó el resumen entretanto, se vuelve a leer y se reintenta con backoff.
+
+    La aplicación es idempotente: junto con el delta se guarda el último SequenceNumber aplicado
+    y solo se suman los registros posteriores a él, de modo que un lote reintentado por Lambda no
+    vuelve a sumar los registros que ya se aplicaron. Supone que los registros de una operación
+    llegan en orden de secuencia, también tras dividirse un shard (ver APPLIED_SEQUENCE_ATTRIBUTE).
+
+    :param changes: [(sequence_number, {métrica: delta})] de la operación, como los agrupa collect_deltas.
+
+    Retorna:
+      dict: {"status": "success", "version": <nueva versión>, "data": <resumen actualizado>},
+            {"status": "skipped"} si la operación no existe o los registros ya estaban aplicados, o
+            {"status": "error", "error": <detalle>} si no se pudo aplicar.
+    """
+    table = get_table(db_name)
+    key = {'user_id': user_id, 'operation': operation}
+    if not changes:
+        return {"status": "skipped"}
+
+    for attempt in range(max_retries + 1):
+        item = table.get_item(
+            Key=key,
+            ProjectionExpression='#version, #data, #sequence',
+            ExpressionAttributeNames={'#version': 'version', '#data': 'data', '#sequence': APPLIED_SEQUENCE_ATTRIBUTE},
+            ConsistentRead=True
+        ).get('Item')
+        if item is None:
+            logger.info(f"La operación {user_id}/{operation} no existe; se omite el delta.")
+            return {"status": "skipped"}
+
+        applied = item.get(APPLIED_SEQUENCE_ATTRIBUTE, '')
+        pending = [(sequence_key(sequence), delta) for sequence, delta in changes if sequence_key(sequence) > applied]
+        if not pending:
+            logger.info(f"Los registros de {user_id}/{operation} ya estaban aplicados; se omiten.")
+            return {"status": "skipped"}
+
+        delta = dict.fromkeys(SUMMARY_METRICS, 0)
+        for _, record_delta in pending:
+            for metric, value in record_delta.items():
+                delta[metric] = delta.get(metric, 0) + value
+        changed = [(metric, value) for metric, value in delta.items() if value]
+
+        names = {'#version': 'version', '#data': 'data', '#sequence': APPLIED_SEQUENCE_ATTRIBUTE}
+        values = {':one': 1, ':sequence': max(sequence for sequence, _ in pending)}
+        if 'data' not in item:
+            assignments = ['#data = :data']
+            values[':data'] = {metric: delta.get(metric, 0) for metric in SUMMARY_METRICS}
+        elif isinstance(item['data'], dict):
+            assignments = []
+            if changed:
+                values[':zero'] = 0
+            for i, (metric, value) in enumerate(changed):
+                names[f"#m{i}"] = metric
+                values[f":d{i}"] = value
+                assignments.append(f"#data.#m{i} = if_not_exists(#data.#m{i}, :zero) + :d{i}")
+        else:
+            logger.error(f"El atributo 'data' del resumen {user_id}/{operation} no es un mapa.")
+            return {"status": "error", "error": "El atributo 'data' del resumen no es un mapa."}
+        assignments.append('#sequence = :sequence')
+
+        version = item.get('version')
+        if version is None:
+            condition = 'attribute_not_exists(#version)'
+        else:
+            condition = '#version = :expected'
+            values[':expected'] = version
+
+        try:
+            response = table.update_item(
+                Key=key,
+                UpdateExpression='SET ' + ', '.join(assignments) + ' ADD #version :one',
+                ConditionExpression=condition,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+                ReturnValues='ALL_NEW'
+            )
+            attributes = response.get('Attributes', {})
+            return {"status": "success", "version": (version or 0) + 1, "data": attributes.get('data', {})}
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                logger.error(f"Error al actualizar el resumen {user_id}/{operation}: {e}")
+                return {"status": "error", "error": str(e)}
+            if attempt < max_retries:
+                time.sleep(backoff_delay(attempt))
+
+    logger.error(f"Conflicto de versión persistente en el resumen {user_id}/{operation}.")
+    return {"status": "error", "error": "Conflicto de versión persistente."}
@@ -0,0 +1,143 @@
+import pytest
+from botocore.exceptions import EndpointConnectionError
+from botocore.stub import ANY, Stubber
+from shared.aws_clients import get_resource
+from lambda_actualizar_resumen import benchmark_progress, handler, progress
+from lambda_actualizar_resumen.service import apply_delta, collect_deltas, sequence_key
+
+
+@pytest.fixture
+def dynamodb():
+    stubber = Stubber(get_resource('dynamodb').meta.client)
+    with stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def _record(sequence: str, file: str, status: str = 'processed', user_operation: str = 'user-1#op'):
+    return {
+        'eventName': 'INSERT',
+        'dynamodb': {
+            'SequenceNumber': sequence,
+            'Keys': {'user#operation': {'S': user_operation}, 'file': {'S': file}},
+            'NewImage': {
+                'user#operation': {'S': user_operation},
+                'file': {'S': file},
+                'status': {'S': status},
+            },
+        },
+    }
+
+
+def _summary(applied: str = None):
+    item = {'version': {'N': '3'}, 'data': {'M': {'files': {'N': '1'}}}}
+    if applied is not None:
+        item['stream_sequence'] = {'S': sequence_key(applied)}
+    return {'Item': item}
+
+
+def test_collect_deltas_keeps_sequence_per_record():
+    deltas = collect_deltas([_record('100', 'a.pdf'), _record('101', 'b.pdf')])
+
+    assert [sequence for sequence, _ in deltas[('user-1', 'op')]] == ['100', '101']
+
+
+def test_collect_deltas_groups_by_the_result_partition_key():
+    # El watermark único por resumen supone que una operación es una sola clave de partición del stream
+    deltas = collect_deltas([
+        _record('100', 'a.pdf'),
+        _record('101', 'a.pdf', user_operation='user-1#other'),
+        _record('102', 'b.pdf'),
+    ])
+
+    assert set(deltas) == {('user-1', 'op'), ('user-1', 'other')}
+    assert [sequence for sequence, _ in deltas[('user-1', 'op')]] == ['100', '102']
+
+
+def test_apply_delta_continues_in_the_child_shard_after_a_split(dynamodb):
+    # El shard hijo se lee cuando el padre terminó: sus secuencias superan el watermark del padre
+    changes = collect_deltas([_record('1000', 'c.pdf')])[('user-1', 'op')]
+    dynamodb.add_response('get_item', _summary(applied='999'), {
+        'TableName': 'summaries', 'Key': ANY, 'ProjectionExpression': ANY,
+        'ExpressionAttributeNames': ANY, 'ConsistentRead': True
+    })
+    dynamodb.add_response('update_item', {'Attributes': {'data': {'M': {'files': {'N': '2'}}}}}, {
+        'TableName': 'summaries',
+        'Key': {'user_id': 'user-1', 'operation': 'op'},
+        'UpdateExpression': ANY,
+        'ConditionExpression': '#version = :expected',
+        'ExpressionAttributeNames': ANY,
+        'ExpressionAttributeValues': {
+            ':one': 1, ':zero': 0, ':expected': 3, ':d0': 1, ':d1': 1,
+            ':sequence': sequence_key('1000'),
+        },
+        'ReturnValues': 'ALL_NEW',
+    })
+
+    assert apply_delta('summaries', 'user-1', 'op', changes)['status'] == 'success'
+
+
+def test_apply_delta_skips_records_already_applied(dynamodb):
+    changes = collect_deltas([_record('100', 'a.pdf'), _record('101', 'b.pdf')])[('user-1', 'op')]
+    dynamodb.add_response('get_item', _summary(applied='100'), {
+        'TableName': 'summaries', 'Key': ANY, 'ProjectionExpression': ANY,
+        'ExpressionAttributeNames': ANY, 'ConsistentRead': True
+    })
+    dynamodb.add_response('update_item', {'Attributes': {'data': {'M': {'files': {'N': '2'}}}}}, {
+        'TableName': 'summaries',
+        'Key': {'user_id': 'user-1', 'operation': 'op'},
+        'UpdateExpression': ANY,
+        'ConditionExpression': '#version = :expected',
+        'ExpressionAttributeNames': ANY,
+        'ExpressionAttributeValues': {
+            ':one': 1, ':zero': 0, ':expected': 3, ':d0': 1, ':d1': 1,
+            ':sequence': sequence_key('101'),
+        },
+        'ReturnValues': 'ALL_NEW',
+    })
+
+    result = apply_delta('summaries', 'user-1', 'op', changes)
+
+    assert result['status'] == 'success'
+    assert result['version'] == 4
+
+
+def test_apply_delta_is_noop_on_replayed_batch(dynamodb):
+    changes = collect_deltas([_record('100', 'a.pdf')])[('user-1', 'op')]
+    dynamodb.add_response('get_item', _summary(applied='100'), {
+        'TableName': 'summaries', 'Key': ANY, 'ProjectionExpression': ANY,
+        'ExpressionAttributeNames': ANY, 'ConsistentRead': True
+    })
+
+    assert apply_delta('summaries', 'user-1', 'op', changes) == {"status": "skipped"}
+
+
+def test_sequence_key_orders_numerically():
+    assert sequence_key('99') < sequence_key('100')
+
+
+def test_handler_reports_failed_records(monkeypatch):
+    monkeypatch.setattr(handler, 'apply_delta', lambda *args: {"status": "error", "error": "boom"})
+
+    response = handler.handler_function({'Records': [_record('100', 'a.pdf'), _record('101', 'b.pdf')]}, None)
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": '100'}, {"itemIdentifier": '101'}]}
+
+
+def test_send_progress_never_raises(monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise EndpointConnectionError(endpoint_url='https://example.execute-api.us-east-1.amazonaws.com')
+
+    monkeypatch.setattr(progress, 'notify_operation', unreachable)
+
+    result = progress.send_progress('user-1', 'op', {'files': 1}, {})
+
+    assert result['status'] == 'error'
+
+
+def test_progress_benchmark_coalesces_events():
+    result = benchmark_progress.run(files=50, operations=2)
+
+    assert result['events'] == 300
+    assert result['messages'] <= 2 * result['batches'] < result['events']
+    assert result['final_done'] == 100
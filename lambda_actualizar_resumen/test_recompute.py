@@ -0,0 +1,75 @@
+import pytest
+from botocore.stub import ANY, Stubber
+from shared.aws_clients import get_resource
+from shared.summary_metrics import SUMMARY_METRICS, file_metrics
+
+np = pytest.importorskip('numpy')
+
+from lambda_actualizar_resumen import benchmark_recompute, recompute  # noqa: E402
+
+
+def test_load_columns_matches_file_metrics():
+    items = benchmark_recompute.generate_items(200)
+
+    matrix, _ = recompute.load_columns(items)
+
+    expected = [[file_metrics(item)[metric] for metric in SUMMARY_METRICS] for item in items]
+    assert matrix.tolist() == expected
+
+
+def test_distribution_is_computed_per_format():
+    items = [
+        {'status': 'processed', 'data': {'format': 'xlsx', 'row_count': 10}},
+        {'status': 'processed', 'data': {'format': 'xlsx', 'row_count': 30}},
+        {'status': 'processed', 'data': {'format': 'pdf', 'page_count': 4}},
+        {'status': 'error', 'data': {'format': 'pdf'}},
+    ]
+
+    by_format = recompute.aggregate(*recompute.load_columns(items))['stats']['by_format']
+
+    assert by_format['xlsx']['distribution'] == {'rows': {'min': 10, 'max': 30, 'mean': 20}}
+    assert by_format['pdf']['distribution'] == {'pages': {'min': 4, 'max': 4, 'mean': 4}}
+    assert by_format['pdf']['files'] == 2
+
+
+def test_vectorized_summary_matches_per_item_loop():
+    items = benchmark_recompute.generate_items(1000)
+
+    vectorized = benchmark_recompute.vectorized_summary(items)
+    vectorized['stats'].pop('recomputed_at')
+
+    assert vectorized == benchmark_recompute.naive_summary(items)
+
+
+def test_benchmark_runs():
+    result = benchmark_recompute.run(count=500, repeat=1)
+
+    assert result['naive'] > 0 and result['vectorized'] > 0
+
+
+def test_query_projects_row_count_and_reads_sheets_only_for_legacy_items():
+    with Stubber(get_resource('dynamodb').meta.client) as dynamodb:
+        dynamodb.add_response('query', {'Items': [
+            {'file': {'S': 'nuevo.xlsx'}, 'data': {'M': {'format': {'S': 'xlsx'}, 'row_count': {'N': '5'}}}},
+            {'file': {'S': 'antiguo.xlsx'}, 'data': {'M': {'format': {'S': 'xlsx'}}}},
+        ]}, {
+            'TableName': 'results',
+            'KeyConditionExpression': ANY,
+            'ProjectionExpression': recompute._PROJECTION,
+            'ExpressionAttributeNames': recompute._PROJECTION_NAMES,
+        })
+        dynamodb.add_response('batch_get_item', {'Responses': {'results': [
+            {'file': {'S': 'antiguo.xlsx'}, 'data': {'M': {'sheets': {'L': [
+                {'M': {'row_count': {'N': '2'}}}, {'M': {'row_count': {'N': '3'}}}
+            ]}}}},
+        ]}}, {'RequestItems': {'results': {
+            'Keys': [{'user#operation': 'user-1#op', 'file': 'antiguo.xlsx'}],
+            'ProjectionExpression': '#file, #data.#sheets',
+            'ExpressionAttributeNames': {'#file': 'file', '#data': 'data', '#sheets': 'sheets'},
+        }}})
+
+        items = list(recompute.iter_results('results', 'user-1#op'))
+        dynamodb.assert_no_pending_responses()
+
+    assert 'sheets' not in recompute._PROJECTION_NAMES.values()
+    assert [item['data']['row_count'] for item in items] == [5, 5]
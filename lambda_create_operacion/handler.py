@@ -1,6 +1,7 @@
 import logging
-import json
+import base64
 import os
+from shared.serializer import loads
 from .response import Response
 from .service import create_operacion
 
@@ -28,8 +29,10 @@ def handler_function(event, context):
                 status_code=400,
                 message="El cuerpo de la solicitud es obligatorio."
             ).to_dict()
+        if event.get('isBase64Encoded'):
+            body = base64.b64decode(body)
         if not isinstance(body, dict):
-            body = json.loads(body)
+            body = loads(body)
         if not body:
             logger.error("No se encontró el cuerpo de la solicitud.")
             return Response(
@@ -1,4 +1,5 @@
-import json
+from shared.serializer import dumps
+from shared.compression import compress_body
 
 class Response:
     """
@@ -8,7 +9,8 @@ class Response:
     cuerpo flexible y la capacidad de fusionar headers y datos adicionales.
     """
     
-    def __init__(self, status_code: int = 200, body: dict = None, message: str = None, headers: dict = None):
+    def __init__(self, status_code: int = 200, body: dict = None, message: str = None, headers: dict = None,
+                 accept_encoding: str = None):
         self.status_code = status_code
         self.body = body if body else {}
         self.message = message
@@ -16,6 +18,8 @@ class Response:
             'Access-Control-Allow-Origin': '*',
             'Access-Control-Allow-Credentials': True
         }
+        # Header Accept-Encoding de la solicitud; si se indica, el body puede comprimirse
+        self.accept_encoding = accept_encoding
         
     def set_status(self, status_code: int):
         """
@@ -88,6 +92,10 @@ class Response:
         """
         Convierte la respuesta en un formato adecuado para ser devuelto por la API.
 
+        Los valores de DynamoDB (Decimal, sets, Binary) se serializan directamente.
+        Si el cliente acepta gzip o brotli y el body supera el tamaño mínimo, se envía
+        comprimido en base64 con 'isBase64Encoded' y 'Content-Encoding'.
+
         Returns:
             dict: La respuesta en formato JSON con atributos 'statusCode', 'headers' y 'body'.
         """
@@ -95,8 +103,20 @@ class Response:
         if self.message: 
             response_body['message'] = self.message
 
+        body = dumps(response_body)
+        compressed = compress_body(body, self.accept_encoding) if self.accept_encoding else None
+        if compressed:
+            body, encoding = compressed
+            self.merge({'Content-Encoding': encoding, 'Vary': 'Accept-Encoding'})
+            return {
+                'statusCode': self.status_code,
+                'headers': self.headers,
+                'body': body,
+                'isBase64Encoded': True
+            }
+
         return {
             'statusCode': self.status_code,
             'headers': self.headers,
-            'body': json.dumps(response_body)
+            'body': body
         }
@@ -1,6 +1,6 @@
-import boto3
 import logging
 from botocore.exceptions import ClientError
+from shared.aws_clients import get_table
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -30,8 +30,7 @@ def create_operacion(user_id: str, operation_name: str, bd_name: str) -> dict:
                  "error": <detalle_del_error>
              }
     """
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(bd_name)
+    table = get_table(bd_name)
 
     try:
         response = table.put_item(
@@ -1,6 +1,6 @@
-import boto3
 import logging
 from botocore.exceptions import ClientError
+from shared.aws_clients import get_table
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -29,8 +29,7 @@ def delete_data_file_db(db_name: str, user_operation: str, file: str) -> dict:
                 "error": <detalle_del_error>
             }
     """
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(db_name)
+    table = get_table(db_name)
 
     try:
         response = table.delete_item(
@@ -0,0 +1,73 @@
+"""
+Latencia de handler_function con la firma especulativa (las URLs se firman mientras se verifica
+la operación) frente a la verificación seguida de la firma, contra un DynamoDB local con latencia
+inyectada en GetItem.
+
+Cada solicitud usa una operación distinta para que la cache de existencia no evite la consulta.
+La firma y el hilo de la consulta comparten el GIL: la consulta solo avanza en los cambios de hilo
+(sys.getswitchinterval), así que la ganancia es menor que la latencia de GetItem.
+
+Uso: python -m lambda_generar_urls.benchmark_handler [solicitudes] [archivos] [latencia en ms]
+"""
+import os
+import sys
+import json
+import time
+import logging
+import statistics
+
+# El handler y s3_helper leen su configuración al importarse
+for _name, _value in (('SUMMARY_TABLE', 'summaries'), ('S3_BUCKET_NAME', 'benchmark-bucket')):
+    os.environ.setdefault(_name, _value)
+
+from shared.dynamodb_stand_in import LocalDynamoDB  # noqa: E402
+from . import handler  # noqa: E402
+from .benchmark_presign import generate_files  # noqa: E402
+
+_ITEM = {'Item': {'user_id': {'S': 'user-1'}, 'operation': {'S': 'op'}}}
+
+
+def _latencies(requests: int, files: list, prefix: str) -> list:
+    latencies = []
+    for index in range(requests):
+        event = {
+            'requestContext': {'authorizer': {'claims': {'sub': 'user-1'}}},
+            'body': json.dumps({'operation': f"{prefix}-{index}", 'files': files}),
+        }
+        started = time.perf_counter()
+        if handler.handler_function(event, None)['statusCode'] != 200:
+            raise RuntimeError("La solicitud del benchmark no generó las URLs.")
+        latencies.append((time.perf_counter() - started) * 1000)
+    return sorted(latencies)
+
+
+def run(requests: int = 50, files: int = 100, delay_ms: float = 10.0) -> dict:
+    """
+    Retorna la mediana y el p95 de la latencia (ms) de cada modo.
+    """
+    batch = generate_files(files)
+    original = handler.SPECULATIVE_PRESIGN
+    logging.disable(logging.INFO)
+    result = {}
+    try:
+        # En otro proceso: en el mismo, el servidor competiría por el GIL con la firma y la ocultaría
+        with LocalDynamoDB({'GetItem': _ITEM}, delay=delay_ms / 1000, shared_clients=True, separate_process=True):
+            # La primera solicitud crea los clientes, como una invocación en frío
+            _latencies(1, batch, 'warmup')
+            for name, speculative in (('sequential', False), ('speculative', True)):
+                handler.SPECULATIVE_PRESIGN = speculative
+                latencies = _latencies(requests, batch, name)
+                result[name] = {
+                    'median_ms': statistics.median(latencies),
+                    'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+                }
+    finally:
+        handler.SPECULATIVE_PRESIGN = original
+        logging.disable(logging.NOTSET)
+    return result
+
+
+if __name__ == "__main__":
+    result = run(*[cast(argument) for cast, argument in zip((int, int, float), sys.argv[1:4])])
+    for name, values in result.items():
+        print(f"{name}: mediana {values['median_ms']:.2f} ms, p95 {values['p95_ms']:.2f} ms")
@@ -0,0 +1,62 @@
+"""
+Tiempo de generate_presigned_urls para lotes de 10, 1 000 y 10 000 archivos con cada motor de
+firma: 'boto3' (una llamada a generate_presigned_url por archivo) y 'batch' (BatchPresigner).
+
+La firma es local: no se contacta a S3. Los logs INFO se desactivan durante la medición.
+
+Uso: python -m lambda_generar_urls.benchmark_presign [archivos ...]
+"""
+import os
+import sys
+import time
+import logging
+
+# s3_helper lee el bucket al importarse
+os.environ.setdefault('S3_BUCKET_NAME', 'benchmark-bucket')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+for _name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY'):
+    os.environ.setdefault(_name, 'benchmark')
+
+from . import service  # noqa: E402
+
+BATCH_SIZES = (10, 1000, 10000)
+ENGINES = ('boto3', 'batch')
+
+
+def generate_files(count: int) -> list:
+    """
+    Lote de TIFF escaneados, como los que motivan la firma por lotes.
+    """
+    return [{'name': f"escaneo_{index:05d}.tiff", 'content_type': 'image/tiff'} for index in range(count)]
+
+
+def run(sizes: tuple = BATCH_SIZES) -> dict:
+    """
+    Retorna, por tamaño de lote y motor, el tiempo total (ms) y el costo por archivo (µs).
+    """
+    original_engine = service.PRESIGN_ENGINE
+    logging.disable(logging.INFO)
+    result = {}
+    try:
+        for size in sizes:
+            files = generate_files(size)
+            result[size] = {}
+            for engine in ENGINES:
+                service.PRESIGN_ENGINE = engine
+                started = time.perf_counter()
+                urls = service.generate_presigned_urls('user-1/op', files)
+                elapsed = time.perf_counter() - started
+                if any('error' in entry for entry in urls):
+                    raise RuntimeError(f"El motor '{engine}' no firmó todos los archivos.")
+                result[size][engine] = {'ms': elapsed * 1000, 'us_per_file': elapsed * 1e6 / size}
+    finally:
+        service.PRESIGN_ENGINE = original_engine
+        logging.disable(logging.NOTSET)
+    return result
+
+
+if __name__ == "__main__":
+    result = run(tuple(int(argument) for argument in sys.argv[1:]) or BATCH_SIZES)
+    for size, engines in result.items():
+        for engine, values in engines.items():
+            print(f"{size} archivos, {engine}: {values['ms']:.1f} ms ({values['us_per_file']:.1f} µs por archivo)")
@@ -0,0 +1,184 @@
+import os
+import re
+import base64
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import BotoCoreError, ClientError
+from shared.aws_clients import get_client, get_table
+from shared.dynamodb_batch import BatchWriter, batch_get_items
+
+logger = logging.getLogger(__name__)
+
+# Índice de contenido por usuario: clave (user_id, sha256) -> clave S3 del objeto original.
+# Si no se configura, la deduplicación queda deshabilitada.
+CONTENT_INDEX_TABLE = os.environ.get('CONTENT_INDEX_TABLE')
+# Hilos usados para verificar y copiar objetos en S3 (operaciones de red).
+DEDUP_WORKERS = int(os.environ.get('DEDUP_WORKERS', '16'))
+# Tamaño máximo de un objeto reutilizable por copia: CopyObject es síncrono y debe terminar dentro
+# del límite de 29 s de API Gateway. Los contenidos más grandes reciben una URL normal.
+DEDUP_COPY_MAX_BYTES = int(os.environ.get('DEDUP_COPY_MAX_BYTES', str(256 * 1024 * 1024)))
+# Cliente propio para las copias: un solo intento y un timeout de lectura acorde al tamaño máximo
+DEDUP_COPY_READ_TIMEOUT = float(os.environ.get('DEDUP_COPY_READ_TIMEOUT', '15'))
+_COPY_CLIENT_CONFIG = {'read_timeout': DEDUP_COPY_READ_TIMEOUT, 'retries': {'max_attempts': 1, 'mode': 'standard'}}
+
+# Metadato con la clave de origen de las copias: la lambda de procesamiento reutiliza el resultado
+# del origen en lugar de volver a procesar el mismo contenido (ver lambda_procesar_archivos)
+COPY_SOURCE_METADATA = 'dedup-source'
+
+STATUS_PENDING = 'pending'
+STATUS_PRESENT = 'present'
+
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+bucket_name = os.environ['S3_BUCKET_NAME']
+
+
+def is_enabled() -> bool:
+    return bool(CONTENT_INDEX_TABLE)
+
+
+def normalize_sha256(value) -> str:
+    """
+    Normaliza un SHA-256 en hexadecimal; retorna None si no es válido.
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip().lower()
+    return value if SHA256_PATTERN.match(value) else None
+
+
+def sha256_to_base64(sha256_hex: str) -> str:
+    """
+    Convierte un SHA-256 hexadecimal al formato base64 que usa S3 en 'x-amz-checksum-sha256'.
+    """
+    return base64.b64encode(bytes.fromhex(sha256_hex)).decode('ascii')
+
+
+def _map_concurrently(function, arguments: list) -> list:
+    if not arguments:
+        return []
+    with ThreadPoolExecutor(max_workers=min(DEDUP_WORKERS, len(arguments))) as executor:
+        return list(executor.map(function, arguments))
+
+
+def _verify_object(entry: dict) -> str:
+    """
+    Confirma que el objeto del índice existe, que S3 registró el mismo SHA-256 al subirlo y que
+    es lo bastante pequeño para copiarlo (DEDUP_COPY_MAX_BYTES).
+
+    :return: El ETag del objeto verificado, o None si no puede reutilizarse.
+    """
+    try:
+        response = get_client('s3').head_object(
+            Bucket=bucket_name,
+            Key=entry['key'],
+            ChecksumMode='ENABLED'
+        )
+    except (ClientError, BotoCoreError) as e:
+        logger.warning(f"No se pudo verificar '{entry['key']}': {e}")
+        return None
+    if response.get('ChecksumSHA256') != sha256_to_base64(entry['sha256']):
+        return None
+    if response.get('ContentLength', 0) > DEDUP_COPY_MAX_BYTES:
+        logger.info(f"'{entry['key']}' supera {DEDUP_COPY_MAX_BYTES} bytes; no se reutiliza por copia.")
+        return None
+    return response.get('ETag')
+
+
+def lookup_contents(user_id: str, hashes: list) -> dict:
+    """
+    Busca en el índice, con BatchGetItem, los contenidos ya subidos por el usuario.
+
+    Todas las entradas se verifican en S3 en paralelo, también las presentes: el objeto pudo
+    sobrescribirse o eliminarse después de indexarlo. Las pendientes (URL emitida, subida no
+    confirmada) cuyo checksum coincide se marcan como presentes; las que no coinciden, las que no
+    se pudieron verificar y las que superan DEDUP_COPY_MAX_BYTES se omiten y el archivo recibe
+    una URL normal.
+
+    :param user_id: Identificador del usuario (sub).
+    :param hashes: SHA-256 normalizados a consultar.
+    :return: Diccionario {sha256: {"key": clave S3 del objeto existente, "etag": ETag verificado}}.
+    """
+    unique_hashes = list(dict.fromkeys(hashes))
+    if not is_enabled() or not unique_hashes:
+        return {}
+
+    items, _ = batch_get_items(
+        CONTENT_INDEX_TABLE,
+        [{'user_id': user_id, 'sha256': sha256} for sha256 in unique_hashes]
+    )
+
+    known = {}
+    confirmed = []
+    for entry, etag in zip(items, _map_concurrently(_verify_object, items)):
+        if etag is None:
+            if entry.get('status') == STATUS_PRESENT:
+                logger.warning(f"El objeto indexado '{entry['key']}' no puede reutilizarse; se emitirá una URL.")
+            continue
+        known[entry['sha256']] = {"key": entry['key'], "etag": etag}
+        if entry.get('status') != STATUS_PRESENT:
+            confirmed.append(entry)
+
+    if confirmed:
+        table = get_table(CONTENT_INDEX_TABLE)
+        for entry in confirmed:
+            table.update_item(
+                Key={'user_id': user_id, 'sha256': entry['sha256']},
+                UpdateExpression='SET #status = :present',
+                ExpressionAttributeNames={'#status': 'status'},
+                ExpressionAttributeValues={':present': STATUS_PRESENT}
+            )
+
+    logger.info(f"Índice de contenido: {len(known)} de {len(unique_hashes)} archivos ya presentes.")
+    return known
+
+
+def register_pending(user_id: str, entries: list):
+    """
+    Registra como pendientes los contenidos para los que se emitió una URL con checksum.
+
+    :param user_id: Identificador del usuario (sub).
+    :param entries: Lista de (sha256, clave S3).
+    """
+    if not is_enabled() or not entries:
+        return
+    with BatchWriter(CONTENT_INDEX_TABLE, key_attributes=('user_id', 'sha256')) as writer:
+        for sha256, key in entries:
+            writer.put_item(Item={
+                'user_id': user_id,
+                'sha256': sha256,
+                'key': key,
+                'status': STATUS_PENDING
+            })
+
+
+def _copy_object(copy: tuple):
+    source, destination, etag, content_type = copy
+    try:
+        get_client('s3', **_COPY_CLIENT_CONFIG).copy_object(
+            Bucket=bucket_name,
+            Key=destination,
+            CopySource={'Bucket': bucket_name, 'Key': source},
+            # Si el origen cambió después de verificarlo, S3 rechaza la copia (412)
+            CopySourceIfMatch=etag,
+            ChecksumAlgorithm='SHA256',
+            MetadataDirective='REPLACE',
+            ContentType=content_type,
+            Metadata={COPY_SOURCE_METADATA: source}
+        )
+        return None
+    except (ClientError, BotoCoreError) as e:
+        logger.warning(f"No se pudo copiar '{source}' a '{destination}': {e}")
+        return str(e)
+
+
+def copy_objects(copies: list) -> list:
+    """
+    Copia en paralelo, del lado del servidor, objetos ya presentes en el bucket.
+
+    :param copies: Lista de (clave origen, clave destino, ETag verificado del origen, tipo MIME),
+                   con origen distinto del destino. La copia guarda la clave de origen en el
+                   metadato COPY_SOURCE_METADATA.
+    :return: Lista con None por cada copia exitosa o el mensaje de error correspondiente.
+    """
+    return _map_concurrently(_copy_object, copies)
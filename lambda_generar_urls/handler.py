@@ -1,8 +1,19 @@
 import logging
-import json
+import base64
 import os
-from .service import generate_presigned_urls,verify_existence_in_bd
+from concurrent.futures import ThreadPoolExecutor
+from .service import (
+    generate_presigned_urls,
+    generate_post_policies,
+    verify_existence_in_bd,
+    complete_multipart,
+    cancel_multipart,
+    sign_multipart_parts,
+    signing_has_side_effects,
+    MULTIPART_PARTS_PER_RESPONSE,
+)
 
+from shared.serializer import loads
 from .response import Response
 
 # Configurar el logger
@@ -10,9 +21,48 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 BD_NAME = os.environ['SUMMARY_TABLE']
+# Firma especulativa: las URLs se firman mientras se verifica la operación y se descartan si no existe
+SPECULATIVE_PRESIGN = os.environ.get('SPECULATIVE_PRESIGN', 'true').lower() == 'true'
+
+# Hilos reutilizados por el contenedor para la verificación de existencia en segundo plano
+existence_executor = ThreadPoolExecutor(max_workers=4)
+
+
+def _sign_request(directory: str, files: list, post_mode: bool, content_types: list, sub_user: str) -> dict:
+    """
+    Firma las URLs (o políticas de POST) de la solicitud y retorna la respuesta correspondiente.
+    """
+    if post_mode:
+        try:
+            policies = generate_post_policies(directory=directory, content_types=content_types)
+        except ValueError as e:
+            return Response(status_code=400, message=str(e)).to_dict()
+        return Response(
+            status_code=200,
+            body=policies
+        ).to_dict()
+
+    try:
+        list_urls = generate_presigned_urls(directory=directory, files=files, user_id=sub_user)
+        logger.info("URLs prefirmadas generadas correctamente.")
+        return Response(
+            status_code=200,
+            body=list_urls
+        ).to_dict()
+    except Exception as e:
+        logger.error(f"Error al generar las URLs prefirmadas: {e}", exc_info=True)
+        return Response(
+            status_code=500,
+            message="Error al generar las URLs prefirmadas."
+        ).to_dict()
+
+
 def handler_function(event, context):
     """
     Lambda para generar URLs prefirmadas para archivos en S3.
+
+    Con "mode": "post" se retorna una política de POST por tipo MIME, válida para cualquier
+    archivo bajo el prefijo de la operación, en lugar de una URL por archivo.
     """
     try:
         logger.info("Evento recibido: %s", event)
@@ -38,8 +88,10 @@ def handler_function(event, context):
                 message="El cuerpo de la solicitud es obligatorio."
             ).to_dict()
 
+        if event.get('isBase64Encoded'):
+            body = base64.b64decode(body)
         if not isinstance(body, dict):
-            body = json.loads(body)
+            body = loads(body)
         if not body:
             logger.error("No se encontró el cuerpo de la solicitud.")
             return Response(
@@ -49,6 +101,8 @@ def handler_function(event, context):
         # Extraer parámetros del cuerpo
         operation = body.get('operation', '').strip()
         files = body.get('files', [])
+        post_mode = body.get('mode') == 'post'
+        content_types = body.get('content_types')
 
         if not operation:
             logger.error("El parámetro 'operation' es obligatorio.")
@@ -57,37 +111,124 @@ def handler_function(event, context):
                 message="El parámetro 'operation' es obligatorio."
             ).to_dict()
 
-        if not isinstance(files, list) or not files:
+        if post_mode:
+            if content_types is not None and (
+                not isinstance(content_types, list) or not all(isinstance(ct, str) for ct in content_types)
+            ):
+                logger.error("El parámetro 'content_types' debe ser una lista de tipos MIME.")
+                return Response(
+                    status_code=400,
+                    message="El parámetro 'content_types' debe ser una lista de tipos MIME."
+                ).to_dict()
+        elif not isinstance(files, list) or not files:
             logger.error("El parámetro 'files' debe ser una lista no vacía.")
             return Response(
                 status_code=400,
                 message="El parámetro 'files' debe ser una lista de archivos válida."
             ).to_dict()
 
-        verify_existence = verify_existence_in_bd(bd_name=BD_NAME,user_id=sub_user,operation=operation)
+        directory=  f"{sub_user}/{operation}"
+
+        # Si firmar no tiene efectos secundarios, se firma mientras DynamoDB responde
+        speculative = SPECULATIVE_PRESIGN and (post_mode or not signing_has_side_effects(files, sub_user))
+        signed_response = None
+        if speculative:
+            pending_existence = existence_executor.submit(
+                verify_existence_in_bd, bd_name=BD_NAME, user_id=sub_user, operation=operation
+            )
+            signed_response = _sign_request(directory, files, post_mode, content_types, sub_user)
+            verify_existence = pending_existence.result()
+        else:
+            verify_existence = verify_existence_in_bd(bd_name=BD_NAME,user_id=sub_user,operation=operation)
+
         if verify_existence["status"] == "error" or not verify_existence["exists"]:
             if verify_existence["status"] == "error":
                 return Response(status_code=500,
                                 message="Ocurrio un error en el servido").to_dict()
+            if signed_response is not None:
+                logger.info("Operación inexistente: se descartan las URLs firmadas.")
             return Response(status_code=404, message="Operacion no encontrado.").to_dict()
 
         # Generar URLs prefirmadas
-        directory=  f"{sub_user}/{operation}"
+        if signed_response is not None:
+            return signed_response
+        return _sign_request(directory, files, post_mode, content_types, sub_user)
 
-        try:
-            list_urls = generate_presigned_urls(directory=directory, files=files)
-            logger.info("URLs prefirmadas generadas correctamente.")
+    except Exception as e:
+        logger.error(f"Error inesperado: {e}", exc_info=True)
+        return Response(
+            status_code=500,
+            message="Ocurrió un error interno del servidor."
+        ).to_dict()
+
+
+def complete_multipart_handler(event, context):
+    """
+    Lambda para completar (o cancelar) una subida multipart iniciada por handler_function.
+    Se espera que el cuerpo incluya:
+      - operation: el nombre de la operación.
+      - name: el nombre del archivo.
+      - upload_id: el identificador de la subida.
+      - parts: lista de {"part_number", "etag"} de las partes subidas.
+      - abort (opcional): si es true se cancela la subida en lugar de completarla.
+    """
+    try:
+        sub_user = (
+            event.get('requestContext', {})
+            .get('authorizer', {})
+            .get('claims', {})
+            .get('sub')
+        )
+        if not sub_user:
+            logger.error("El identificador del usuario (sub) no se encontró en los claims.")
+            return Response(
+                status_code=400,
+                message="El identificador del usuario es obligatorio."
+            ).to_dict()
+
+        body = event.get('body')
+        if not body:
+            logger.error("No se encontró el cuerpo de la solicitud.")
             return Response(
-                status_code=200,
-                body=list_urls
+                status_code=400,
+                message="El cuerpo de la solicitud es obligatorio."
             ).to_dict()
-        except Exception as e:
-            logger.error(f"Error al generar las URLs prefirmadas: {e}", exc_info=True)
+        if event.get('isBase64Encoded'):
+            body = base64.b64decode(body)
+        if not isinstance(body, dict):
+            body = loads(body)
+
+        operation = (body.get('operation') or '').strip()
+        file_name = body.get('name')
+        upload_id = body.get('upload_id')
+        if not operation or not file_name or not upload_id:
+            logger.error("Faltan parámetros obligatorios para la subida multipart.")
             return Response(
-                status_code=500,
-                message="Error al generar las URLs prefirmadas."
+                status_code=400,
+                message="Los parámetros 'operation', 'name' y 'upload_id' son obligatorios."
             ).to_dict()
 
+        directory = f"{sub_user}/{operation}"
+        if body.get('abort') is True:
+            result = cancel_multipart(directory=directory, file_name=file_name, upload_id=upload_id)
+        else:
+            result = complete_multipart(
+                directory=directory,
+                file_name=file_name,
+                upload_id=upload_id,
+                parts=body.get('parts')
+            )
+
+        if result["status"] == "success":
+            return Response(status_code=200, message=result["message"]).to_dict()
+        if result["status"] == "invalid":
+            return Response(status_code=400, message=result["message"]).to_dict()
+        return Response(
+            status_code=500,
+            message=result["message"],
+            body={"error": result.get("error")}
+        ).to_dict()
+
     except Exception as e:
         logger.error(f"Error inesperado: {e}", exc_info=True)
         return Response(
@@ -96,4 +237,72 @@ def handler_function(event, context):
         ).to_dict()
 
 
+def multipart_parts_handler(event, context):
+    """
+    Lambda para firmar las URLs de las partes restantes de una subida multipart.
+
+    handler_function solo firma las primeras partes de cada archivo (ver 'next_part' en su
+    respuesta) para no superar el tamaño máximo de respuesta de Lambda.
+    Se espera que el cuerpo incluya:
+      - operation: el nombre de la operación.
+      - name: el nombre del archivo.
+      - upload_id: el identificador de la subida.
+      - first_part: la primera parte a firmar.
+      - count (opcional): cantidad de partes, como máximo MULTIPART_PARTS_PER_RESPONSE.
+    """
+    try:
+        sub_user = (
+            event.get('requestContext', {})
+            .get('authorizer', {})
+            .get('claims', {})
+            .get('sub')
+        )
+        if not sub_user:
+            logger.error("El identificador del usuario (sub) no se encontró en los claims.")
+            return Response(
+                status_code=400,
+                message="El identificador del usuario es obligatorio."
+            ).to_dict()
+
+        body = event.get('body')
+        if not body:
+            logger.error("No se encontró el cuerpo de la solicitud.")
+            return Response(
+                status_code=400,
+                message="El cuerpo de la solicitud es obligatorio."
+            ).to_dict()
+        if event.get('isBase64Encoded'):
+            body = base64.b64decode(body)
+        if not isinstance(body, dict):
+            body = loads(body)
+
+        operation = (body.get('operation') or '').strip()
+        file_name = body.get('name')
+        upload_id = body.get('upload_id')
+        if not operation or not file_name or not upload_id:
+            logger.error("Faltan parámetros obligatorios para la subida multipart.")
+            return Response(
+                status_code=400,
+                message="Los parámetros 'operation', 'name' y 'upload_id' son obligatorios."
+            ).to_dict()
+
+        result = sign_multipart_parts(
+            directory=f"{sub_user}/{operation}",
+            file_name=file_name,
+            upload_id=upload_id,
+            first_part=body.get('first_part'),
+            count=body.get('count', MULTIPART_PARTS_PER_RESPONSE)
+        )
+        if result["status"] == "invalid":
+            return Response(status_code=400, message=result["message"]).to_dict()
+        return Response(
+            status_code=200,
+            body={"parts": result["parts"], "next_part": result["next_part"]}
+        ).to_dict()
 
+    except Exception as e:
+        logger.error(f"Error inesperado: {e}", exc_info=True)
+        return Response(
+            status_code=500,
+            message="Ocurrió un error interno del servidor."
+        ).to_dict()
@@ -1,17 +1,18 @@
 import boto3
 import os
+import hmac
+import hashlib
 import logging
-from botocore.config import Config
+from datetime import datetime, timezone
+from urllib.parse import quote
+from shared.aws_clients import get_client, get_session
 
 # Configuración de logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Ajustar la configuración para S3 Transfer Acceleration
-s3_config = Config(s3={'use_accelerate_endpoint': True})
-
-# Inicialización de cliente S3 y variables de entorno
-s3_client = boto3.client('s3', config=s3_config)
+# Cliente S3 compartido del contenedor, con S3 Transfer Acceleration
+s3_client = get_client('s3', s3={'use_accelerate_endpoint': True})
 bucket_name = os.environ['S3_BUCKET_NAME']
 
 # Tipos MIME permitidos
@@ -27,13 +28,15 @@ TIPOS_PERMITIDOS = {
     'image/tiff'  # .tif, .tiff
 }
 
-def generate_presigned_url(file_name: str, content_type: str, expiration: int = 3600) -> str:
+def generate_presigned_url(file_name: str, content_type: str, expiration: int = 3600,
+                           checksum_sha256: str = None) -> str:
     """
     Genera una URL prefirmada para subir un archivo a S3 usando Transfer Acceleration.
 
     :param file_name: Nombre del archivo en S3.
     :param content_type: Tipo MIME del archivo.
     :param expiration: Tiempo de expiración en segundos (default: 3600).
+    :param checksum_sha256: SHA-256 del contenido en base64 (opcional), verificado por S3.
     :return: URL prefirmada como string.
     :raises ValueError: Si el tipo MIME no está permitido o los parámetros son inválidos.
     :raises RuntimeError: Si ocurre un error al generar la URL prefirmada.
@@ -50,16 +53,19 @@ def generate_presigned_url(file_name: str, content_type: str, expiration: int =
     try:
         # Generar URL prefirmada usando S3 Transfer Acceleration
         logger.info(f"Generando URL prefirmada (acelerada) para '{file_name}' con tipo '{content_type}'.")
+        params = {
+            'Bucket': bucket_name,
+            'Key': file_name,
+            'ContentType': content_type,
+        }
+        if checksum_sha256:
+            params['ChecksumSHA256'] = checksum_sha256
         url = s3_client.generate_presigned_url(
             'put_object',
-            Params={
-                'Bucket': bucket_name,
-                'Key': file_name,
-                'ContentType': content_type,
-            },
+            Params=params,
             ExpiresIn=expiration
         )
-        logger.info(f"URL prefirmada generada exitosamente: {url}")
+        logger.info(f"URL prefirmada generada exitosamente para '{file_name}'.")
         return url
 
     except boto3.exceptions.Boto3Error as e:
@@ -68,3 +74,255 @@ def generate_presigned_url(file_name: str, content_type: str, expiration: int =
     except Exception as e:
         logger.error(f"Error inesperado: {e}")
         raise RuntimeError("Ocurrió un error inesperado al generar la URL prefirmada.")
+
+
+def generate_presigned_part_url(file_name: str, upload_id: str, part_number: int, expiration: int = 3600) -> str:
+    """
+    Genera con boto3 una URL prefirmada de 'upload_part' para una subida multipart.
+
+    :param file_name: Nombre del archivo (clave) en S3.
+    :param upload_id: Identificador retornado por CreateMultipartUpload.
+    :param part_number: Número de la parte (1 a 10000).
+    :param expiration: Tiempo de expiración en segundos (default: 3600).
+    :return: URL prefirmada como string.
+    """
+    return s3_client.generate_presigned_url(
+        'upload_part',
+        Params={
+            'Bucket': bucket_name,
+            'Key': file_name,
+            'UploadId': upload_id,
+            'PartNumber': part_number,
+        },
+        ExpiresIn=expiration
+    )
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode('utf-8'), hashlib.sha256).digest()
+
+
+class BatchPresigner:
+    """
+    Firma URLs prefirmadas de 'put_object' y 'upload_part' (SigV4 por query string) para un lote.
+
+    Toma una única instantánea de las credenciales y deriva la clave de firma una sola vez
+    por lote, de modo que cada URL solo cuesta un SHA-256 y un HMAC. Usa el endpoint de
+    S3 Transfer Acceleration, igual que generate_presigned_url.
+    """
+
+    ALGORITHM = 'AWS4-HMAC-SHA256'
+
+    def __init__(self, bucket: str = None, region: str = None, credentials=None,
+                 expiration: int = 3600, now: datetime = None):
+        self.bucket = bucket or bucket_name
+        self.region = region or s3_client.meta.region_name
+        self.host = f"{self.bucket}.s3-accelerate.amazonaws.com"
+        if credentials is None:
+            session_credentials = get_session().get_credentials()
+            if session_credentials is None:
+                raise RuntimeError("No hay credenciales de AWS disponibles para firmar las URLs.")
+            credentials = session_credentials.get_frozen_credentials()
+        self.credentials = credentials
+        self.expiration = expiration
+
+        now = now or datetime.now(timezone.utc)
+        self.amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+        date_stamp = now.strftime('%Y%m%d')
+        self.scope = f"{date_stamp}/{self.region}/s3/aws4_request"
+
+        # Clave de firma derivada una sola vez para todo el lote
+        signing_key = _hmac(('AWS4' + self.credentials.secret_key).encode('utf-8'), date_stamp)
+        signing_key = _hmac(signing_key, self.region)
+        signing_key = _hmac(signing_key, 's3')
+        self.signing_key = _hmac(signing_key, 'aws4_request')
+
+        # Parámetros comunes a todas las URLs del lote
+        self._base_query = {
+            'X-Amz-Algorithm': self.ALGORITHM,
+            'X-Amz-Credential': f"{self.credentials.access_key}/{self.scope}",
+            'X-Amz-Date': self.amz_date,
+            'X-Amz-Expires': str(expiration),
+        }
+        if self.credentials.token:
+            self._base_query['X-Amz-Security-Token'] = self.credentials.token
+        # Query string canónica de 'put_object', precalculada para todo el lote
+        self._put_query = self._canonical_query('content-type;host')
+
+    def _canonical_query(self, signed_headers: str, extra: dict = None) -> str:
+        query = dict(self._base_query, **(extra or {}))
+        query['X-Amz-SignedHeaders'] = signed_headers
+        return '&'.join(
+            f"{quote(key, safe='-_.~')}={quote(value, safe='-_.~')}" for key, value in sorted(query.items())
+        )
+
+    def _sign(self, path: str, canonical_query: str, canonical_headers: str, signed_headers: str) -> str:
+        canonical_request = (
+            f"PUT\n{path}\n{canonical_query}\n{canonical_headers}\n"
+            f"{signed_headers}\nUNSIGNED-PAYLOAD"
+        )
+        string_to_sign = (
+            f"{self.ALGORITHM}\n{self.amz_date}\n{self.scope}\n"
+            f"{hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()}"
+        )
+        signature = hmac.new(self.signing_key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+        return f"https://{self.host}{path}?{canonical_query}&X-Amz-Signature={signature}"
+
+    def presign_put(self, file_name: str, content_type: str, checksum_sha256: str = None) -> str:
+        """
+        Genera la URL prefirmada de subida para un archivo.
+
+        :param file_name: Nombre del archivo (clave) en S3.
+        :param content_type: Tipo MIME del archivo.
+        :param checksum_sha256: SHA-256 del contenido en base64 (opcional). Si se indica, se firma el
+            header 'x-amz-checksum-sha256' y S3 rechaza la subida si el contenido no coincide.
+        :return: URL prefirmada como string.
+        :raises ValueError: Si el tipo MIME no está permitido o los parámetros son inválidos.
+        """
+        if not file_name or not isinstance(file_name, str):
+            raise ValueError("El nombre del archivo ('file_name') es obligatorio y debe ser una cadena.")
+        if content_type not in TIPOS_PERMITIDOS:
+            raise ValueError(f"Tipo MIME '{content_type}' no permitido.")
+
+        path = '/' + quote(file_name, safe='/-_.~')
+        if checksum_sha256:
+            signed_headers = 'content-type;host;x-amz-checksum-sha256'
+            return self._sign(
+                path,
+                self._canonical_query(signed_headers),
+                f"content-type:{content_type}\nhost:{self.host}\nx-amz-checksum-sha256:{checksum_sha256}\n",
+                signed_headers
+            )
+        return self._sign(
+            path,
+            self._put_query,
+            f"content-type:{content_type}\nhost:{self.host}\n",
+            'content-type;host'
+        )
+
+    def presign_upload_part(self, file_name: str, upload_id: str, part_number: int) -> str:
+        """
+        Genera la URL prefirmada de 'upload_part' para una parte de una subida multipart.
+
+        :param file_name: Nombre del archivo (clave) en S3.
+        :param upload_id: Identificador retornado por CreateMultipartUpload.
+        :param part_number: Número de la parte (1 a 10000).
+        :return: URL prefirmada como string.
+        """
+        path = '/' + quote(file_name, safe='/-_.~')
+        canonical_query = self._canonical_query(
+            'host',
+            {'partNumber': str(part_number), 'uploadId': upload_id}
+        )
+        return self._sign(path, canonical_query, f"host:{self.host}\n", 'host')
+
+
+# Parámetros de subida multipart (límites de S3: partes de 5 MiB a 5 GiB, máximo 10000 partes)
+MULTIPART_THRESHOLD = int(os.environ.get('MULTIPART_THRESHOLD', str(64 * 1024 * 1024)))
+MULTIPART_MIN_PART_SIZE = int(os.environ.get('MULTIPART_MIN_PART_SIZE', str(8 * 1024 * 1024)))
+MULTIPART_MAX_PARTS = 10000
+MULTIPART_MAX_OBJECT_SIZE = 5 * 1024 ** 4
+_MIB = 1024 * 1024
+
+
+def compute_part_size(file_size: int) -> int:
+    """
+    Calcula el tamaño de parte para una subida multipart: el mínimo configurado, o el
+    menor múltiplo de 1 MiB que mantiene el archivo en 10000 partes como máximo.
+
+    :param file_size: Tamaño total del archivo en bytes.
+    :return: Tamaño de cada parte en bytes (la última puede ser menor).
+    """
+    required = -(-file_size // MULTIPART_MAX_PARTS)
+    required = -(-required // _MIB) * _MIB
+    return max(MULTIPART_MIN_PART_SIZE, 5 * _MIB, required)
+
+
+def create_multipart_upload(file_name: str, content_type: str) -> str:
+    """
+    Inicia una subida multipart en S3.
+
+    :param file_name: Nombre del archivo (clave) en S3.
+    :param content_type: Tipo MIME del archivo.
+    :return: El UploadId de la subida.
+    :raises ValueError: Si el tipo MIME no está permitido.
+    :raises RuntimeError: Si S3 rechaza la solicitud.
+    """
+    if content_type not in TIPOS_PERMITIDOS:
+        raise ValueError(f"Tipo MIME '{content_type}' no permitido.")
+    try:
+        response = s3_client.create_multipart_upload(
+            Bucket=bucket_name,
+            Key=file_name,
+            ContentType=content_type
+        )
+        logger.info(f"Subida multipart iniciada para '{file_name}'.")
+        return response['UploadId']
+    except Exception as e:
+        logger.error(f"Error al iniciar la subida multipart de '{file_name}': {e}")
+        raise RuntimeError("Error al iniciar la subida multipart.")
+
+
+def complete_multipart_upload(file_name: str, upload_id: str, parts: list) -> dict:
+    """
+    Completa una subida multipart en S3.
+
+    :param file_name: Nombre del archivo (clave) en S3.
+    :param upload_id: Identificador de la subida.
+    :param parts: Lista de {'PartNumber': int, 'ETag': str} ordenada por número de parte.
+    :return: La respuesta de S3.
+    """
+    response = s3_client.complete_multipart_upload(
+        Bucket=bucket_name,
+        Key=file_name,
+        UploadId=upload_id,
+        MultipartUpload={'Parts': parts}
+    )
+    logger.info(f"Subida multipart completada para '{file_name}'.")
+    return response
+
+
+def abort_multipart_upload(file_name: str, upload_id: str):
+    """
+    Cancela una subida multipart y libera las partes ya subidas.
+
+    :param file_name: Nombre del archivo (clave) en S3.
+    :param upload_id: Identificador de la subida.
+    """
+    s3_client.abort_multipart_upload(
+        Bucket=bucket_name,
+        Key=file_name,
+        UploadId=upload_id
+    )
+    logger.info(f"Subida multipart cancelada para '{file_name}'.")
+
+
+# Tamaño máximo aceptado por la política de POST (S3 admite hasta 5 GiB por POST)
+POST_MAX_FILE_SIZE = int(os.environ.get('POST_MAX_FILE_SIZE', str(5 * 1024 ** 3)))
+
+
+def generate_presigned_post_policy(prefix: str, content_type: str, expiration: int = 3600) -> dict:
+    """
+    Genera una política de POST prefirmada válida para cualquier archivo bajo 'prefix'.
+
+    La política exige el tipo MIME indicado y un tamaño entre 1 byte y POST_MAX_FILE_SIZE.
+
+    :param prefix: Prefijo de las claves permitidas, terminado en '/'.
+    :param content_type: Tipo MIME que deben declarar los archivos.
+    :param expiration: Tiempo de expiración en segundos (default: 3600).
+    :return: Diccionario {'url': ..., 'fields': {...}} de boto3.
+    :raises ValueError: Si el tipo MIME no está permitido.
+    """
+    if content_type not in TIPOS_PERMITIDOS:
+        raise ValueError(f"Tipo MIME '{content_type}' no permitido.")
+    return s3_client.generate_presigned_post(
+        Bucket=bucket_name,
+        Key=prefix + '${filename}',
+        Fields={'Content-Type': content_type},
+        # boto3 agrega la condición ['starts-with', '$key', prefix] por el sufijo ${filename}
+        Conditions=[
+            {'Content-Type': content_type},
+            ['content-length-range', 1, POST_MAX_FILE_SIZE]
+        ],
+        ExpiresIn=expiration
+    )
@@ -1,63 +1,421 @@
+import os
 import logging
-import boto3
-from .s3_helper import generate_presigned_url
+from botocore.exceptions import BotoCoreError, ClientError
+from shared.aws_clients import get_table
+from shared.ttl_cache import TTLCache
+from . import content_index
+from .s3_helper import (
+    BatchPresigner,
+    TIPOS_PERMITIDOS,
+    MULTIPART_MAX_OBJECT_SIZE,
+    MULTIPART_MAX_PARTS,
+    MULTIPART_THRESHOLD,
+    abort_multipart_upload,
+    complete_multipart_upload,
+    compute_part_size,
+    create_multipart_upload,
+    generate_presigned_part_url,
+    generate_presigned_post_policy,
+    generate_presigned_url,
+)
 
 # Configuración del logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def generate_presigned_urls(directory: str, files: list, expiration: int = 3600) -> list:
+# Motor de firma: 'batch' (BatchPresigner) o 'boto3' (una llamada a boto3 por archivo)
+PRESIGN_ENGINE = os.environ.get('PRESIGN_ENGINE', 'batch').lower()
+
+# Cache del contenedor con las operaciones cuya existencia ya se confirmó (solo resultados positivos)
+EXISTENCE_CACHE_TTL = float(os.environ.get('EXISTENCE_CACHE_TTL', '300'))
+EXISTENCE_CACHE_SIZE = int(os.environ.get('EXISTENCE_CACHE_SIZE', '1024'))
+# Lectura fuertemente consistente en la verificación de existencia (por defecto, eventual)
+EXISTENCE_CONSISTENT_READ = os.environ.get('EXISTENCE_CONSISTENT_READ', 'false').lower() == 'true'
+
+# Máximo de URLs de partes multipart firmadas por respuesta (~1.5 KB cada una, compartido entre los
+# archivos de la solicitud). Las partes restantes se piden con sign_multipart_parts.
+MULTIPART_PARTS_PER_RESPONSE = int(os.environ.get('MULTIPART_PARTS_PER_RESPONSE', '1000'))
+
+existence_cache = TTLCache(max_size=EXISTENCE_CACHE_SIZE, ttl=EXISTENCE_CACHE_TTL)
+
+def generate_presigned_urls(directory: str, files: list, expiration: int = 3600, user_id: str = None) -> list:
     """
     Genera múltiples URLs prefirmadas y las asocia con sus nombres de archivo.
+
+    Todo el lote se firma con un único BatchPresigner (una instantánea de credenciales y una
+    clave de firma derivada una sola vez). Un archivo inválido no interrumpe el lote: su
+    entrada incluye 'error' en lugar de 'url'.
+
+    Si un archivo indica 'size' y supera MULTIPART_THRESHOLD, se inicia una subida multipart
+    y su entrada incluye 'upload_id', 'part_size', 'total_parts' y en 'parts' las URLs de las
+    primeras partes (como máximo MULTIPART_PARTS_PER_RESPONSE entre todos los archivos). Si faltan
+    partes, 'next_part' indica la primera que debe pedirse con sign_multipart_parts.
+
+    Si un archivo indica 'sha256' y el usuario ya subió ese contenido (según el índice de
+    contenido), no se emite URL: el objeto existente se copia del lado del servidor y la
+    entrada tiene "status": "already_present" y 'source'; si el origen ya no tiene ese contenido
+    se emite una URL normal. Las URLs de archivos con 'sha256' exigen a S3 verificar el
+    checksum, y se registran en el índice como pendientes.
     """
     if not files or not isinstance(files, list):
         raise ValueError("El parámetro 'files' debe ser una lista de archivos no vacía.")
 
+    if PRESIGN_ENGINE == 'batch':
+        sign, sign_part = _batch_signers(expiration)
+    else:
+        sign = lambda file_name, content_type, checksum=None: generate_presigned_url(
+            file_name, content_type, expiration, checksum
+        )
+        sign_part = _part_signer(expiration)
+    remaining_parts = MULTIPART_PARTS_PER_RESPONSE
+
+    # Consulta por lotes de los contenidos que el usuario ya subió
+    known_contents = {}
+    if user_id and content_index.is_enabled():
+        hashes = [
+            content_index.normalize_sha256(file.get('sha256'))
+            for file in files if isinstance(file, dict)
+        ]
+        try:
+            known_contents = content_index.lookup_contents(user_id, [sha for sha in hashes if sha])
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"Error al consultar el índice de contenido: {e}")
+
     structured_urls = []
+    failed = 0
+    pending_copies = []
+    pending_registrations = []
 
     for file in files:
+        file_name = file.get('name') if isinstance(file, dict) else None
         try:
-            file_name = file.get('name')
-            content_type = file.get('content_type')
+            content_type = file.get('content_type') if isinstance(file, dict) else None
 
             if not file_name or not content_type:
-                raise ValueError(f"Datos del archivo inválidos: {file}")
+                raise ValueError("Datos del archivo inválidos: se requieren 'name' y 'content_type'.")
+
+            size = file.get('size')
+            if size is not None and (
+                not isinstance(size, int) or isinstance(size, bool) or not 0 < size <= MULTIPART_MAX_OBJECT_SIZE
+            ):
+                raise ValueError("El tamaño del archivo ('size') debe ser un entero positivo de hasta 5 TiB.")
+
+            sha256 = None
+            if file.get('sha256') is not None:
+                sha256 = content_index.normalize_sha256(file.get('sha256'))
+                if sha256 is None:
+                    raise ValueError("El 'sha256' del archivo debe ser un hash hexadecimal de 64 caracteres.")
 
-            # Generar URL prefirmada
             full_path = f"{directory}/{file_name}"
-            url = generate_presigned_url(full_path, content_type, expiration)
 
-            # Agregar a la lista estructurada
+            # Contenido ya subido por el usuario: copia del lado del servidor en lugar de URL
+            known = known_contents.get(sha256)
+            if known:
+                source = known["key"]
+                if source != full_path:
+                    pending_copies.append((len(structured_urls), source, known["etag"], full_path, content_type, sha256))
+                structured_urls.append({
+                    "name": file_name,
+                    "status": "already_present",
+                    "source": source
+                })
+                continue
+
+            # Archivos grandes: subida multipart con una URL por parte
+            if size is not None and size >= MULTIPART_THRESHOLD:
+                entry = _multipart_entry(file_name, full_path, content_type, size, sign_part, remaining_parts)
+                remaining_parts -= len(entry["parts"])
+                structured_urls.append(entry)
+                continue
+
+            # Generar URL prefirmada (con verificación de checksum si se indicó 'sha256')
             structured_urls.append({
                 "name": file_name,
-                "url": url
+                "url": sign(full_path, content_type, content_index.sha256_to_base64(sha256) if sha256 else None)
             })
+            if sha256:
+                pending_registrations.append((sha256, full_path))
+
+        except (ValueError, RuntimeError, BotoCoreError) as e:
+            failed += 1
+            structured_urls.append({
+                "name": file_name,
+                "error": str(e)
+            })
+
+    # Copias en paralelo; si alguna falla se emite una URL normal para ese archivo
+    copy_errors = content_index.copy_objects([
+        (source, path, etag, content_type) for _, source, etag, path, content_type, _ in pending_copies
+    ])
+    for (position, _, _, full_path, content_type, sha256), error in zip(pending_copies, copy_errors):
+        if not error:
+            continue
+        name = structured_urls[position]["name"]
+        try:
+            structured_urls[position] = {
+                "name": name,
+                "url": sign(full_path, content_type, content_index.sha256_to_base64(sha256))
+            }
+        except (ValueError, RuntimeError, BotoCoreError) as e:
+            failed += 1
+            structured_urls[position] = {"name": name, "error": str(e)}
 
-        except Exception as e:
-            logger.error(f"Error al procesar el archivo {file}: {e}")
-            raise
+    if user_id and pending_registrations:
+        try:
+            content_index.register_pending(user_id, pending_registrations)
+        except (ClientError, BotoCoreError) as e:
+            logger.error(f"Error al registrar contenidos en el índice: {e}")
 
+    logger.info(f"URLs prefirmadas: {len(structured_urls) - failed} generadas, {failed} con error.")
     return structured_urls
 
 
-def verify_existence_in_bd(bd_name: str, user_id: str, operation: str) -> dict:
+def signing_has_side_effects(files: list, user_id: str = None) -> bool:
+    """
+    Indica si generate_presigned_urls haría algo más que firmar localmente para estos archivos:
+    iniciar subidas multipart o consultar/copiar/registrar en el índice de contenido.
+
+    Solo un lote sin efectos secundarios puede firmarse antes de confirmar la operación.
+    """
+    for file in files:
+        if not isinstance(file, dict):
+            continue
+        size = file.get('size')
+        if isinstance(size, int) and size >= MULTIPART_THRESHOLD:
+            return True
+        if user_id and content_index.is_enabled() and file.get('sha256') is not None:
+            return True
+    return False
+
+
+def generate_post_policies(directory: str, content_types: list = None, expiration: int = 3600) -> dict:
+    """
+    Genera políticas de POST prefirmadas para subir cualquier número de archivos a la operación.
+
+    Una política de POST solo puede fijar un valor exacto de Content-Type, por lo que se emite
+    una por tipo MIME solicitado (por defecto, todos los de TIPOS_PERMITIDOS). El tamaño de la
+    respuesta no depende de la cantidad de archivos.
+
+    :param directory: Prefijo '{sub}/{operation}' de la operación.
+    :param content_types: Tipos MIME a habilitar (opcional).
+    :param expiration: Tiempo de expiración en segundos (default: 3600).
+    :return: {"url", "key_prefix", "expires_in", "policies": {content_type: fields}}.
+    :raises ValueError: Si algún tipo MIME no está permitido.
+    """
+    prefix = f"{directory}/"
+    requested = sorted(set(content_types)) if content_types else sorted(TIPOS_PERMITIDOS)
+
+    url = None
+    policies = {}
+    for content_type in requested:
+        presigned = generate_presigned_post_policy(prefix, content_type, expiration)
+        url = presigned['url']
+        policies[content_type] = presigned['fields']
+
+    logger.info(f"Políticas de POST generadas para {len(policies)} tipos MIME.")
+    return {
+        "url": url,
+        "key_prefix": prefix,
+        "expires_in": expiration,
+        "policies": policies
+    }
+
+
+def _batch_signers(expiration: int) -> tuple:
+    """
+    Retorna las funciones de firma de 'put_object' y 'upload_part' de un BatchPresigner compartido
+    por el lote, que se construye con la primera firma.
+
+    Así la instantánea de credenciales se toma dentro del try de cada archivo: si falla, el error
+    queda en la entrada del archivo en lugar de abortar la solicitud.
+    """
+    presigner = None
+
+    def get_presigner() -> BatchPresigner:
+        nonlocal presigner
+        if presigner is None:
+            presigner = BatchPresigner(expiration=expiration)
+        return presigner
+
+    return (
+        lambda *args: get_presigner().presign_put(*args),
+        lambda *args: get_presigner().presign_upload_part(*args),
+    )
+
+
+def _part_signer(expiration: int):
+    """
+    Retorna la función que firma la URL de una parte según PRESIGN_ENGINE.
+    """
+    if PRESIGN_ENGINE == 'batch':
+        return BatchPresigner(expiration=expiration).presign_upload_part
+    return lambda file_name, upload_id, part_number: generate_presigned_part_url(
+        file_name, upload_id, part_number, expiration
+    )
+
+
+def _multipart_entry(file_name: str, full_path: str, content_type: str, size: int, sign_part,
+                     max_parts: int = MULTIPART_PARTS_PER_RESPONSE) -> dict:
+    """
+    Inicia la subida multipart de un archivo y firma la URL de sus primeras 'max_parts' partes.
+    """
+    upload_id = create_multipart_upload(full_path, content_type)
+    part_size = compute_part_size(size)
+    total_parts = -(-size // part_size)
+    signed_parts = max(0, min(total_parts, max_parts))
+    try:
+        parts = [
+            {"part_number": part_number, "url": sign_part(full_path, upload_id, part_number)}
+            for part_number in range(1, signed_parts + 1)
+        ]
+    except Exception:
+        abort_multipart_upload(full_path, upload_id)
+        raise
+    return {
+        "name": file_name,
+        "upload_id": upload_id,
+        "part_size": part_size,
+        "total_parts": total_parts,
+        "parts": parts,
+        "next_part": signed_parts + 1 if signed_parts < total_parts else None
+    }
+
+
+def sign_multipart_parts(directory: str, file_name: str, upload_id: str, first_part: int,
+                         count: int = MULTIPART_PARTS_PER_RESPONSE, expiration: int = 3600) -> dict:
+    """
+    Firma las URLs de un rango de partes de una subida multipart ya iniciada.
+
+    Parámetros:
+      directory (str): Prefijo '{sub}/{operation}' del archivo.
+      file_name (str): Nombre del archivo.
+      upload_id (str): Identificador de la subida.
+      first_part (int): Primera parte del rango (desde 1).
+      count (int, opcional): Cantidad de partes; como máximo MULTIPART_PARTS_PER_RESPONSE.
+
+    Retorna:
+      dict: {"status": "success", "parts": [{"part_number", "url"}], "next_part": int | None},
+            {"status": "invalid", "message": ...} si el rango no es válido.
+    """
+    if (not isinstance(first_part, int) or isinstance(first_part, bool)
+            or not 1 <= first_part <= MULTIPART_MAX_PARTS):
+        return {"status": "invalid", "message": f"'first_part' debe ser un entero entre 1 y {MULTIPART_MAX_PARTS}."}
+    if not isinstance(count, int) or isinstance(count, bool) or count < 1:
+        return {"status": "invalid", "message": "'count' debe ser un entero positivo."}
+
+    full_path = f"{directory}/{file_name}"
+    sign_part = _part_signer(expiration)
+    last_part = min(first_part + min(count, MULTIPART_PARTS_PER_RESPONSE) - 1, MULTIPART_MAX_PARTS)
+    parts = [
+        {"part_number": part_number, "url": sign_part(full_path, upload_id, part_number)}
+        for part_number in range(first_part, last_part + 1)
+    ]
+    return {
+        "status": "success",
+        "parts": parts,
+        "next_part": last_part + 1 if last_part < MULTIPART_MAX_PARTS else None
+    }
+
+
+def complete_multipart(directory: str, file_name: str, upload_id: str, parts: list) -> dict:
+    """
+    Completa una subida multipart; si S3 la rechaza, la cancela para no dejar partes huérfanas.
+
+    Parámetros:
+      directory (str): Prefijo '{sub}/{operation}' del archivo.
+      file_name (str): Nombre del archivo.
+      upload_id (str): Identificador de la subida.
+      parts (list): Lista de {"part_number": int, "etag": str}.
+
+    Retorna:
+      dict: {"status": "success", "message": ...} si se completó,
+            {"status": "invalid", "message": ...} si 'parts' no es válido,
+            {"status": "error", "message": ..., "error": ...} si S3 la rechazó (y se canceló).
+    """
+    full_path = f"{directory}/{file_name}"
+
+    normalized = {}
+    for part in parts if isinstance(parts, list) else []:
+        part_number = part.get('part_number') if isinstance(part, dict) else None
+        etag = part.get('etag') if isinstance(part, dict) else None
+        if not isinstance(part_number, int) or not 1 <= part_number <= MULTIPART_MAX_PARTS or not etag:
+            normalized = {}
+            break
+        normalized[part_number] = etag
+    if not normalized:
+        return {
+            "status": "invalid",
+            "message": "El parámetro 'parts' debe ser una lista de {part_number, etag} válida."
+        }
+
+    try:
+        complete_multipart_upload(
+            full_path,
+            upload_id,
+            [{'PartNumber': number, 'ETag': etag} for number, etag in sorted(normalized.items())]
+        )
+        return {"status": "success", "message": "Subida multipart completada."}
+    except ClientError as e:
+        logger.error(f"Error al completar la subida multipart de '{full_path}': {e}")
+        try:
+            abort_multipart_upload(full_path, upload_id)
+        except ClientError as abort_error:
+            logger.error(f"Error al cancelar la subida multipart de '{full_path}': {abort_error}")
+        return {
+            "status": "error",
+            "message": "Error al completar la subida multipart; la subida fue cancelada.",
+            "error": str(e)
+        }
+
+
+def cancel_multipart(directory: str, file_name: str, upload_id: str) -> dict:
+    """
+    Cancela explícitamente una subida multipart.
+
+    Retorna:
+      dict: {"status": "success", ...} o {"status": "error", "message": ..., "error": ...}.
+    """
+    full_path = f"{directory}/{file_name}"
+    try:
+        abort_multipart_upload(full_path, upload_id)
+        return {"status": "success", "message": "Subida multipart cancelada."}
+    except ClientError as e:
+        logger.error(f"Error al cancelar la subida multipart de '{full_path}': {e}")
+        return {
+            "status": "error",
+            "message": "Error al cancelar la subida multipart.",
+            "error": str(e)
+        }
+
+
+def verify_existence_in_bd(bd_name: str, user_id: str, operation: str,
+                           consistent_read: bool = EXISTENCE_CONSISTENT_READ) -> dict:
     """
     Verifica la existencia de un elemento en la tabla DynamoDB usando 'user_id' y 'operation' como clave primaria.
 
+    Solo se proyectan los atributos de la clave: el resumen ('data') no se lee ni se guarda.
+    Las operaciones encontradas se guardan en una cache del contenedor durante EXISTENCE_CACHE_TTL
+    segundos, de modo que las solicitudes repetidas para la misma operación no vuelven a consultar
+    DynamoDB. Los resultados negativos nunca se cachean.
+
     Parámetros:
       bd_name (str): Nombre de la tabla en DynamoDB.
       user_id (str): Valor del identificador de usuario (clave de partición).
       operation (str): Valor de la operación (clave de ordenamiento).
+      consistent_read (bool, opcional): Si es True la lectura es fuertemente consistente.
 
     Retorna:
       dict: Diccionario con la información del resultado. Por ejemplo:
-            {"exists": True, "item": { ... }} si se encontró el elemento,
+            {"exists": True} si se encontró el elemento,
             {"exists": False} si no existe,
             {"success": False, "error": "mensaje de error"} en caso de excepción.
     """
-    # Inicializa el recurso de DynamoDB
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(bd_name)
+    cache_key = (bd_name, user_id, operation)
+    if existence_cache.get(cache_key):
+        return {"status":"success","exists": True}
+
+    # Obtiene la tabla reutilizada del contenedor
+    table = get_table(bd_name)
 
     try:
         # Intenta obtener el elemento usando las claves especificadas
@@ -65,7 +423,10 @@ def verify_existence_in_bd(bd_name: str, user_id: str, operation: str) -> dict:
             Key={
                 'user_id': user_id,
                 'operation': operation
-            }
+            },
+            ProjectionExpression='#user_id, #operation',
+            ExpressionAttributeNames={'#user_id': 'user_id', '#operation': 'operation'},
+            ConsistentRead=consistent_read
         )
     except Exception as e:
         # En caso de error, se retorna el mensaje de error
@@ -73,7 +434,7 @@ def verify_existence_in_bd(bd_name: str, user_id: str, operation: str) -> dict:
 
     # Verifica si el elemento existe en la respuesta
     if 'Item' in response:
-        return {"status":"success","exists": True, "item": response["Item"]}
+        existence_cache.put(cache_key, True)
+        return {"status":"success","exists": True}
     else:
         return {"status":"success","exists": False}
-
@@ -0,0 +1,119 @@
+import hashlib
+import pytest
+from botocore.exceptions import EndpointConnectionError, ReadTimeoutError
+from botocore.stub import ANY, Stubber
+from shared.aws_clients import get_client, get_resource
+from lambda_generar_urls import content_index, service
+
+SHA256 = hashlib.sha256(b'contenido').hexdigest()
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    monkeypatch.setattr(content_index, 'CONTENT_INDEX_TABLE', 'content-index')
+    dynamodb = Stubber(get_resource('dynamodb').meta.client)
+    s3 = Stubber(get_client('s3'))
+    with dynamodb, s3:
+        yield dynamodb, s3
+        dynamodb.assert_no_pending_responses()
+        s3.assert_no_pending_responses()
+
+
+def _index_response(status: str):
+    return {'Responses': {'content-index': [{
+        'user_id': {'S': 'user-1'},
+        'sha256': {'S': SHA256},
+        'key': {'S': 'user-1/op/a.pdf'},
+        'status': {'S': status},
+    }]}}
+
+
+def test_present_entry_is_reverified(stubs):
+    dynamodb, s3 = stubs
+    dynamodb.add_response('batch_get_item', _index_response(content_index.STATUS_PRESENT), {'RequestItems': ANY})
+    s3.add_response('head_object', {'ETag': '"abc"', 'ChecksumSHA256': content_index.sha256_to_base64(SHA256)}, {
+        'Bucket': 'test-bucket', 'Key': 'user-1/op/a.pdf', 'ChecksumMode': 'ENABLED'
+    })
+
+    assert content_index.lookup_contents('user-1', [SHA256]) == {SHA256: {'key': 'user-1/op/a.pdf', 'etag': '"abc"'}}
+
+
+def test_overwritten_present_entry_is_not_reused(stubs):
+    dynamodb, s3 = stubs
+    dynamodb.add_response('batch_get_item', _index_response(content_index.STATUS_PRESENT), {'RequestItems': ANY})
+    s3.add_response('head_object', {'ETag': '"def"'}, {
+        'Bucket': 'test-bucket', 'Key': 'user-1/op/a.pdf', 'ChecksumMode': 'ENABLED'
+    })
+
+    assert content_index.lookup_contents('user-1', [SHA256]) == {}
+
+
+def test_copy_requires_verified_etag():
+    with Stubber(get_client('s3', **content_index._COPY_CLIENT_CONFIG)) as s3:
+        s3.add_client_error('copy_object', 'PreconditionFailed', http_status_code=412, expected_params={
+            'Bucket': 'test-bucket',
+            'Key': 'user-1/op/b.pdf',
+            'CopySource': {'Bucket': 'test-bucket', 'Key': 'user-1/op/a.pdf'},
+            'CopySourceIfMatch': '"abc"',
+            'ChecksumAlgorithm': 'SHA256',
+            'MetadataDirective': 'REPLACE',
+            'ContentType': 'application/pdf',
+            'Metadata': {content_index.COPY_SOURCE_METADATA: 'user-1/op/a.pdf'},
+        })
+
+        errors = content_index.copy_objects([('user-1/op/a.pdf', 'user-1/op/b.pdf', '"abc"', 'application/pdf')])
+        s3.assert_no_pending_responses()
+
+    assert errors[0] is not None
+
+
+def _read_timeout(*args, **kwargs):
+    raise ReadTimeoutError(endpoint_url='https://test-bucket.s3.amazonaws.com')
+
+
+def test_verification_timeout_skips_entry(stubs, monkeypatch):
+    dynamodb, _ = stubs
+    dynamodb.add_response('batch_get_item', _index_response(content_index.STATUS_PRESENT), {'RequestItems': ANY})
+    monkeypatch.setattr(get_client('s3'), 'head_object', _read_timeout)
+
+    assert content_index.lookup_contents('user-1', [SHA256]) == {}
+
+
+def test_large_objects_are_not_reused(stubs, monkeypatch):
+    dynamodb, s3 = stubs
+    monkeypatch.setattr(content_index, 'DEDUP_COPY_MAX_BYTES', 1024)
+    dynamodb.add_response('batch_get_item', _index_response(content_index.STATUS_PRESENT), {'RequestItems': ANY})
+    s3.add_response('head_object', {
+        'ETag': '"abc"', 'ContentLength': 4096, 'ChecksumSHA256': content_index.sha256_to_base64(SHA256)
+    }, {'Bucket': 'test-bucket', 'Key': 'user-1/op/a.pdf', 'ChecksumMode': 'ENABLED'})
+
+    assert content_index.lookup_contents('user-1', [SHA256]) == {}
+
+
+def test_copy_timeout_falls_back_to_presigned_url(monkeypatch):
+    monkeypatch.setattr(content_index, 'CONTENT_INDEX_TABLE', 'content-index')
+    monkeypatch.setattr(content_index, 'lookup_contents',
+                        lambda user_id, hashes: {SHA256: {'key': 'user-1/op/a.pdf', 'etag': '"abc"'}})
+    monkeypatch.setattr(get_client('s3', **content_index._COPY_CLIENT_CONFIG), 'copy_object', _read_timeout)
+    monkeypatch.setattr(content_index, 'register_pending', lambda user_id, entries: None)
+
+    entries = service.generate_presigned_urls(
+        'user-1/otra', [{'name': 'b.pdf', 'content_type': 'application/pdf', 'sha256': SHA256}], user_id='user-1'
+    )
+
+    assert entries[0]['name'] == 'b.pdf' and 'url' in entries[0]
+
+
+def test_index_network_errors_do_not_fail_the_request(monkeypatch):
+    def unreachable(user_id, entries):
+        raise EndpointConnectionError(endpoint_url='https://dynamodb.us-east-1.amazonaws.com')
+
+    monkeypatch.setattr(content_index, 'CONTENT_INDEX_TABLE', 'content-index')
+    monkeypatch.setattr(content_index, 'lookup_contents', unreachable)
+    monkeypatch.setattr(content_index, 'register_pending', unreachable)
+
+    entries = service.generate_presigned_urls(
+        'user-1/op', [{'name': 'a.pdf', 'content_type': 'application/pdf', 'sha256': SHA256}], user_id='user-1'
+    )
+
+    assert 'url' in entries[0]
@@ -0,0 +1,90 @@
+from botocore.stub import Stubber
+from shared.aws_clients import get_resource
+from lambda_generar_urls import benchmark_handler, benchmark_presign, service
+
+
+def _sign_part(full_path, upload_id, part_number):
+    return f"https://test-bucket.s3.amazonaws.com/{full_path}?partNumber={part_number}&uploadId={upload_id}"
+
+
+def test_multipart_entry_signs_only_first_parts(monkeypatch):
+    monkeypatch.setattr(service, 'create_multipart_upload', lambda full_path, content_type: 'upload-1')
+    size = 40 * 1024 ** 3
+
+    entry = service._multipart_entry('big.pdf', 'user-1/op/big.pdf', 'application/pdf', size, _sign_part, 100)
+
+    assert entry['total_parts'] == -(-size // entry['part_size'])
+    assert [part['part_number'] for part in entry['parts']] == list(range(1, 101))
+    assert entry['next_part'] == 101
+
+
+def test_part_budget_is_shared_between_files(monkeypatch):
+    monkeypatch.setattr(service, 'MULTIPART_PARTS_PER_RESPONSE', 10)
+    monkeypatch.setattr(service, 'create_multipart_upload', lambda full_path, content_type: 'upload-1')
+    monkeypatch.setattr(service, '_part_signer', lambda expiration: _sign_part)
+    monkeypatch.setattr(service, 'PRESIGN_ENGINE', 'boto3')
+    size = service.MULTIPART_THRESHOLD * 2
+    files = [{'name': f"{name}.pdf", 'content_type': 'application/pdf', 'size': size} for name in ('a', 'b')]
+
+    first, second = service.generate_presigned_urls('user-1/op', files)
+
+    assert len(first['parts']) + len(second['parts']) == 10
+    assert second['next_part'] == len(second['parts']) + 1
+
+
+def test_sign_multipart_parts_signs_requested_range():
+    result = service.sign_multipart_parts('user-1/op', 'big.pdf', 'upload-1', first_part=101, count=5)
+
+    assert result['status'] == 'success'
+    assert [part['part_number'] for part in result['parts']] == [101, 102, 103, 104, 105]
+    assert 'partNumber=101' in result['parts'][0]['url']
+    assert result['next_part'] == 106
+
+
+def test_sign_multipart_parts_rejects_invalid_range():
+    assert service.sign_multipart_parts('user-1/op', 'big.pdf', 'upload-1', first_part=0)['status'] == 'invalid'
+    assert service.sign_multipart_parts('user-1/op', 'big.pdf', 'upload-1', first_part=1, count=0)['status'] == 'invalid'
+
+
+def test_existence_check_projects_key_and_caches_flag(monkeypatch):
+    monkeypatch.setattr(service, 'existence_cache', service.TTLCache(max_size=8, ttl=60))
+    with Stubber(get_resource('dynamodb').meta.client) as dynamodb:
+        dynamodb.add_response('get_item', {'Item': {'user_id': {'S': 'user-1'}, 'operation': {'S': 'op'}}}, {
+            'TableName': 'summaries',
+            'Key': {'user_id': 'user-1', 'operation': 'op'},
+            'ProjectionExpression': '#user_id, #operation',
+            'ExpressionAttributeNames': {'#user_id': 'user_id', '#operation': 'operation'},
+            'ConsistentRead': False,
+        })
+
+        assert service.verify_existence_in_bd('summaries', 'user-1', 'op') == {"status": "success", "exists": True}
+        assert service.verify_existence_in_bd('summaries', 'user-1', 'op') == {"status": "success", "exists": True}
+        dynamodb.assert_no_pending_responses()
+
+    assert service.existence_cache.get(('summaries', 'user-1', 'op')) is True
+
+
+def test_presigner_failures_become_per_file_errors(monkeypatch):
+    def no_credentials(expiration):
+        raise RuntimeError("No hay credenciales de AWS disponibles para firmar las URLs.")
+
+    monkeypatch.setattr(service, 'PRESIGN_ENGINE', 'batch')
+    monkeypatch.setattr(service, 'BatchPresigner', no_credentials)
+    files = [{'name': 'a.pdf', 'content_type': 'application/pdf'}, {'name': 'b.exe'}]
+
+    first, second = service.generate_presigned_urls('user-1/op', files)
+
+    assert first == {"name": "a.pdf", "error": "No hay credenciales de AWS disponibles para firmar las URLs."}
+    assert 'error' in second
+
+
+def test_presign_benchmark_runs():
+    result = benchmark_presign.run(sizes=(3,))
+
+    assert set(result[3]) == {'boto3', 'batch'}
+
+
+def test_handler_benchmark_runs():
+    result = benchmark_handler.run(requests=2, files=3, delay_ms=0)
+
+    assert set(result) == {'sequential', 'speculative'}
@@ -1,13 +1,21 @@
 import json
 import logging
 import os
+from shared.compression import get_accept_encoding
+from shared.serializer import dumps
 from .response import Response
-from .service import get_db_data,convert_decimal
+from shared.projection import parse_fields
+from .service import get_db_data,get_db_data_batch
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 BD_NAME = os.environ['RESULT_TABLE']#cambiae en deploy
+# Máximo de archivos aceptados en una consulta por lotes
+MAX_BATCH_FILES = int(os.environ.get('MAX_BATCH_FILES', '300'))
+# Tamaño máximo (JSON sin comprimir) de los resultados de una consulta por lotes. Lambda rechaza
+# respuestas de más de 6 MB; los archivos que no caben se retornan en 'deferred'.
+MAX_BATCH_RESPONSE_BYTES = int(os.environ.get('MAX_BATCH_RESPONSE_BYTES', str(5 * 1024 * 1024)))
 
 
 def handler_function(event, context):
@@ -15,6 +23,9 @@ def handler_function(event, context):
     Función handler para obtener la columna 'data' de una operación.
     Se espera que el evento incluya:
       - operacion: el nombre de la operación.
+      - file: el nombre del archivo, o bien
+      - files: nombres de archivos separados por comas (modo por lotes).
+      - fields (opcional): rutas de 'data' a retornar, separadas por comas (también en modo por lotes).
       - El identificador del usuario (sub) se obtiene desde los claims del Authorizer de Cognito.
 
     Devuelve una respuesta formateada utilizando el objeto Response.
@@ -37,6 +48,12 @@ def handler_function(event, context):
                 status_code=400,
                 message="El nombre de la operación es obligatorio."
             ).to_dict()
+
+        # Modo por lotes: varios archivos en una sola consulta
+        files_param = parameters.get('files')
+        if files_param:
+            return _handle_batch(event, parameters, files_param, name_operation)
+
         file = parameters.get('file')
         if not file:
             logger.error("El nombre del file es obligatorio.")
@@ -60,16 +77,28 @@ def handler_function(event, context):
             ).to_dict()
 
         user_operation = f"{sub_user}#{name_operation}"
+        # Validar las rutas de 'data' solicitadas (opcional)
+        fields, invalid_response = _parse_fields_param(parameters)
+        if invalid_response:
+            return invalid_response
+
         # Consultar la columna 'data' utilizando la función get_db_data
-        response_service_bd = get_db_data(db_name=BD_NAME, user_operation=user_operation, file=file)
+        response_service_bd = get_db_data(db_name=BD_NAME, user_operation=user_operation, file=file, fields=fields)
 
         # Evaluar la respuesta de get_db_data y retornar la respuesta formateada
         if response_service_bd.get("status") == "success":
             logger.info("Data encontrada exitosamente.")
-            data_converted = convert_decimal(response_service_bd.get("data"))
             return Response(
                 status_code=200,
-                body=data_converted
+                body=response_service_bd.get("data"),
+                accept_encoding=get_accept_encoding(event)
+            ).to_dict()
+        elif response_service_bd.get("status") == "invalid":
+            logger.info(f"Campos no encontrados: {response_service_bd.get('missing_fields')}")
+            return Response(
+                status_code=400,
+                message=response_service_bd.get("message"),
+                body={"missing_fields": response_service_bd.get("missing_fields")}
             ).to_dict()
         else:
             # Puede ser que la operación no exista o que la columna 'data' no se encuentre en el registro
@@ -88,6 +117,114 @@ def handler_function(event, context):
         ).to_dict()
 
 
+def _parse_fields_param(parameters: dict) -> tuple:
+    """
+    Valida el parámetro opcional 'fields'.
+
+    Retorna:
+      tuple: (rutas válidas o None, respuesta 400 si hay rutas inválidas o None).
+    """
+    fields_param = parameters.get('fields')
+    if not fields_param:
+        return None, None
+    fields, invalid_fields = parse_fields(fields_param)
+    if invalid_fields or not fields:
+        logger.error(f"Campos inválidos en 'fields': {invalid_fields}")
+        return None, Response(
+            status_code=400,
+            message="El parámetro 'fields' contiene rutas inválidas.",
+            body={"invalid_fields": invalid_fields}
+        ).to_dict()
+    return fields, None
+
+
+def _handle_batch(event, parameters: dict, files_param: str, name_operation: str) -> dict:
+    """
+    Atiende el modo por lotes: retorna en una sola respuesta el resultado de cada archivo.
+
+    Los resultados se agregan en orden hasta MAX_BATCH_RESPONSE_BYTES; los archivos restantes se
+    listan en 'deferred' para que el cliente los solicite en otra consulta.
+    """
+    files = [file.strip() for file in files_param.split(',') if file.strip()]
+    if not files:
+        logger.error("El parámetro 'files' no contiene archivos.")
+        return Response(
+            status_code=400,
+            message="El parámetro 'files' debe contener al menos un archivo."
+        ).to_dict()
+    if len(files) > MAX_BATCH_FILES:
+        logger.error(f"Se solicitaron {len(files)} archivos, el máximo es {MAX_BATCH_FILES}.")
+        return Response(
+            status_code=400,
+            message=f"El parámetro 'files' admite como máximo {MAX_BATCH_FILES} archivos."
+        ).to_dict()
+
+    sub_user = (
+        event.get('requestContext', {})
+        .get('authorizer', {})
+        .get('claims', {})
+        .get('sub')
+    )
+    if not sub_user:
+        logger.error("El identificador del usuario (sub) no se encontró en los claims.")
+        return Response(
+            status_code=400,
+            message="El identificador del usuario es obligatorio."
+        ).to_dict()
+
+    fields, invalid_response = _parse_fields_param(parameters)
+    if invalid_response:
+        return invalid_response
+
+    user_operation = f"{sub_user}#{name_operation}"
+    response_service_bd = get_db_data_batch(db_name=BD_NAME, user_operation=user_operation, files=files, fields=fields)
+    if response_service_bd.get("status") != "success":
+        logger.error(f"Error en la consulta por lotes: {response_service_bd.get('message')}")
+        return Response(
+            status_code=500,
+            message=response_service_bd.get("message"),
+            body={"error": response_service_bd.get("error")}
+        ).to_dict()
+
+    results = []
+    deferred = []
+    response_bytes = 0
+    for file, result in response_service_bd["data"].items():
+        if deferred:
+            deferred.append(file)
+            continue
+        entry = {"file": file, "status": result["status"]}
+        if result["status"] == "success":
+            entry["data"] = result["data"]
+        else:
+            entry["message"] = result.get("message")
+            if result.get("missing_fields"):
+                entry["missing_fields"] = result["missing_fields"]
+
+        entry_bytes = len(dumps(entry).encode('utf-8'))
+        if entry_bytes > MAX_BATCH_RESPONSE_BYTES:
+            # El archivo no cabe ni en una respuesta propia: se pide reducirlo con 'fields'
+            entry = {
+                "file": file,
+                "status": "too_large",
+                "message": "La data del archivo excede el tamaño máximo de la respuesta; use 'fields'."
+            }
+            entry_bytes = len(dumps(entry).encode('utf-8'))
+        if results and response_bytes + entry_bytes > MAX_BATCH_RESPONSE_BYTES:
+            deferred.append(file)
+            continue
+        response_bytes += entry_bytes
+        results.append(entry)
+
+    if deferred:
+        logger.info(f"{len(deferred)} archivos diferidos por el tamaño de la respuesta.")
+
+    return Response(
+        status_code=200,
+        body={"files": results, "deferred": deferred},
+        accept_encoding=get_accept_encoding(event)
+    ).to_dict()
+
 
 if __name__ == "__main__":
     # test_event = {
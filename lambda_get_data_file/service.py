@@ -1,14 +1,16 @@
-import boto3
 import logging
-from decimal import Decimal
 from botocore.exceptions import ClientError
+from shared.aws_clients import get_client, get_table
+from shared.dynamodb_batch import batch_get_items
+from shared.dynamodb_json import DYNAMODB_RAW_READS, transcode
+from shared.projection import attribute_exists, build_projection, find_missing
 
 # Configuración básica del logger
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
-def get_db_data(db_name: str, user_operation: str, file: str) -> dict:
+def get_db_data(db_name: str, user_operation: str, file: str, fields: list = None, raw: bool = DYNAMODB_RAW_READS) -> dict:
     """
     Obtiene el valor de la columna 'data' de un elemento en DynamoDB.
 
@@ -16,6 +18,10 @@ def get_db_data(db_name: str, user_operation: str, file: str) -> dict:
       db_name (str): Nombre de la tabla de DynamoDB.
       user_id (str): Valor de la clave de partición.
       operation (str): Valor de la clave de ordenamiento.
+      fields (list, opcional): Rutas de 'data' a proyectar (validadas con parse_fields).
+                               Si no se indican se retorna la columna 'data' completa.
+      raw (bool, opcional): Si es True se lee con el cliente de bajo nivel y 'data' se retorna
+                            ya serializada (RawJSON), sin pasar por el TypeDeserializer.
 
     Retorna:
       dict: Diccionario con el resultado de la operación. Ejemplo:
@@ -30,6 +36,12 @@ def get_db_data(db_name: str, user_operation: str, file: str) -> dict:
                   "status": "error",
                   "message": "Elemento no encontrado."  // o "Columna 'data' no existe en el elemento."
               }
+            En caso de que alguna de las rutas de 'fields' no exista:
+              {
+                  "status": "invalid",
+                  "message": "Campos no encontrados en la data.",
+                  "missing_fields": [<ruta>, ...]
+              }
             En caso de error:
               {
                   "status": "error",
@@ -37,16 +49,34 @@ def get_db_data(db_name: str, user_operation: str, file: str) -> dict:
                   "error": <detalle_del_error>
               }
     """
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(db_name)
+    table = get_table(db_name)
+
+    get_kwargs = {}
+    if fields:
+        # Solo se leen las rutas pedidas de 'data', junto con la clave para detectar si el elemento existe
+        projection, attribute_names = build_projection(fields, key_attributes=('file',))
+        get_kwargs['ProjectionExpression'] = projection
+        get_kwargs['ExpressionAttributeNames'] = attribute_names
 
     try:
-        response = table.get_item(
-            Key={
-                'user#operation': user_operation,
-                'file': file
-            }
-        )
+        if raw:
+            # Cliente de bajo nivel: se omite el TypeDeserializer y los Decimal intermedios
+            response = get_client('dynamodb').get_item(
+                TableName=db_name,
+                Key={
+                    'user#operation': {'S': user_operation},
+                    'file': {'S': file}
+                },
+                **get_kwargs
+            )
+        else:
+            response = table.get_item(
+                Key={
+                    'user#operation': user_operation,
+                    'file': file
+                },
+                **get_kwargs
+            )
 
         # Verifica si se encontró el elemento
         if 'Item' not in response:
@@ -58,6 +88,25 @@ def get_db_data(db_name: str, user_operation: str, file: str) -> dict:
 
         item = response['Item']
 
+        # Sin ninguna ruta proyectada 'data' no aparece: se distingue si la columna no existe
+        if fields and 'data' not in item and not attribute_exists(db_name, {'user#operation': user_operation, 'file': file}):
+            logger.warning("Columna 'data' no existe en el elemento.")
+            return {
+                "status": "error",
+                "message": "Columna 'data' no existe en el elemento."
+            }
+
+        # Verifica que existan todas las rutas solicitadas
+        if fields:
+            missing_fields = find_missing(item.get('data', {}), fields, raw=raw)
+            if missing_fields:
+                logger.warning(f"Campos no encontrados en la data: {missing_fields}")
+                return {
+                    "status": "invalid",
+                    "message": "Campos no encontrados en la data.",
+                    "missing_fields": missing_fields
+                }
+
         # Verifica si el elemento contiene la columna 'data'
         if 'data' not in item:
             logger.warning("Columna 'data' no existe en el elemento.")
@@ -71,7 +120,7 @@ def get_db_data(db_name: str, user_operation: str, file: str) -> dict:
         return {
             "status": "success",
             "message": "Data encontrada exitosamente.",
-            "data": item['data']
+            "data": transcode(item['data']) if raw else item['data']
         }
 
     except ClientError as e:
@@ -89,16 +138,100 @@ def get_db_data(db_name: str, user_operation: str, file: str) -> dict:
             "error": str(e)
         }
 
-def convert_decimal(obj):
+def get_db_data_batch(db_name: str, user_operation: str, files: list, fields: list = None) -> dict:
     """
-    Función recursiva que convierte objetos Decimal a float,
-    en listas y diccionarios.
+    Obtiene la columna 'data' de varios archivos de una operación usando BatchGetItem.
+
+    Las claves se agrupan en bloques de 100 y las 'UnprocessedKeys' se reintentan
+    con backoff exponencial y jitter.
+
+    Parámetros:
+      db_name (str): Nombre de la tabla de DynamoDB.
+      user_operation (str): Valor de la clave de partición.
+      files (list): Nombres de los archivos (clave de ordenamiento).
+      fields (list, opcional): Rutas de 'data' a proyectar (validadas con parse_fields).
+
+    Retorna:
+      dict: Diccionario con el resultado por archivo. Ejemplo:
+            {
+                "status": "success",
+                "message": "Consulta por lotes completada.",
+                "data": {
+                    "<file>": {"status": "success", "data": <valor_de_data>},
+                    "<file>": {"status": "not_found", "message": "Elemento no encontrado."},
+                    "<file>": {"status": "invalid", "message": "Campos no encontrados en la data.",
+                               "missing_fields": [<ruta>, ...]},
+                    "<file>": {"status": "error", "message": "No se pudo leer el elemento."}
+                }
+            }
+            En caso de error:
+              {
+                  "status": "error",
+                  "message": "Error al obtener la data.",
+                  "error": <detalle_del_error>
+              }
     """
-    if isinstance(obj, list):
-        return [convert_decimal(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {key: convert_decimal(value) for key, value in obj.items()}
-    elif isinstance(obj, Decimal):
-        return float(obj)
-    else:
-        return obj
\ No newline at end of file
+    unique_files = list(dict.fromkeys(files))
+
+    request_options = {}
+    if fields:
+        # La clave 'file' se proyecta siempre para asociar cada elemento con su archivo
+        projection, attribute_names = build_projection(fields, key_attributes=('file',))
+        request_options['ProjectionExpression'] = projection
+        request_options['ExpressionAttributeNames'] = attribute_names
+
+    try:
+        items, unprocessed = batch_get_items(
+            db_name,
+            [{'user#operation': user_operation, 'file': file} for file in unique_files],
+            **request_options
+        )
+        found = {item['file']: item for item in items}
+        unprocessed_files = {key['file'] for key in unprocessed}
+        # Con 'fields', 'data' falta tanto si la columna no existe como si no tiene ninguna ruta pedida
+        without_data = {
+            file for file, item in found.items()
+            if 'data' not in item and (
+                not fields or not attribute_exists(db_name, {'user#operation': user_operation, 'file': file})
+            )
+        }
+    except ClientError as e:
+        logger.error(f"Error al obtener la data por lotes: {e}")
+        return {
+            "status": "error",
+            "message": "Error al obtener la data.",
+            "error": str(e)
+        }
+    except Exception as e:
+        logger.error(f"Error inesperado al obtener la data por lotes: {e}")
+        return {
+            "status": "error",
+            "message": "Error inesperado al obtener la data.",
+            "error": str(e)
+        }
+
+    results = {}
+    for file in unique_files:
+        item = found.get(file)
+        missing_fields = find_missing(item.get('data', {}), fields) if fields and item else None
+        if file in unprocessed_files:
+            results[file] = {"status": "error", "message": "No se pudo leer el elemento."}
+        elif item is None:
+            results[file] = {"status": "not_found", "message": "Elemento no encontrado."}
+        elif file in without_data:
+            results[file] = {"status": "not_found", "message": "Columna 'data' no existe en el elemento."}
+        elif missing_fields:
+            results[file] = {
+                "status": "invalid",
+                "message": "Campos no encontrados en la data.",
+                "missing_fields": missing_fields
+            }
+        else:
+            results[file] = {"status": "success", "data": item['data']}
+
+    logger.info(f"Consulta por lotes completada: {len(found)} de {len(unique_files)} archivos encontrados.")
+    return {
+        "status": "success",
+        "message": "Consulta por lotes completada.",
+        "data": results
+    }
@@ -0,0 +1,131 @@
+import json
+import pytest
+from botocore.stub import ANY, Stubber
+from shared.aws_clients import get_resource
+from lambda_get_data_file import handler
+
+
+@pytest.fixture
+def dynamodb():
+    stubber = Stubber(get_resource('dynamodb').meta.client)
+    with stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def _event(**parameters):
+    return {
+        'queryStringParameters': dict({'operation': 'op'}, **parameters),
+        'requestContext': {'authorizer': {'claims': {'sub': 'user-1'}}},
+    }
+
+
+def test_fields_projects_requested_paths(dynamodb):
+    dynamodb.add_response(
+        'get_item',
+        {'Item': {'file': {'S': 'a.pdf'}, 'data': {'M': {'totales': {'M': {'igv': {'N': '18'}}}}}}},
+        {
+            'TableName': 'results',
+            'Key': {'user#operation': 'user-1#op', 'file': 'a.pdf'},
+            'ProjectionExpression': '#k0, #root.#f0.#f1',
+            'ExpressionAttributeNames': {'#root': 'data', '#k0': 'file', '#f0': 'totales', '#f1': 'igv'},
+        }
+    )
+
+    response = handler.handler_function(_event(file='a.pdf', fields='totales.igv'), None)
+
+    assert response['statusCode'] == 200
+    assert json.loads(response['body']) == {'totales': {'igv': 18}}
+
+
+def test_fields_reports_missing_paths(dynamodb):
+    dynamodb.add_response('get_item', {'Item': {'file': {'S': 'a.pdf'}, 'data': {'M': {}}}}, {
+        'TableName': 'results', 'Key': ANY, 'ProjectionExpression': ANY, 'ExpressionAttributeNames': ANY
+    })
+
+    response = handler.handler_function(_event(file='a.pdf', fields='totales'), None)
+
+    assert response['statusCode'] == 400
+    assert json.loads(response['body'])['missing_fields'] == ['totales']
+
+
+def test_fields_rejects_invalid_paths():
+    response = handler.handler_function(_event(file='a.pdf', fields='a[0]'), None)
+
+    assert response['statusCode'] == 400
+    assert json.loads(response['body'])['invalid_fields'] == ['a[0]']
+
+
+def _batch_item(file: str, text: str):
+    return {'file': {'S': file}, 'data': {'M': {'text': {'S': text}}}}
+
+
+def test_batch_defers_files_over_response_limit(dynamodb, monkeypatch):
+    monkeypatch.setattr(handler, 'MAX_BATCH_RESPONSE_BYTES', 250)
+    dynamodb.add_response('batch_get_item', {
+        'Responses': {'results': [_batch_item('a.pdf', 'x' * 100), _batch_item('b.pdf', 'y' * 100),
+                                  _batch_item('c.pdf', 'z' * 10)]}
+    }, {'RequestItems': ANY})
+
+    response = handler.handler_function(_event(files='a.pdf,b.pdf,c.pdf'), None)
+
+    body = json.loads(response['body'])
+    assert [entry['file'] for entry in body['files']] == ['a.pdf']
+    assert body['deferred'] == ['b.pdf', 'c.pdf']
+
+
+def test_batch_projects_fields(dynamodb):
+    dynamodb.add_response('batch_get_item', {
+        'Responses': {'results': [{'file': {'S': 'a.pdf'}, 'data': {'M': {'totales': {'N': '1'}}}},
+                                  {'file': {'S': 'b.pdf'}, 'data': {'M': {}}}]}
+    }, {'RequestItems': {'results': {
+        'Keys': [{'user#operation': 'user-1#op', 'file': 'a.pdf'}, {'user#operation': 'user-1#op', 'file': 'b.pdf'}],
+        'ProjectionExpression': '#k0, #root.#f0',
+        'ExpressionAttributeNames': {'#root': 'data', '#k0': 'file', '#f0': 'totales'},
+    }}})
+
+    response = handler.handler_function(_event(files='a.pdf,b.pdf', fields='totales'), None)
+
+    files = json.loads(response['body'])['files']
+    assert files[0] == {'file': 'a.pdf', 'status': 'success', 'data': {'totales': 1}}
+    assert files[1]['status'] == 'invalid' and files[1]['missing_fields'] == ['totales']
+
+
+def _count_query(dynamodb, count: int):
+    dynamodb.add_response('query', {'Count': count, 'ScannedCount': 1}, {
+        'TableName': 'results', 'KeyConditionExpression': ANY, 'FilterExpression': ANY, 'Select': 'COUNT'
+    })
+
+
+def test_fields_on_item_without_data_returns_not_found(dynamodb):
+    dynamodb.add_response('get_item', {'Item': {'file': {'S': 'a.pdf'}}}, {
+        'TableName': 'results', 'Key': ANY, 'ProjectionExpression': ANY, 'ExpressionAttributeNames': ANY
+    })
+    _count_query(dynamodb, 0)
+
+    response = handler.handler_function(_event(file='a.pdf', fields='totales'), None)
+
+    assert response['statusCode'] == 404
+
+
+def test_fields_all_missing_still_reports_missing_paths(dynamodb):
+    dynamodb.add_response('get_item', {'Item': {'file': {'S': 'a.pdf'}}}, {
+        'TableName': 'results', 'Key': ANY, 'ProjectionExpression': ANY, 'ExpressionAttributeNames': ANY
+    })
+    _count_query(dynamodb, 1)
+
+    response = handler.handler_function(_event(file='a.pdf', fields='totales'), None)
+
+    assert response['statusCode'] == 400
+    assert json.loads(response['body'])['missing_fields'] == ['totales']
+
+
+def test_batch_fields_on_item_without_data_returns_not_found(dynamodb):
+    dynamodb.add_response('batch_get_item', {
+        'Responses': {'results': [{'file': {'S': 'a.pdf'}}]}
+    }, {'RequestItems': ANY})
+    _count_query(dynamodb, 0)
+
+    response = handler.handler_function(_event(files='a.pdf', fields='totales'), None)
+
+    assert json.loads(response['body'])['files'][0]['status'] == 'not_found'
@@ -1,7 +1,9 @@
 import logging
 import os
+from shared.compression import get_accept_encoding
 from .response import Response
-from .service import get_db_data,convert_decimal
+from shared.projection import parse_fields
+from .service import get_db_data
 
 
 logger = logging.getLogger(__name__)
@@ -14,6 +16,7 @@ def handler_function(event, context):
     Función handler para obtener la columna 'data' de una operación.
     Se espera que el evento incluya:
       - operacion: el nombre de la operación.
+      - fields (opcional, query string): rutas de 'data' a retornar, separadas por comas.
       - El identificador del usuario (sub) se obtiene desde los claims del Authorizer de Cognito.
 
     Devuelve una respuesta formateada utilizando el objeto Response.
@@ -51,16 +54,36 @@ def handler_function(event, context):
                 message="El identificador del usuario es obligatorio."
             ).to_dict()
 
+        # Validar las rutas de 'data' solicitadas (opcional)
+        fields = None
+        fields_param = (event.get('queryStringParameters') or {}).get('fields')
+        if fields_param:
+            fields, invalid_fields = parse_fields(fields_param)
+            if invalid_fields or not fields:
+                logger.error(f"Campos inválidos en 'fields': {invalid_fields}")
+                return Response(
+                    status_code=400,
+                    message="El parámetro 'fields' contiene rutas inválidas.",
+                    body={"invalid_fields": invalid_fields}
+                ).to_dict()
+
         # Consultar la columna 'data' utilizando la función get_db_data
-        response_service_bd = get_db_data(db_name=BD_NAME, user_id=sub_user, operation=name_operation)
+        response_service_bd = get_db_data(db_name=BD_NAME, user_id=sub_user, operation=name_operation, fields=fields)
 
         # Evaluar la respuesta de get_db_data y retornar la respuesta formateada
         if response_service_bd.get("status") == "success":
             logger.info("Data encontrada exitosamente.")
-            data_converted = convert_decimal(response_service_bd.get("data"))
             return Response(
                 status_code=200,
-                body=data_converted
+                body=response_service_bd.get("data"),
+                accept_encoding=get_accept_encoding(event)
+            ).to_dict()
+        elif response_service_bd.get("status") == "invalid":
+            logger.info(f"Campos no encontrados: {response_service_bd.get('missing_fields')}")
+            return Response(
+                status_code=400,
+                message=response_service_bd.get("message"),
+                body={"missing_fields": response_service_bd.get("missing_fields")}
             ).to_dict()
         else:
             # Puede ser que la operación no exista o que la columna 'data' no se encuentre en el registro
@@ -1,13 +1,14 @@
-import boto3
 import logging
 from botocore.exceptions import ClientError
-from decimal import Decimal
+from shared.aws_clients import get_client, get_table
+from shared.dynamodb_json import DYNAMODB_RAW_READS, transcode
+from shared.projection import attribute_exists, build_projection, find_missing
 # Configuración básica del logger
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
-def get_db_data(db_name: str, user_id: str, operation: str) -> dict:
+def get_db_data(db_name: str, user_id: str, operation: str, fields: list = None, raw: bool = DYNAMODB_RAW_READS) -> dict:
     """
     Obtiene el valor de la columna 'data' de un elemento en DynamoDB.
 
@@ -15,6 +16,10 @@ def get_db_data(db_name: str, user_id: str, operation: str) -> dict:
       db_name (str): Nombre de la tabla de DynamoDB.
       user_id (str): Valor de la clave de partición.
       operation (str): Valor de la clave de ordenamiento.
+      fields (list, opcional): Rutas de 'data' a proyectar (validadas con parse_fields).
+                               Si no se indican se retorna la columna 'data' completa.
+      raw (bool, opcional): Si es True se lee con el cliente de bajo nivel y 'data' se retorna
+                            ya serializada (RawJSON), sin pasar por el TypeDeserializer.
 
     Retorna:
       dict: Diccionario con el resultado de la operación. Ejemplo:
@@ -29,6 +34,12 @@ def get_db_data(db_name: str, user_id: str, operation: str) -> dict:
                   "status": "error",
                   "message": "Elemento no encontrado."  // o "Columna 'data' no existe en el elemento."
               }
+            En caso de que alguna de las rutas de 'fields' no exista:
+              {
+                  "status": "invalid",
+                  "message": "Campos no encontrados en la data.",
+                  "missing_fields": [<ruta>, ...]
+              }
             En caso de error:
               {
                   "status": "error",
@@ -36,16 +47,34 @@ def get_db_data(db_name: str, user_id: str, operation: str) -> dict:
                   "error": <detalle_del_error>
               }
     """
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(db_name)
+    table = get_table(db_name)
+
+    get_kwargs = {}
+    if fields:
+        # Solo se leen las rutas pedidas de 'data', junto con la clave para detectar si el elemento existe
+        projection, attribute_names = build_projection(fields, key_attributes=('operation',))
+        get_kwargs['ProjectionExpression'] = projection
+        get_kwargs['ExpressionAttributeNames'] = attribute_names
 
     try:
-        response = table.get_item(
-            Key={
-                'user_id': user_id,
-                'operation': operation
-            }
-        )
+        if raw:
+            # Cliente de bajo nivel: se omite el TypeDeserializer y los Decimal intermedios
+            response = get_client('dynamodb').get_item(
+                TableName=db_name,
+                Key={
+                    'user_id': {'S': user_id},
+                    'operation': {'S': operation}
+                },
+                **get_kwargs
+            )
+        else:
+            response = table.get_item(
+                Key={
+                    'user_id': user_id,
+                    'operation': operation
+                },
+                **get_kwargs
+            )
 
         # Verifica si se encontró el elemento
         if 'Item' not in response:
@@ -57,6 +86,25 @@ def get_db_data(db_name: str, user_id: str, operation: str) -> dict:
 
         item = response['Item']
 
+        # Sin ninguna ruta proyectada 'data' no aparece: se distingue si la columna no existe
+        if fields and 'data' not in item and not attribute_exists(db_name, {'user_id': user_id, 'operation': operation}):
+            logger.warning("Columna 'data' no existe en el elemento.")
+            return {
+                "status": "error",
+                "message": "Columna 'data' no existe en el elemento."
+            }
+
+        # Verifica que existan todas las rutas solicitadas
+        if fields:
+            missing_fields = find_missing(item.get('data', {}), fields, raw=raw)
+            if missing_fields:
+                logger.warning(f"Campos no encontrados en la data: {missing_fields}")
+                return {
+                    "status": "invalid",
+                    "message": "Campos no encontrados en la data.",
+                    "missing_fields": missing_fields
+                }
+
         # Verifica si el elemento contiene la columna 'data'
         if 'data' not in item:
             logger.warning("Columna 'data' no existe en el elemento.")
@@ -70,7 +118,7 @@ def get_db_data(db_name: str, user_id: str, operation: str) -> dict:
         return {
             "status": "success",
             "message": "Data encontrada exitosamente.",
-            "data": item['data']
+            "data": transcode(item['data']) if raw else item['data']
         }
 
     except ClientError as e:
@@ -87,18 +135,3 @@ def get_db_data(db_name: str, user_id: str, operation: str) -> dict:
             "message": "Error inesperado al obtener la data.",
             "error": str(e)
         }
-
-
-def convert_decimal(obj):
-    """
-    Función recursiva que convierte objetos Decimal a float,
-    en listas y diccionarios.
-    """
-    if isinstance(obj, list):
-        return [convert_decimal(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {key: convert_decimal(value) for key, value in obj.items()}
-    elif isinstance(obj, Decimal):
-        return float(obj)
-    else:
-        return obj
\ No newline at end of file
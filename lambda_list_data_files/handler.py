@@ -0,0 +1,108 @@
+import logging
+import os
+from shared.compression import get_accept_encoding
+from .response import Response
+from .service import list_files_db
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+BD_NAME = os.environ['RESULT_TABLE']  # Cambiar en deploy
+# Tamaño de página por defecto y máximo del listado
+DEFAULT_PAGE_SIZE = int(os.environ.get('LIST_DEFAULT_PAGE_SIZE', '50'))
+MAX_PAGE_SIZE = int(os.environ.get('LIST_MAX_PAGE_SIZE', '500'))
+
+
+def handler_function(event, context):
+    """
+    Función handler para listar los archivos asociados a una operación.
+    Se espera que el evento incluya:
+      - operation: el nombre de la operación.
+      - limit (opcional): tamaño de página.
+      - cursor (opcional): cursor retornado por la página anterior.
+      - El identificador del usuario (sub) se obtiene desde los claims del Authorizer de Cognito.
+
+    Devuelve una respuesta formateada utilizando el objeto Response.
+    """
+    try:
+        parameters = event.get('queryStringParameters',{})
+        if not parameters:
+            logger.error("No se encontró los parametros de la solicitud.")
+            return Response(
+                status_code=400,
+                message="Los parametros de la solicitud son obligatorios."
+            ).to_dict()
+
+        # Extraer el nombre de la operación y validarlo
+        name_operation = parameters.get('operation')
+        if not name_operation:
+            logger.error("El nombre de la operación es obligatorio.")
+            return Response(
+                status_code=400,
+                message="El nombre de la operación es obligatorio."
+            ).to_dict()
+
+        # Extraer y validar el tamaño de página
+        try:
+            limit = int(parameters.get('limit') or DEFAULT_PAGE_SIZE)
+        except ValueError:
+            limit = 0
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            logger.error(f"Tamaño de página inválido: {parameters.get('limit')}")
+            return Response(
+                status_code=400,
+                message=f"El parámetro 'limit' debe estar entre 1 y {MAX_PAGE_SIZE}."
+            ).to_dict()
+
+        # Extraer el identificador del usuario (sub) desde los claims del Authorizer de Cognito
+        sub_user = (
+            event.get('requestContext', {})
+                 .get('authorizer', {})
+                 .get('claims', {})
+                 .get('sub')
+        )
+        if not sub_user:
+            logger.error("El identificador del usuario (sub) no se encontró en los claims.")
+            return Response(
+                status_code=400,
+                message="El identificador del usuario es obligatorio."
+            ).to_dict()
+
+        user_operation = f"{sub_user}#{name_operation}"
+        response_service_bd = list_files_db(
+            db_name=BD_NAME,
+            user_operation=user_operation,
+            limit=limit,
+            cursor=parameters.get('cursor')
+        )
+
+        if response_service_bd.get("status") == "success":
+            data = response_service_bd.get("data")
+            return Response(
+                status_code=200,
+                body={
+                    "items": data["items"],
+                    "cursor": data["cursor"]
+                },
+                accept_encoding=get_accept_encoding(event)
+            ).to_dict()
+        elif response_service_bd.get("status") == "invalid":
+            return Response(
+                status_code=400,
+                message=response_service_bd.get("message")
+            ).to_dict()
+        else:
+            logger.error(f"Error al listar los archivos: {response_service_bd.get('message')}")
+            return Response(
+                status_code=500,
+                message=response_service_bd.get("message"),
+                body={"error": response_service_bd.get("error")}
+            ).to_dict()
+
+    except Exception as e:
+        logger.error(f"Error inesperado en el handler: {e}")
+        return Response(
+            status_code=500,
+            message="Error inesperado en el handler.",
+            body={"error": str(e)}
+        ).to_dict()
@@ -0,0 +1,114 @@
+import os
+import json
+import base64
+import logging
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from shared.aws_clients import get_table
+
+# Configuración básica del logger
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Atributos de metadatos retornados por el listado (nunca la columna pesada 'data')
+LIST_ATTRIBUTES = [
+    attribute.strip()
+    for attribute in os.environ.get('LIST_ATTRIBUTES', 'file,status,version').split(',')
+    if attribute.strip()
+]
+
+
+def encode_cursor(last_evaluated_key: dict) -> str:
+    """
+    Codifica el LastEvaluatedKey de DynamoDB como un cursor opaco.
+    """
+    raw = json.dumps(last_evaluated_key, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, user_operation: str) -> dict:
+    """
+    Decodifica un cursor opaco y valida que pertenezca a la partición consultada.
+
+    :raises ValueError: Si el cursor es inválido o corresponde a otra partición.
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(cursor + padding).decode('utf-8'))
+    except Exception:
+        raise ValueError("El cursor no es válido.")
+    if not isinstance(key, dict) or key.get('user#operation') != user_operation or 'file' not in key:
+        raise ValueError("El cursor no es válido.")
+    return key
+
+
+def list_files_db(db_name: str, user_operation: str, limit: int, cursor: str = None) -> dict:
+    """
+    Lista los archivos de una operación en DynamoDB, paginando con un cursor opaco.
+
+    Parámetros:
+      db_name (str): Nombre de la tabla en DynamoDB.
+      user_operation (str): Valor de la clave de partición que identifica la operación de usuario.
+      limit (int): Número máximo de elementos por página.
+      cursor (str, opcional): Cursor retornado por la página anterior.
+
+    Retorna:
+      dict: Diccionario con el resultado de la operación. Ejemplo:
+            {
+                "status": "success",
+                "message": "Archivos listados correctamente.",
+                "data": {"items": [...], "cursor": <cursor_siguiente_o_None>}
+            }
+            o, en caso de error:
+            {
+                "status": "error",
+                "message": "Error al listar los archivos.",
+                "error": <detalle_del_error>
+            }
+    """
+    table = get_table(db_name)
+
+    # Se usan alias porque 'file' y 'status' son palabras reservadas de DynamoDB
+    attribute_names = {f"#a{i}": attribute for i, attribute in enumerate(LIST_ATTRIBUTES)}
+    query_kwargs = {
+        'KeyConditionExpression': Key('user#operation').eq(user_operation),
+        'ProjectionExpression': ', '.join(attribute_names.keys()),
+        'ExpressionAttributeNames': attribute_names,
+        'Limit': limit
+    }
+
+    try:
+        if cursor:
+            query_kwargs['ExclusiveStartKey'] = decode_cursor(cursor, user_operation)
+
+        response = table.query(**query_kwargs)
+        last_key = response.get('LastEvaluatedKey')
+        logger.info(f"Archivos listados correctamente: {response.get('Count', 0)} elementos.")
+        return {
+            "status": "success",
+            "message": "Archivos listados correctamente.",
+            "data": {
+                "items": response.get('Items', []),
+                "cursor": encode_cursor(last_key) if last_key else None
+            }
+        }
+    except ValueError as e:
+        logger.warning(f"Cursor inválido: {e}")
+        return {
+            "status": "invalid",
+            "message": str(e)
+        }
+    except ClientError as e:
+        logger.error(f"Error al listar los archivos: {e}")
+        return {
+            "status": "error",
+            "message": "Error al listar los archivos.",
+            "error": str(e)
+        }
+    except Exception as e:
+        logger.error(f"Error inesperado al listar los archivos: {e}")
+        return {
+            "status": "error",
+            "message": "Error inesperado al listar los archivos.",
+            "error": str(e)
+        }
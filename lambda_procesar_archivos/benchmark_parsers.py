@@ -0,0 +1,90 @@
+"""
+Memoria pico y throughput de los parsers sobre hojas de cálculo de varios MB.
+
+Compara la lectura en streaming de parse_file (openpyxl en modo solo lectura) con la carga completa
+del libro, que es lo que se evita. La memoria se mide con tracemalloc (asignaciones de Python).
+
+Uso: python -m lambda_procesar_archivos.benchmark_parsers [filas] [columnas]
+"""
+import os
+import sys
+import time
+import zipfile
+import tempfile
+import tracemalloc
+from .parsers import openpyxl, parse_file
+
+MAX_DATA_BYTES = 350000
+
+
+def generate_xlsx(path: str, rows: int, columns: int = 10):
+    """
+    Escribe un libro .xlsx sintético (texto, enteros y decimales) en modo de solo escritura.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('datos')
+    sheet.append([f"columna_{column}" for column in range(columns)])
+    for row in range(rows):
+        sheet.append([
+            f"texto {row}-{column}" if column % 3 == 0 else row * column if column % 3 == 1 else row / (column + 1)
+            for column in range(columns)
+        ])
+    workbook.save(path)
+
+
+def generate_docx(path: str, paragraphs: int):
+    """
+    Escribe un .docx mínimo con el número de párrafos indicado.
+    """
+    body = ''.join(
+        f'<w:p><w:r><w:t>Párrafo {index} con texto de relleno para el benchmark.</w:t></w:r></w:p>'
+        for index in range(paragraphs)
+    )
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as document:
+        document.writestr('word/document.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>'
+        ))
+
+
+def _full_load(path: str):
+    workbook = openpyxl.load_workbook(path, data_only=True)
+    rows = sum(1 for sheet in workbook.worksheets for _ in sheet.iter_rows(values_only=True))
+    workbook.close()
+    return rows
+
+
+def _measure(function, path: str) -> dict:
+    size = os.path.getsize(path)
+    # tracemalloc ralentiza mucho la lectura: el tiempo y la memoria se miden en pasadas separadas
+    started = time.perf_counter()
+    function(path)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    function(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': elapsed, 'mb_per_second': size / 1e6 / elapsed, 'peak_mb': peak / 1e6}
+
+
+def run(rows: int = 50000, columns: int = 10) -> dict:
+    """
+    Retorna el tamaño del archivo generado y las mediciones de cada modo de lectura.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'libro.xlsx')
+        generate_xlsx(path, rows, columns)
+        result = {'file_mb': os.path.getsize(path) / 1e6}
+        result['streaming'] = _measure(lambda local: parse_file(local, 'libro.xlsx', MAX_DATA_BYTES), path)
+        result['full_load'] = _measure(_full_load, path)
+    return result
+
+
+if __name__ == "__main__":
+    result = run(*[int(argument) for argument in sys.argv[1:3]])
+    print(f"Archivo: {result['file_mb']:.1f} MB")
+    for mode in ('streaming', 'full_load'):
+        values = result[mode]
+        print(f"{mode}: {values['seconds']:.2f} s, {values['mb_per_second']:.2f} MB/s, "
+              f"memoria pico {values['peak_mb']:.1f} MB")
@@ -0,0 +1,33 @@
+import logging
+import os
+from urllib.parse import unquote_plus
+from .service import ingest_object
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+BD_NAME = os.environ['RESULT_TABLE']
+
+
+def handler_function(event, context):
+    """
+    Lambda disparada por S3 (ObjectCreated) que extrae la data de los archivos subidos
+    (XLSX, XLS, DOCX y PDF) y la guarda en la tabla de resultados.
+
+    Los errores de S3 o DynamoDB se propagan para que Lambda reintente el evento.
+    """
+    results = []
+    for record in event.get('Records', []):
+        s3_info = record.get('s3', {})
+        bucket = s3_info.get('bucket', {}).get('name')
+        # Las claves llegan codificadas como URL en los eventos de S3
+        key = unquote_plus(s3_info.get('object', {}).get('key', ''))
+        if not bucket or not key:
+            logger.warning("Registro de S3 sin bucket o clave; se omite.")
+            continue
+        # Las copias del lado del servidor (deduplicación) reutilizan el resultado de su origen
+        copied = record.get('eventName', '').endswith(':Copy')
+        results.append(ingest_object(BD_NAME, bucket, key, copied=copied))
+
+    logger.info(f"Archivos procesados: {len(results)}")
+    return {"results": results}
@@ -0,0 +1,227 @@
+import math
+import zipfile
+import datetime
+from decimal import Decimal
+from xml.etree.ElementTree import iterparse
+from shared.serializer import dumps
+
+# Librerías de lectura opcionales: sin ellas el formato correspondiente no se procesa
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+try:
+    import xlrd
+except ImportError:
+    xlrd = None
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class ParserUnavailableError(RuntimeError):
+    """
+    La librería necesaria para leer el formato no está instalada.
+    """
+
+
+class _Budget:
+    """
+    Limita el tamaño (en bytes de JSON) de la data extraída para que el elemento quepa en DynamoDB.
+
+    Una vez agotado el presupuesto se sigue leyendo el archivo para contar filas o páginas,
+    pero ya no se guarda su contenido.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.remaining = max_bytes
+        self.truncated = False
+
+    def take(self, value) -> bool:
+        if self.truncated:
+            return False
+        size = len(dumps(value))
+        if size > self.remaining:
+            self.truncated = True
+            return False
+        self.remaining -= size
+        return True
+
+
+def _to_item_value(value):
+    """
+    Convierte el valor de una celda a un tipo que DynamoDB acepta.
+    """
+    if value is None or isinstance(value, (bool, str, int, Decimal)):
+        return value
+    if isinstance(value, float):
+        return Decimal(repr(value)) if math.isfinite(value) else str(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _clean_row(values) -> list:
+    row = [_to_item_value(value) for value in values]
+    while row and row[-1] in (None, ''):
+        row.pop()
+    return row
+
+
+def _sheets_result(file_format: str, sheets, budget: _Budget) -> dict:
+    """
+    Consume las hojas (nombre, iterador de filas) guardando las filas que caben en el presupuesto.
+
+    'row_count' del resultado es el total de filas de todas las hojas, para que el resumen lo
+    lea sin proyectar las filas.
+    """
+    result_sheets = []
+    for name, rows in sheets:
+        sheet = {"name": name, "row_count": 0, "rows": []}
+        for values in rows:
+            row = _clean_row(values)
+            if not row:
+                continue
+            sheet["row_count"] += 1
+            if budget.take(row):
+                sheet["rows"].append(row)
+        result_sheets.append(sheet)
+    return {
+        "format": file_format,
+        "row_count": sum(sheet["row_count"] for sheet in result_sheets),
+        "sheets": result_sheets,
+        "truncated": budget.truncated
+    }
+
+
+def parse_xlsx(path: str, budget: _Budget) -> dict:
+    """
+    Lee un libro .xlsx en modo solo lectura: las filas se recorren sin cargar el libro en memoria.
+    """
+    if openpyxl is None:
+        raise ParserUnavailableError("openpyxl no está instalado.")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        return _sheets_result(
+            'xlsx',
+            ((sheet.title, sheet.iter_rows(values_only=True)) for sheet in workbook.worksheets),
+            budget
+        )
+    finally:
+        workbook.close()
+
+
+def _xls_rows(book, sheet):
+    for index in range(sheet.nrows):
+        yield [
+            xlrd.xldate_as_datetime(cell.value, book.datemode) if cell.ctype == xlrd.XL_CELL_DATE else cell.value
+            for cell in sheet.row(index)
+        ]
+
+
+def _xls_sheets(book):
+    for name in book.sheet_names():
+        sheet = book.sheet_by_name(name)
+        yield name, _xls_rows(book, sheet)
+        # Con on_demand cada hoja se libera antes de cargar la siguiente
+        book.unload_sheet(name)
+
+
+def parse_xls(path: str, budget: _Budget) -> dict:
+    """
+    Lee un libro .xls hoja por hoja (el archivo se mapea en memoria y las hojas se cargan bajo demanda).
+    """
+    if xlrd is None:
+        raise ParserUnavailableError("xlrd no está instalado.")
+    book = xlrd.open_workbook(path, on_demand=True)
+    try:
+        return _sheets_result('xls', _xls_sheets(book), budget)
+    finally:
+        book.release_resources()
+
+
+def parse_docx(path: str, budget: _Budget) -> dict:
+    """
+    Extrae los párrafos de un .docx recorriendo 'word/document.xml' de forma incremental.
+    """
+    paragraphs = []
+    paragraph_count = 0
+    parts = []
+    with zipfile.ZipFile(path) as document, document.open('word/document.xml') as xml:
+        for _, element in iterparse(xml, events=('end',)):
+            if element.tag == WORD_NAMESPACE + 't':
+                parts.append(element.text or '')
+            elif element.tag == WORD_NAMESPACE + 'tab':
+                parts.append('\t')
+            elif element.tag == WORD_NAMESPACE + 'p':
+                text = ''.join(parts).strip()
+                parts = []
+                element.clear()
+                if not text:
+                    continue
+                paragraph_count += 1
+                if budget.take(text):
+                    paragraphs.append(text)
+    return {
+        "format": "docx",
+        "paragraph_count": paragraph_count,
+        "paragraphs": paragraphs,
+        "truncated": budget.truncated
+    }
+
+
+def parse_pdf(path: str, budget: _Budget) -> dict:
+    """
+    Extrae el texto de un PDF página por página.
+    """
+    if pypdf is None:
+        raise ParserUnavailableError("pypdf no está instalado.")
+    reader = pypdf.PdfReader(path)
+    pages = []
+    page_count = 0
+    for page in reader.pages:
+        page_count += 1
+        if budget.truncated:
+            continue
+        text = (page.extract_text() or '').strip()
+        if budget.take(text):
+            pages.append(text)
+    return {"format": "pdf", "page_count": page_count, "pages": pages, "truncated": budget.truncated}
+
+
+PARSERS = {
+    '.xlsx': parse_xlsx,
+    '.xls': parse_xls,
+    '.docx': parse_docx,
+    '.pdf': parse_pdf,
+}
+
+
+def get_parser(file_name: str):
+    """
+    Retorna el parser correspondiente a la extensión del archivo, o None si no está soportada.
+    """
+    extension = '.' + file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
+    return PARSERS.get(extension)
+
+
+def parse_file(path: str, file_name: str, max_bytes: int) -> dict:
+    """
+    Extrae la data de un archivo descargado localmente.
+
+    :param path: Ruta local del archivo.
+    :param file_name: Nombre original (determina el formato).
+    :param max_bytes: Tamaño máximo aproximado de la data extraída.
+    :return: Data extraída, con "truncated": True si no cupo completa.
+    :raises ValueError: Si el formato no está soportado.
+    :raises ParserUnavailableError: Si falta la librería del formato.
+    """
+    parser = get_parser(file_name)
+    if parser is None:
+        raise ValueError(f"Formato no soportado: '{file_name}'.")
+    return parser(path, _Budget(max_bytes))
@@ -0,0 +1,149 @@
+import os
+import logging
+import tempfile
+from datetime import datetime, timezone
+from botocore.exceptions import ClientError
+from shared.aws_clients import get_client, get_table
+from .parsers import ParserUnavailableError, get_parser, parse_file
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+# Tamaño máximo (bytes de JSON) de la data extraída; un elemento de DynamoDB admite hasta 400 KB
+INGEST_MAX_DATA_BYTES = int(os.environ.get('INGEST_MAX_DATA_BYTES', '350000'))
+
+# Metadato con el que lambda_generar_urls marca las copias de contenido ya subido
+COPY_SOURCE_METADATA = 'dedup-source'
+
+STATUS_PROCESSED = 'processed'
+STATUS_ERROR = 'error'
+
+
+def parse_object_key(key: str):
+    """
+    Separa una clave '{sub}/{operation}/{file}' en sus partes; retorna None si no tiene ese formato.
+    """
+    parts = key.split('/', 2)
+    if len(parts) != 3 or not all(parts):
+        return None
+    return tuple(parts)
+
+
+def save_result(db_name: str, user_operation: str, file: str, status: str, data: dict = None, error: str = None) -> dict:
+    """
+    Guarda (o reemplaza) el resultado de un archivo en la tabla de resultados e incrementa su versión.
+
+    :return: Atributos del elemento tras la escritura.
+    :raises ClientError: Si DynamoDB rechaza la escritura.
+    """
+    names = {'#status': 'status', '#updated_at': 'updated_at', '#version': 'version'}
+    values = {
+        ':status': status,
+        ':updated_at': datetime.now(timezone.utc).isoformat(),
+        ':one': 1
+    }
+    assignments = ['#status = :status', '#updated_at = :updated_at']
+    removals = []
+    for attribute, value in (('data', data), ('error', error)):
+        names[f"#{attribute}"] = attribute
+        if value is None:
+            removals.append(f"#{attribute}")
+        else:
+            values[f":{attribute}"] = value
+            assignments.append(f"#{attribute} = :{attribute}")
+
+    expression = 'SET ' + ', '.join(assignments)
+    if removals:
+        expression += ' REMOVE ' + ', '.join(removals)
+    expression += ' ADD #version :one'
+
+    response = get_table(db_name).update_item(
+        Key={'user#operation': user_operation, 'file': file},
+        UpdateExpression=expression,
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values,
+        ReturnValues='ALL_NEW'
+    )
+    return response['Attributes']
+
+
+def reuse_copied_result(db_name: str, bucket: str, key: str, user_operation: str, file_name: str):
+    """
+    Guarda para una copia de deduplicación la data ya extraída de su objeto de origen.
+
+    El origen se lee del metadato COPY_SOURCE_METADATA de la copia. Solo se reutiliza un resultado
+    procesado del mismo usuario; en cualquier otro caso (origen aún sin procesar, con error, o un
+    objeto copiado por otro medio) el archivo se procesa normalmente.
+
+    :return: Clave del origen reutilizado, o None si hay que procesar el archivo.
+    :raises ClientError: Si falla la lectura en S3 o DynamoDB.
+    """
+    metadata = get_client('s3').head_object(Bucket=bucket, Key=key).get('Metadata', {})
+    source = parse_object_key(metadata.get(COPY_SOURCE_METADATA, ''))
+    if source is None or source[0] != user_operation.split('#', 1)[0]:
+        return None
+    source_user, source_operation, source_file = source
+    item = get_table(db_name).get_item(
+        Key={'user#operation': f"{source_user}#{source_operation}", 'file': source_file}
+    ).get('Item')
+    if not item or item.get('status') != STATUS_PROCESSED or 'data' not in item:
+        return None
+    save_result(db_name, user_operation, file_name, STATUS_PROCESSED, data=item['data'])
+    return '/'.join(source)
+
+
+def ingest_object(db_name: str, bucket: str, key: str, copied: bool = False) -> dict:
+    """
+    Descarga un archivo subido, extrae su data y la guarda en la tabla de resultados.
+
+    El archivo se descarga por partes a un temporal en /tmp y los parsers lo leen de forma
+    incremental, por lo que la memoria usada no depende del tamaño del archivo.
+
+    Parámetros:
+      db_name (str): Nombre de la tabla de resultados.
+      bucket (str): Bucket de S3.
+      key (str): Clave del objeto, con formato '{sub}/{operation}/{file}'.
+      copied (bool): El evento es 'ObjectCreated:Copy'; se intenta reutilizar el resultado del origen.
+
+    Retorna:
+      dict: {"status": "processed" | "error" | "skipped", ...}. Los errores de lectura del archivo
+            quedan registrados en el elemento con "status": "error".
+
+    Raises:
+      botocore.exceptions.ClientError: Si falla la descarga o la escritura, para que Lambda reintente.
+    """
+    parsed_key = parse_object_key(key)
+    if parsed_key is None:
+        logger.warning(f"Clave ignorada (no tiene el formato sub/operation/file): {key}")
+        return {"status": "skipped", "key": key}
+    user_id, operation, file_name = parsed_key
+    if get_parser(file_name) is None:
+        logger.info(f"Formato no soportado, se omite: {key}")
+        return {"status": "skipped", "key": key}
+
+    user_operation = f"{user_id}#{operation}"
+    if copied:
+        source = reuse_copied_result(db_name, bucket, key, user_operation, file_name)
+        if source is not None:
+            logger.info(f"Resultado de '{source}' reutilizado para la copia '{key}'.")
+            return {"status": STATUS_PROCESSED, "key": key, "source": source}
+
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(file_name)[1]) as local_file:
+        get_client('s3').download_fileobj(bucket, key, local_file)
+        local_file.flush()
+        try:
+            data = parse_file(local_file.name, file_name, INGEST_MAX_DATA_BYTES)
+        except ParserUnavailableError as e:
+            logger.error(f"No se pudo procesar '{key}': {e}")
+            save_result(db_name, user_operation, file_name, STATUS_ERROR, error=str(e))
+            return {"status": STATUS_ERROR, "key": key, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Archivo ilegible '{key}': {e}", exc_info=True)
+            save_result(db_name, user_operation, file_name, STATUS_ERROR, error="No se pudo leer el archivo.")
+            return {"status": STATUS_ERROR, "key": key, "error": str(e)}
+
+    save_result(db_name, user_operation, file_name, STATUS_PROCESSED, data=data)
+    if data.get("truncated"):
+        logger.warning(f"La data de '{key}' superó {INGEST_MAX_DATA_BYTES} bytes y se guardó truncada.")
+    logger.info(f"Archivo procesado: {key}")
+    return {"status": STATUS_PROCESSED, "key": key}
@@ -0,0 +1,73 @@
+import datetime
+from decimal import Decimal
+import pytest
+from shared.serializer import dumps
+from lambda_procesar_archivos import benchmark_parsers, parsers
+from lambda_procesar_archivos.parsers import _Budget, get_parser, parse_file
+
+
+def test_budget_stops_storing_once_exhausted():
+    budget = _Budget(len(dumps(['a', 'b'])) + 1)
+
+    assert budget.take(['a', 'b'])
+    assert not budget.take(['c'])
+    assert budget.truncated
+    # Una vez truncado no se guarda nada más, aunque quepa
+    assert not budget.take('')
+
+
+def test_cell_values_are_converted_for_dynamodb():
+    row = parsers._clean_row([1.5, float('nan'), datetime.date(2024, 1, 2), True, None, ''])
+
+    assert row == [Decimal('1.5'), 'nan', '2024-01-02', True]
+
+
+def test_get_parser_uses_extension():
+    assert get_parser('Libro.XLSX') is parsers.parse_xlsx
+    assert get_parser('informe.pdf') is parsers.parse_pdf
+    assert get_parser('sin_extension') is None
+
+    with pytest.raises(ValueError):
+        parse_file('/tmp/x.txt', 'x.txt', 1000)
+
+
+def test_docx_paragraphs_are_counted_beyond_the_budget(tmp_path):
+    path = str(tmp_path / 'documento.docx')
+    benchmark_parsers.generate_docx(path, 50)
+
+    data = parse_file(path, 'documento.docx', 500)
+
+    assert data['format'] == 'docx'
+    assert data['paragraph_count'] == 50
+    assert data['truncated'] is True
+    assert 0 < len(data['paragraphs']) < 50
+    assert len(dumps(data['paragraphs'])) <= 500
+
+
+def test_xlsx_rows_are_streamed_and_counted(tmp_path):
+    pytest.importorskip('openpyxl')
+    path = str(tmp_path / 'libro.xlsx')
+    benchmark_parsers.generate_xlsx(path, rows=200, columns=4)
+
+    complete = parse_file(path, 'libro.xlsx', 10 ** 6)
+    truncated = parse_file(path, 'libro.xlsx', 1000)
+
+    assert complete['row_count'] == truncated['row_count'] == 201
+    assert complete['truncated'] is False and len(complete['sheets'][0]['rows']) == 201
+    assert complete['sheets'][0]['rows'][1] == ['texto 0-0', 0, Decimal('0.0'), 'texto 0-3']
+    assert truncated['truncated'] is True and len(truncated['sheets'][0]['rows']) < 201
+
+
+def test_missing_library_raises_parser_unavailable(monkeypatch, tmp_path):
+    monkeypatch.setattr(parsers, 'pypdf', None)
+
+    with pytest.raises(parsers.ParserUnavailableError):
+        parse_file(str(tmp_path / 'a.pdf'), 'a.pdf', 1000)
+
+
+def test_benchmark_runs():
+    pytest.importorskip('openpyxl')
+
+    result = benchmark_parsers.run(rows=200, columns=4)
+
+    assert result['streaming']['peak_mb'] > 0 and result['full_load']['peak_mb'] > 0
@@ -0,0 +1,52 @@
+from botocore.stub import ANY, Stubber
+from shared.aws_clients import get_client, get_resource
+from lambda_procesar_archivos import service
+
+DATA = {'M': {'format': {'S': 'pdf'}, 'page_count': {'N': '2'}, 'pages': {'L': []}, 'truncated': {'BOOL': False}}}
+
+
+def _head(s3, metadata):
+    s3.add_response('head_object', {'Metadata': metadata}, {'Bucket': 'test-bucket', 'Key': 'user-1/op2/b.pdf'})
+
+
+def _parse_not_expected(*args):
+    raise AssertionError("La copia no debe volver a procesarse.")
+
+
+def test_copies_reuse_the_source_result(monkeypatch):
+    monkeypatch.setattr(service, 'parse_file', _parse_not_expected)
+    with Stubber(get_client('s3')) as s3, Stubber(get_resource('dynamodb').meta.client) as dynamodb:
+        _head(s3, {service.COPY_SOURCE_METADATA: 'user-1/op1/a.pdf'})
+        dynamodb.add_response('get_item', {'Item': {'status': {'S': 'processed'}, 'data': DATA}}, {
+            'TableName': 'results', 'Key': {'user#operation': 'user-1#op1', 'file': 'a.pdf'}
+        })
+        dynamodb.add_response('update_item', {'Attributes': {}}, {
+            'TableName': 'results',
+            'Key': {'user#operation': 'user-1#op2', 'file': 'b.pdf'},
+            'UpdateExpression': ANY,
+            'ExpressionAttributeNames': ANY,
+            'ExpressionAttributeValues': ANY,
+            'ReturnValues': 'ALL_NEW',
+        })
+
+        result = service.ingest_object('results', 'test-bucket', 'user-1/op2/b.pdf', copied=True)
+        dynamodb.assert_no_pending_responses()
+
+    assert result == {"status": "processed", "key": "user-1/op2/b.pdf", "source": "user-1/op1/a.pdf"}
+
+
+def test_copies_without_a_processed_source_are_parsed():
+    with Stubber(get_client('s3')) as s3, Stubber(get_resource('dynamodb').meta.client) as dynamodb:
+        _head(s3, {service.COPY_SOURCE_METADATA: 'user-1/op1/a.pdf'})
+        dynamodb.add_response('get_item', {'Item': {'status': {'S': 'error'}}}, {
+            'TableName': 'results', 'Key': {'user#operation': 'user-1#op1', 'file': 'a.pdf'}
+        })
+
+        assert service.reuse_copied_result('results', 'test-bucket', 'user-1/op2/b.pdf', 'user-1#op2', 'b.pdf') is None
+
+
+def test_sources_of_other_users_are_ignored():
+    with Stubber(get_client('s3')) as s3:
+        _head(s3, {service.COPY_SOURCE_METADATA: 'user-2/op1/a.pdf'})
+
+        assert service.reuse_copied_result('results', 'test-bucket', 'user-1/op2/b.pdf', 'user-1#op2', 'b.pdf') is None
@@ -0,0 +1,107 @@
+import os
+import logging
+from shared import subscriptions
+from shared.aws_clients import get_table
+from shared.serializer import loads
+from shared.websocket_notifier import WEBSOCKET_ENDPOINT, send_to_connections
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_TABLE = os.environ.get('SUMMARY_TABLE')
+
+# Acciones del protocolo; el mensaje llega por la ruta 'action' con {"action": "action", "type": ...}
+PING = 'ping'
+SUBSCRIBE = 'subscribe'
+UNSUBSCRIBE = 'unsubscribe'
+GET_SUMMARY = 'get_summary'
+OPERATION_ACTIONS = {SUBSCRIBE, UNSUBSCRIBE, GET_SUMMARY}
+
+
+def management_endpoint(event: dict) -> str:
+    """
+    Endpoint de la API de administración para responder a la conexión del evento.
+    """
+    if WEBSOCKET_ENDPOINT:
+        return WEBSOCKET_ENDPOINT
+    request_context = event['requestContext']
+    return f"https://{request_context['domainName']}/{request_context['stage']}"
+
+
+def reply(event: dict, message: dict) -> str:
+    """
+    Envía una respuesta a la conexión que originó el evento.
+    """
+    connection_id = event['requestContext']['connectionId']
+    return send_to_connections([connection_id], message, management_endpoint(event)).get(connection_id)
+
+
+def _error(message: str, request_id=None) -> dict:
+    return {"type": "error", "message": message, "id": request_id}
+
+
+def _get_summary(user_id: str, operation: str):
+    return get_table(SUMMARY_TABLE).get_item(
+        Key={'user_id': user_id, 'operation': operation},
+        ProjectionExpression='#data, #version, #status',
+        ExpressionAttributeNames={'#data': 'data', '#version': 'version', '#status': 'status'}
+    ).get('Item')
+
+
+def handle_message(connection_id: str, user_id: str, body) -> dict:
+    """
+    Procesa un mensaje del protocolo de acciones y retorna la respuesta para el cliente.
+
+    'user_id' es el dueño de la conexión, ya leído por el handler (None si no está registrada).
+
+    Mensajes soportados:
+      - {"type": "ping"}
+      - {"type": "subscribe", "operation": ...}: recibir el progreso de la operación.
+      - {"type": "unsubscribe", "operation": ...}
+      - {"type": "get_summary", "operation": ...}: obtener el resumen actual de la operación.
+    Un campo opcional "id" se devuelve en la respuesta para correlacionarla con la solicitud.
+    """
+    try:
+        message = loads(body) if body else None
+    except ValueError:
+        message = None
+    if not isinstance(message, dict):
+        return _error("El mensaje debe ser un objeto JSON.")
+
+    request_id = message.get('id')
+    message_type = message.get('type')
+    if message_type == PING:
+        return {"type": "pong", "id": request_id}
+    if message_type not in OPERATION_ACTIONS:
+        return _error("Acción no soportada.", request_id)
+
+    operation = message.get('operation')
+    if not isinstance(operation, str) or not operation.strip():
+        return _error("El parámetro 'operation' es obligatorio.", request_id)
+    operation = operation.strip()
+
+    if user_id is None:
+        return _error("La conexión no está registrada.", request_id)
+
+    if message_type == UNSUBSCRIBE:
+        if subscriptions.is_enabled():
+            subscriptions.unsubscribe(user_id, operation, connection_id)
+        return {"type": "unsubscribed", "operation": operation, "id": request_id}
+
+    summary = _get_summary(user_id, operation)
+    if summary is None:
+        return _error("Operacion no encontrado.", request_id)
+
+    if message_type == SUBSCRIBE:
+        if not subscriptions.is_enabled():
+            return _error("Las suscripciones no están habilitadas.", request_id)
+        subscriptions.subscribe(user_id, operation, connection_id)
+        return {"type": "subscribed", "operation": operation, "id": request_id}
+
+    return {
+        "type": "summary",
+        "operation": operation,
+        "status": summary.get('status'),
+        "version": summary.get('version'),
+        "data": summary.get('data'),
+        "id": request_id
+    }
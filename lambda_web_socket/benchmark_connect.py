@@ -0,0 +1,106 @@
+"""
+Latencia de connect_handler con reconexiones que repiten el mismo token de Cognito, con y sin la
+cache de tokens verificados. El JWKS se sirve localmente y la conexión se guarda en un DynamoDB
+local con latencia inyectada.
+
+Uso: python -m lambda_web_socket.benchmark_connect [conexiones] [latencia en ms]
+"""
+import os
+import sys
+import json
+import time
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+# El handler lee su configuración al importarse
+for _name, _value in (('CONNECTIONS_TABLE', 'connections'), ('USER_POOL_ID', 'us-east-1_benchmark'),
+                      ('COGNITO_APP_CLIENT_ID', 'benchmark-client')):
+    os.environ.setdefault(_name, _value)
+
+from shared.dynamodb_stand_in import LocalDynamoDB  # noqa: E402
+from . import handler  # noqa: E402
+from .jwks_cache import JWKSCache  # noqa: E402
+from .token_cache import VerifiedTokenCache  # noqa: E402
+
+
+class _JWKSHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'keys': self.server.keys}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _signed_token(private_key) -> str:
+    return jwt.encode(
+        {
+            'sub': 'user-1',
+            'aud': handler.COGNITO_APP_CLIENT_ID,
+            'iss': handler.COGNITO_ISSUER,
+            'exp': int(time.time()) + 3600,
+        },
+        private_key,
+        algorithm='RS256',
+        headers={'kid': 'kid-1'}
+    )
+
+
+def _latencies(event: dict, connections: int) -> list:
+    latencies = []
+    for index in range(connections):
+        event['requestContext']['connectionId'] = f"c{index}"
+        started = time.perf_counter()
+        if handler.connect_handler(event, None)['statusCode'] != 200:
+            raise RuntimeError("La conexión del benchmark fue rechazada.")
+        latencies.append((time.perf_counter() - started) * 1000)
+    return sorted(latencies)
+
+
+def run(connections: int = 200, delay_ms: float = 2.0) -> dict:
+    """
+    Retorna la mediana y el p95 de la latencia (ms) de connect_handler sin cache y con cache.
+    """
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({'kid': 'kid-1', 'alg': 'RS256', 'use': 'sig'})
+    jwks_server = ThreadingHTTPServer(('127.0.0.1', 0), _JWKSHandler)
+    jwks_server.keys = [jwk]
+    threading.Thread(target=jwks_server.serve_forever, daemon=True).start()
+
+    event = {'requestContext': {}, 'headers': {'Authorization': f"Bearer {_signed_token(private_key)}"}}
+    original = handler.jwks_cache, handler.token_cache
+    handler.jwks_cache = JWKSCache(f"http://127.0.0.1:{jwks_server.server_port}/.well-known/jwks.json")
+    result = {}
+    try:
+        with LocalDynamoDB({'PutItem': {}}, delay=delay_ms / 1000, shared_clients=True):
+            for name, cache in (('uncached', VerifiedTokenCache(max_size=0)), ('cached', VerifiedTokenCache())):
+                handler.token_cache = cache
+                # La primera conexión descarga el JWKS y crea el cliente, como una invocación en frío
+                _latencies(event, 1)
+                latencies = _latencies(event, connections)
+                result[name] = {
+                    'median_ms': statistics.median(latencies),
+                    'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+                }
+    finally:
+        handler.jwks_cache, handler.token_cache = original
+        jwks_server.shutdown()
+        jwks_server.server_close()
+    return result
+
+
+if __name__ == "__main__":
+    result = run(*[cast(argument) for cast, argument in zip((int, float), sys.argv[1:3])])
+    for name, values in result.items():
+        print(f"{name}: mediana {values['median_ms']:.2f} ms, p95 {values['p95_ms']:.2f} ms")
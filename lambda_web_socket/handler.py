@@ -1,28 +1,39 @@
-import boto3
 import os
 import logging
-import json
 import jwt
-import requests
-from boto3.dynamodb.conditions import Key
+from shared.aws_clients import get_table
+from shared.connections import (
+    CONNECTIONS_LAYOUT,
+    CONNECTIONS_SHADOW_LAYOUT,
+    CONNECTIONS_SHADOW_TABLE,
+    EXPIRY_ATTRIBUTE,
+    expiry_timestamp,
+    get_connection_rows,
+    migrate_connections,
+    refresh_connection,
+    remove_connection,
+    sweep_expired,
+)
+from shared import subscriptions
+from .actions import handle_message, reply
+from .jwks_cache import JWKSCache
+from .token_cache import VerifiedTokenCache
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource('dynamodb')
 connections_table = os.environ['CONNECTIONS_TABLE']
 COGNITO_POOL_ID = os.environ['USER_POOL_ID']
 COGNITO_REGION = os.environ.get('COGNITO_REGION', 'us-east-1')
 COGNITO_APP_CLIENT_ID = os.environ['COGNITO_APP_CLIENT_ID']
 
-def get_cognito_jwks():
-    """
-    Descarga las claves públicas (JWKS) de Cognito para verificar el token.
-    """
-    jwks_url = f"https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{COGNITO_POOL_ID}/.well-known/jwks.json"
-    response = requests.get(jwks_url)
-    response.raise_for_status()
-    return response.json()
+COGNITO_ISSUER = f"https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{COGNITO_POOL_ID}"
+
+# Cache de claves públicas (JWKS) de Cognito, reutilizado entre invocaciones del contenedor
+jwks_cache = JWKSCache(f"{COGNITO_ISSUER}/.well-known/jwks.json")
+
+# Cache de tokens ya verificados, para reconexiones con el mismo token
+token_cache = VerifiedTokenCache()
 
 
 def verify_cognito_token(token):
@@ -33,16 +44,15 @@ def verify_cognito_token(token):
     if token.startswith("Bearer "):
         token = token.split(" ")[1]
 
-    # Obtener las claves públicas (JWKS)
-    jwks = get_cognito_jwks()
+    # Reutilizar la verificación previa si el token ya fue validado y no vence
+    cached_sub = token_cache.get(token)
+    if cached_sub:
+        return cached_sub
+
+    # Obtener la clave pública (JWKS) cacheada para el 'kid' del token
     unverified_header = jwt.get_unverified_header(token)
     kid = unverified_header.get('kid')
-
-    public_key = None
-    for key in jwks['keys']:
-        if key['kid'] == kid:
-            public_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
-            break
+    public_key = jwks_cache.get_key(kid)
 
     if public_key is None:
         raise Exception("No se encontró la clave pública adecuada en JWKS.")
@@ -54,12 +64,14 @@ def verify_cognito_token(token):
             public_key,
             algorithms=[unverified_header['alg']],
             audience=COGNITO_APP_CLIENT_ID,
-            issuer=f"https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{COGNITO_POOL_ID}"
+            issuer=COGNITO_ISSUER
         )
-        return payload['sub']
     except Exception as e:
         raise Exception(f"Verificación del token falló: {str(e)}")
 
+    token_cache.put(token, payload['sub'], payload['exp'])
+    return payload['sub']
+
 
 def connect_handler(event, context):
     """
@@ -83,35 +95,79 @@ def connect_handler(event, context):
         return {'statusCode': 401, 'body': 'Unauthorized'}
 
     # Guardar connectionId y sub (usuario) en DynamoDB
-    table = dynamodb.Table(connections_table)
-    table.put_item(Item={'user_id': user_sub,'connection_id': connection_id})
+    item = {'user_id': user_sub,'connection_id': connection_id, EXPIRY_ATTRIBUTE: expiry_timestamp()}
+    table = get_table(connections_table)
+    table.put_item(Item=item)
+    if CONNECTIONS_SHADOW_TABLE:
+        # Migración de diseño en curso: la conexión también se registra en la tabla nueva
+        get_table(CONNECTIONS_SHADOW_TABLE).put_item(Item=item)
     return {'statusCode': 200, 'body': 'Connected'}
 
 
 def disconnect_handler(event, context):
+    """
+    Función para el evento de desconexión del WebSocket.
+    Elimina todas las filas de la conexión (ver shared.connections.remove_connection) y sus
+    suscripciones.
+    """
     connection_id = event['requestContext']['connectionId']
-    table = dynamodb.Table(connections_table)
-
-    # Consulta el índice secundario ("Schema2Index") para obtener los items con connection_id igual al recibido
-    response = table.query(
-        IndexName='connection-user-index',  # Reemplaza con el nombre de tu GSI si es diferente
-        KeyConditionExpression=Key('connection_id').eq(connection_id)
-    )
-    items = response.get('Items', [])
-
-    # Itera por cada item y elimina el registro de la tabla principal usando la clave compuesta (user_id, connection_id)
-    for item in items:
-        table.delete_item(
-            Key={
-                'user_id': item['user_id'],
-                'connection_id': item['connection_id']
-            }
-        )
+
+    removed = remove_connection(connection_id, connections_table, CONNECTIONS_LAYOUT)
+    if CONNECTIONS_SHADOW_TABLE:
+        remove_connection(connection_id, CONNECTIONS_SHADOW_TABLE, CONNECTIONS_SHADOW_LAYOUT)
+    if subscriptions.is_enabled():
+        removed += subscriptions.remove_connection_subscriptions(connection_id)
+    logger.info(f"Conexión {connection_id} eliminada ({removed} filas, incluidas sus suscripciones).")
 
     return {'statusCode': 200, 'body': 'Disconnected'}
 
 
+def migrate_connections_handler(event, context):
+    """
+    Lambda de invocación manual que copia la tabla de conexiones a una tabla con otro diseño.
+    Se espera que el evento incluya:
+      - target_table: tabla de destino. Las filas se copian completas, con cualquiera de los diseños.
+    """
+    target_table = event.get('target_table')
+    if not target_table:
+        return {'statusCode': 400, 'body': "El parámetro 'target_table' es obligatorio."}
+    copied = migrate_connections(connections_table, target_table, CONNECTIONS_LAYOUT)
+    return {'statusCode': 200, 'body': f"Conexiones copiadas: {copied}"}
+
+
+def sweep_connections_handler(event, context):
+    """
+    Lambda programada que elimina las conexiones vencidas (sin actividad durante CONNECTION_TTL_SECONDS)
+    y las suscripciones vencidas.
+    """
+    removed = sweep_expired(connections_table, CONNECTIONS_LAYOUT)
+    if CONNECTIONS_SHADOW_TABLE:
+        removed += sweep_expired(CONNECTIONS_SHADOW_TABLE, CONNECTIONS_SHADOW_LAYOUT)
+    if subscriptions.is_enabled():
+        removed += subscriptions.sweep_expired_subscriptions()
+    return {'removed': removed}
+
+
 def action_handler(event, context):
+    """
+    Función para la ruta 'action' del WebSocket.
+    Procesa el protocolo de acciones (ping, subscribe, unsubscribe, get_summary; ver actions.py)
+    y envía la respuesta a la conexión por la API de administración.
+    """
+    connection_id = event['requestContext']['connectionId']
     message = event.get('body')
     logger.info(f"Mensaje recibido: {message}")
+
+    try:
+        # Una sola lectura de la conexión: su dueño y su vencimiento, que la actividad extiende
+        rows = get_connection_rows(connection_id, connections_table, CONNECTIONS_LAYOUT)
+        refresh_connection(connection_id, connections_table, CONNECTIONS_LAYOUT, rows=rows)
+        if CONNECTIONS_SHADOW_TABLE:
+            refresh_connection(connection_id, CONNECTIONS_SHADOW_TABLE, CONNECTIONS_SHADOW_LAYOUT)
+
+        user_id = rows[0]['user_id'] if rows else None
+        reply(event, handle_message(connection_id, user_id, message))
+    except Exception as e:
+        logger.error(f"Error al procesar la acción: {e}", exc_info=True)
+        return {'statusCode': 500, 'body': 'Internal server error'}
     return {'statusCode': 200, 'body': 'Action processed'}
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import logging
+import threading
+import requests
+from jwt.algorithms import RSAAlgorithm
+
+logger = logging.getLogger(__name__)
+
+# Tiempo de vida de las claves cacheadas, en segundos.
+JWKS_TTL = int(os.environ.get('JWKS_TTL', '3600'))
+# Intervalo mínimo entre descargas forzadas por un 'kid' desconocido.
+JWKS_MIN_REFRESH_INTERVAL = int(os.environ.get('JWKS_MIN_REFRESH_INTERVAL', '30'))
+# Tiempo máximo durante el que se sirven claves vencidas si el endpoint falla.
+JWKS_MAX_STALE = int(os.environ.get('JWKS_MAX_STALE', '86400'))
+# Timeout de la descarga del JWKS, en segundos.
+JWKS_TIMEOUT = float(os.environ.get('JWKS_TIMEOUT', '2'))
+
+
+class JWKSCache:
+    """
+    Cache de claves públicas de Cognito ya parseadas, indexadas por 'kid'.
+
+    Las claves se reutilizan entre invocaciones del mismo contenedor. Cuando vencen
+    se siguen sirviendo mientras se refrescan en segundo plano (stale-while-revalidate),
+    y un 'kid' desconocido fuerza una nueva descarga como máximo cada
+    'min_refresh_interval' segundos.
+    """
+
+    def __init__(self, jwks_url: str, ttl: int = JWKS_TTL,
+                 min_refresh_interval: int = JWKS_MIN_REFRESH_INTERVAL,
+                 max_stale: int = JWKS_MAX_STALE, timeout: float = JWKS_TIMEOUT):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.max_stale = max_stale
+        self.timeout = timeout
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _fetch(self) -> dict:
+        """
+        Descarga el JWKS y parsea cada clave RSA una sola vez.
+        """
+        response = requests.get(self.jwks_url, timeout=self.timeout)
+        response.raise_for_status()
+        keys = {}
+        for key in response.json().get('keys', []):
+            try:
+                keys[key['kid']] = RSAAlgorithm.from_jwk(json.dumps(key))
+            except Exception as e:
+                logger.warning(f"Clave JWKS inválida ignorada ({key.get('kid')}): {e}")
+        return keys
+
+    def refresh(self) -> bool:
+        """
+        Descarga nuevamente el JWKS y reemplaza las claves cacheadas.
+
+        Returns:
+            bool: True si la descarga fue exitosa, False en caso contrario.
+        """
+        self._last_attempt = time.monotonic()
+        try:
+            keys = self._fetch()
+        except Exception as e:
+            logger.error(f"Error al descargar el JWKS: {e}")
+            return False
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+        return True
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def get_key(self, kid: str):
+        """
+        Retorna la clave pública parseada para el 'kid' indicado.
+
+        Args:
+            kid (str): Identificador de la clave presente en el header del token.
+
+        Returns:
+            La clave pública, o None si no existe en el JWKS.
+        """
+        now = time.monotonic()
+        age = now - self._fetched_at
+
+        if not self._keys or age > self.max_stale:
+            # Sin claves utilizables: la descarga es obligatoria
+            if not self.refresh() and self._keys:
+                logger.error("JWKS vencido por más del máximo permitido y no se pudo refrescar.")
+                return None
+        elif age > self.ttl:
+            # Claves vencidas: se sirven mientras se refrescan en segundo plano
+            self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._last_attempt >= self.min_refresh_interval:
+            # 'kid' desconocido: posible rotación de claves en Cognito
+            logger.info(f"'kid' desconocido ({kid}), descargando nuevamente el JWKS.")
+            self.refresh()
+            key = self._keys.get(kid)
+        return key
+
+    def clear(self):
+        """
+        Elimina las claves cacheadas.
+        """
+        with self._lock:
+            self._keys = {}
+            self._fetched_at = 0.0
+            self._last_attempt = 0.0
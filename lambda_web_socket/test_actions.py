@@ -0,0 +1,152 @@
+import json
+import time
+import pytest
+from botocore.stub import ANY, Stubber
+from shared import dynamodb_batch, subscriptions
+from shared.aws_clients import get_resource
+from lambda_web_socket import actions, handler
+from lambda_web_socket.actions import handle_message
+
+
+def _summary() -> dict:
+    # El recurso deserializa la respuesta en su lugar: cada stub necesita su propio diccionario
+    return {'data': {'M': {'files': {'N': '3'}}}, 'version': {'N': '4'}, 'status': {'S': 'processing'}}
+
+
+@pytest.fixture
+def dynamodb():
+    with Stubber(get_resource('dynamodb').meta.client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+@pytest.fixture
+def subscription_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(subscriptions, 'SUBSCRIPTIONS_TABLE', 'subscriptions')
+    monkeypatch.setattr(subscriptions, 'subscribe', lambda *args: calls.append(('subscribe',) + args))
+    monkeypatch.setattr(subscriptions, 'unsubscribe', lambda *args: calls.append(('unsubscribe',) + args))
+    return calls
+
+
+def _expect_summary(dynamodb, found: bool = True):
+    dynamodb.add_response('get_item', {'Item': _summary()} if found else {}, {
+        'TableName': 'summaries',
+        'Key': {'user_id': 'user-1', 'operation': 'op'},
+        'ProjectionExpression': ANY,
+        'ExpressionAttributeNames': ANY,
+    })
+
+
+def _message(**fields) -> str:
+    return json.dumps(fields)
+
+
+def test_ping_answers_pong():
+    assert handle_message('c1', None, _message(type='ping', id=7)) == {"type": "pong", "id": 7}
+
+
+def test_subscribe_requires_an_existing_operation(dynamodb, subscription_calls):
+    _expect_summary(dynamodb)
+    _expect_summary(dynamodb, found=False)
+
+    assert handle_message('c1', 'user-1', _message(type='subscribe', operation=' op ', id=1)) == {
+        "type": "subscribed", "operation": "op", "id": 1
+    }
+    assert handle_message('c1', 'user-1', _message(type='subscribe', operation='op'))['type'] == 'error'
+    assert subscription_calls == [('subscribe', 'user-1', 'op', 'c1')]
+
+
+def test_unsubscribe_removes_the_subscription(subscription_calls):
+    response = handle_message('c1', 'user-1', _message(type='unsubscribe', operation='op'))
+
+    assert response == {"type": "unsubscribed", "operation": "op", "id": None}
+    assert subscription_calls == [('unsubscribe', 'user-1', 'op', 'c1')]
+
+
+def test_get_summary_returns_the_current_summary(dynamodb):
+    _expect_summary(dynamodb)
+
+    response = handle_message('c1', 'user-1', _message(type='get_summary', operation='op', id='a'))
+
+    assert response == {
+        "type": "summary", "operation": "op", "status": "processing", "version": 4, "data": {'files': 3}, "id": "a"
+    }
+
+
+def test_invalid_messages_are_rejected():
+    assert handle_message('c1', 'user-1', 'no es json')['type'] == 'error'
+    assert handle_message('c1', 'user-1', _message(type='otra'))['message'] == "Acción no soportada."
+    assert handle_message('c1', 'user-1', _message(type='get_summary'))['type'] == 'error'
+    assert handle_message('c1', None, _message(type='get_summary', operation='op'))['message'] == \
+        "La conexión no está registrada."
+
+
+def test_action_handler_reads_the_connection_once(dynamodb, monkeypatch):
+    replies = []
+    monkeypatch.setattr(actions, 'send_to_connections',
+                        lambda connection_ids, message, endpoint: replies.append(message) or {})
+    dynamodb.add_response('query', {'Items': [{
+        'user_id': {'S': 'user-1'}, 'connection_id': {'S': 'c1'}, 'expires_at': {'N': str(int(time.time()))}
+    }]}, {
+        'TableName': 'connections',
+        'IndexName': 'connection-user-index',
+        'KeyConditionExpression': ANY,
+        'ProjectionExpression': ANY,
+        'ExpressionAttributeNames': ANY,
+    })
+    dynamodb.add_response('update_item', {}, {
+        'TableName': 'connections',
+        'Key': {'user_id': 'user-1', 'connection_id': 'c1'},
+        'UpdateExpression': ANY,
+        'ConditionExpression': ANY,
+        'ExpressionAttributeNames': ANY,
+        'ExpressionAttributeValues': ANY,
+    })
+    _expect_summary(dynamodb)
+
+    event = {
+        'requestContext': {'connectionId': 'c1', 'domainName': 'ws.example.com', 'stage': 'dev'},
+        'body': _message(type='get_summary', operation='op'),
+    }
+
+    assert handler.action_handler(event, None)['statusCode'] == 200
+    assert replies[0]['type'] == 'summary'
+
+
+def test_disconnect_removes_the_connection_subscriptions(monkeypatch):
+    removed = []
+    monkeypatch.setattr(subscriptions, 'SUBSCRIPTIONS_TABLE', 'subscriptions')
+    monkeypatch.setattr(handler, 'remove_connection', lambda connection_id, table_name, layout: 1)
+    monkeypatch.setattr(subscriptions, 'remove_connection_subscriptions',
+                        lambda connection_id: removed.append(connection_id) or 2)
+
+    response = handler.disconnect_handler({'requestContext': {'connectionId': 'c1'}}, None)
+
+    assert response['statusCode'] == 200
+    assert removed == ['c1']
+
+
+def test_connection_subscriptions_are_deleted_across_pages():
+    query = {
+        'TableName': 'subscriptions',
+        'IndexName': subscriptions.CONNECTION_SUBSCRIPTION_INDEX,
+        'KeyConditionExpression': ANY,
+    }
+    writer_client = get_resource('dynamodb', **dynamodb_batch.WRITER_CLIENT_CONFIG).meta.client
+    with Stubber(get_resource('dynamodb').meta.client) as dynamodb, Stubber(writer_client) as writer:
+        dynamodb.add_response('query', {
+            'Items': [{'user#operation': {'S': 'user-1#op1'}, 'connection_id': {'S': 'c1'}}],
+            'LastEvaluatedKey': {'user#operation': {'S': 'user-1#op1'}, 'connection_id': {'S': 'c1'}},
+        }, query)
+        dynamodb.add_response('query', {
+            'Items': [{'user#operation': {'S': 'user-1#op2'}, 'connection_id': {'S': 'c1'}}],
+        }, dict(query, ExclusiveStartKey=ANY))
+        writer.add_response('batch_write_item', {}, {'RequestItems': {'subscriptions': [
+            {'DeleteRequest': {'Key': {'user#operation': 'user-1#op1', 'connection_id': 'c1'}}},
+            {'DeleteRequest': {'Key': {'user#operation': 'user-1#op2', 'connection_id': 'c1'}}},
+        ]}})
+
+        assert subscriptions.remove_connection_subscriptions('c1', 'subscriptions') == 2
+        dynamodb.assert_no_pending_responses()
+        writer.assert_no_pending_responses()
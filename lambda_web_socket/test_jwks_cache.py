@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from lambda_web_socket import handler
+from lambda_web_socket.jwks_cache import JWKSCache
+
+
+def _rsa_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _jwk(private_key, kid: str) -> dict:
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({'kid': kid, 'alg': 'RS256', 'use': 'sig'})
+    return jwk
+
+
+class JWKSHandler(BaseHTTPRequestHandler):
+    """
+    Sustituto local del endpoint /.well-known/jwks.json de Cognito.
+    """
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.server.failing:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps({'keys': self.server.keys}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def signing_key():
+    return _rsa_key()
+
+
+@pytest.fixture
+def jwks_server(signing_key):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), JWKSHandler)
+    server.keys = [_jwk(signing_key, 'kid-1')]
+    server.requests = 0
+    server.failing = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_port}/.well-known/jwks.json"
+    server.shutdown()
+    server.server_close()
+
+
+def test_keys_are_downloaded_once(jwks_server):
+    server, url = jwks_server
+    cache = JWKSCache(url)
+
+    assert cache.get_key('kid-1') is not None
+    assert cache.get_key('kid-1') is not None
+    assert server.requests == 1
+
+
+def test_unknown_kid_refreshes_after_rotation(jwks_server):
+    server, url = jwks_server
+    cache = JWKSCache(url, min_refresh_interval=0)
+    cache.get_key('kid-1')
+
+    server.keys = server.keys + [_jwk(_rsa_key(), 'kid-2')]
+
+    assert cache.get_key('kid-2') is not None
+    assert server.requests == 2
+
+
+def test_unknown_kid_refresh_is_rate_limited(jwks_server):
+    server, url = jwks_server
+    cache = JWKSCache(url, min_refresh_interval=60)
+
+    assert cache.get_key('desconocido') is None
+    assert cache.get_key('desconocido') is None
+    assert server.requests == 1
+
+
+def test_expired_keys_are_served_while_endpoint_fails(jwks_server):
+    server, url = jwks_server
+    cache = JWKSCache(url, ttl=0, min_refresh_interval=60)
+    cache.get_key('kid-1')
+    server.failing = True
+    time.sleep(0.01)
+
+    assert cache.get_key('kid-1') is not None
+
+
+def test_verify_cognito_token_uses_local_jwks(jwks_server, signing_key, monkeypatch):
+    _, url = jwks_server
+    monkeypatch.setattr(handler, 'jwks_cache', JWKSCache(url))
+    token = jwt.encode(
+        {
+            'sub': 'user-1',
+            'aud': handler.COGNITO_APP_CLIENT_ID,
+            'iss': handler.COGNITO_ISSUER,
+            'exp': int(time.time()) + 300,
+        },
+        signing_key,
+        algorithm='RS256',
+        headers={'kid': 'kid-1'}
+    )
+
+    assert handler.verify_cognito_token(f"Bearer {token}") == 'user-1'
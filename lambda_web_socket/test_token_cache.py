@@ -0,0 +1,31 @@
+import time
+from lambda_web_socket import benchmark_connect
+from lambda_web_socket.token_cache import VerifiedTokenCache
+
+
+def test_entries_expire_at_the_token_exp_or_the_cap():
+    cache = VerifiedTokenCache(max_ttl=300)
+    cache.put('vencido', 'user-1', time.time() - 1)
+    cache.put('vigente', 'user-2', time.time() + 3600)
+
+    assert cache.get('vencido') is None
+    assert cache.get('vigente') == 'user-2'
+    assert cache._entries[cache.digest('vigente')][1] <= time.time() + 300
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VerifiedTokenCache(max_size=2)
+    for token in ('a', 'b'):
+        cache.put(token, f"user-{token}", time.time() + 60)
+    cache.get('a')
+    cache.put('c', 'user-c', time.time() + 60)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'user-a'
+
+
+def test_benchmark_runs():
+    result = benchmark_connect.run(connections=3, delay_ms=0)
+
+    assert set(result) == {'uncached', 'cached'}
+    assert all(values['median_ms'] > 0 for values in result.values())
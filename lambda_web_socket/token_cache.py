@@ -0,0 +1,71 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Número máximo de tokens verificados que se mantienen en memoria.
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '1024'))
+# Tiempo máximo que un token verificado permanece en cache, en segundos.
+TOKEN_CACHE_MAX_TTL = int(os.environ.get('TOKEN_CACHE_MAX_TTL', '300'))
+
+
+class VerifiedTokenCache:
+    """
+    Cache LRU acotada de tokens ya verificados.
+
+    Asocia el digest SHA-256 del token con su 'sub' verificado. Cada entrada vence
+    en el 'exp' del token o tras 'max_ttl' segundos, lo que ocurra primero.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE, max_ttl: int = TOKEN_CACHE_MAX_TTL):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        """
+        Calcula el digest del token; el token en claro nunca se guarda.
+        """
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token: str):
+        """
+        Retorna el 'sub' del token si fue verificado y aún no vence, o None.
+        """
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            sub, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return sub
+
+    def put(self, token: str, sub: str, exp: float):
+        """
+        Guarda el 'sub' verificado del token hasta min(exp, ahora + max_ttl).
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = min(float(exp), time.time() + self.max_ttl)
+        if expires_at <= time.time():
+            return
+        key = self.digest(token)
+        with self._lock:
+            self._entries[key] = (sub, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Elimina todas las entradas de la cache.
+        """
+        with self._lock:
+            self._entries.clear()
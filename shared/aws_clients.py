@@ -0,0 +1,136 @@
+import os
+import copy
+import logging
+import threading
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Configuración de los clientes compartidos por todas las lambdas.
+# Se construyen una sola vez por contenedor y se reutilizan en invocaciones "warm".
+AWS_CONNECT_TIMEOUT = float(os.environ.get('AWS_CONNECT_TIMEOUT', '2'))
+AWS_READ_TIMEOUT = float(os.environ.get('AWS_READ_TIMEOUT', '5'))
+AWS_MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS', '4'))
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '32'))
+
+BASE_CONFIG = Config(
+    connect_timeout=AWS_CONNECT_TIMEOUT,
+    read_timeout=AWS_READ_TIMEOUT,
+    max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+    tcp_keepalive=True,
+    retries={
+        'max_attempts': AWS_MAX_ATTEMPTS,
+        'mode': 'adaptive'
+    }
+)
+
+_lock = threading.RLock()
+_session = None
+_clients = {}
+_resources = {}
+_tables = {}
+
+
+def _config_key(service_name: str, overrides: dict, endpoint_url: str = None) -> tuple:
+    return (service_name, endpoint_url, repr(sorted(overrides.items())))
+
+
+def _merge_config(overrides: dict) -> Config:
+    # Config modifica en su lugar algunos diccionarios (p. ej. 'retries'), lo que cambiaría la clave
+    # de la cache calculada con los valores originales
+    return BASE_CONFIG.merge(Config(**copy.deepcopy(overrides))) if overrides else BASE_CONFIG
+
+
+def get_session() -> boto3.session.Session:
+    """
+    Retorna la sesión de boto3 del contenedor, creándola la primera vez.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = boto3.session.Session()
+    return _session
+
+
+def get_client(service_name: str, endpoint_url: str = None, **config_overrides):
+    """
+    Retorna un cliente de bajo nivel reutilizable para el servicio indicado.
+
+    Args:
+        service_name (str): Nombre del servicio de AWS (por ejemplo 's3' o 'dynamodb').
+        endpoint_url (str, opcional): Endpoint del servicio, p. ej. el de la API de administración
+            de un WebSocket de API Gateway.
+        **config_overrides: Parámetros adicionales de botocore.config.Config
+            (por ejemplo s3={'use_accelerate_endpoint': True}).
+
+    Returns:
+        El cliente de boto3, cacheado por servicio, endpoint y configuración.
+    """
+    key = _config_key(service_name, config_overrides, endpoint_url)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                config = _merge_config(config_overrides)
+                logger.info(f"Creando cliente '{service_name}' para el contenedor.")
+                client = get_session().client(service_name, config=config, endpoint_url=endpoint_url)
+                _clients[key] = client
+    return client
+
+
+def get_resource(service_name: str, **config_overrides):
+    """
+    Retorna un recurso de alto nivel reutilizable para el servicio indicado.
+
+    Args:
+        service_name (str): Nombre del servicio de AWS (por ejemplo 'dynamodb').
+        **config_overrides: Parámetros adicionales de botocore.config.Config.
+
+    Returns:
+        El recurso de boto3, cacheado por servicio y configuración.
+    """
+    key = _config_key(service_name, config_overrides)
+    resource = _resources.get(key)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(key)
+            if resource is None:
+                config = _merge_config(config_overrides)
+                logger.info(f"Creando recurso '{service_name}' para el contenedor.")
+                resource = get_session().resource(service_name, config=config)
+                _resources[key] = resource
+    return resource
+
+
+def get_table(table_name: str):
+    """
+    Retorna el objeto Table de DynamoDB para el nombre indicado, reutilizado entre invocaciones.
+
+    Args:
+        table_name (str): Nombre de la tabla de DynamoDB.
+
+    Returns:
+        El objeto Table de boto3.
+    """
+    table = _tables.get(table_name)
+    if table is None:
+        with _lock:
+            table = _tables.get(table_name)
+            if table is None:
+                table = get_resource('dynamodb').Table(table_name)
+                _tables[table_name] = table
+    return table
+
+
+def reset_clients():
+    """
+    Descarta los clientes, recursos y tablas cacheados para que los siguientes se creen con la
+    configuración actual del entorno (p. ej. AWS_ENDPOINT_URL_DYNAMODB en los benchmarks).
+    """
+    with _lock:
+        _clients.clear()
+        _resources.clear()
+        _tables.clear()
@@ -0,0 +1,57 @@
+"""
+Latencia por solicitud de GetItem contra un DynamoDB local: un cliente nuevo por solicitud (como
+hacía cada servicio con boto3.resource) frente al cliente reutilizado de shared.aws_clients.
+
+Uso: python -m shared.benchmark_aws_clients [solicitudes]
+"""
+import sys
+import time
+import statistics
+import boto3
+from shared.aws_clients import BASE_CONFIG, get_client
+from shared.dynamodb_stand_in import LocalDynamoDB
+
+_ITEM = {'Item': {'user_id': {'S': 'user-1'}, 'operation': {'S': 'op'}, 'data': {'M': {'files': {'N': '3'}}}}}
+_KEY = {'user_id': {'S': 'user-1'}, 'operation': {'S': 'op'}}
+
+
+def _per_request_client(endpoint_url: str):
+    boto3.session.Session().client('dynamodb', endpoint_url=endpoint_url, config=BASE_CONFIG).get_item(
+        TableName='summaries', Key=_KEY
+    )
+
+
+def _shared_client(endpoint_url: str):
+    get_client('dynamodb', endpoint_url=endpoint_url).get_item(TableName='summaries', Key=_KEY)
+
+
+def _latencies(function, endpoint_url: str, requests: int) -> list:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        function(endpoint_url)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def run(requests: int = 200) -> dict:
+    """
+    Retorna la mediana y el p95 de la latencia (ms) de ambos modos.
+    """
+    with LocalDynamoDB({'GetItem': _ITEM}) as dynamodb:
+        # La primera solicitud del cliente compartido paga su creación, como una invocación en frío
+        _shared_client(dynamodb.endpoint_url)
+        result = {}
+        for name, function in (('per_request', _per_request_client), ('shared', _shared_client)):
+            latencies = sorted(_latencies(function, dynamodb.endpoint_url, requests))
+            result[name] = {
+                'median_ms': statistics.median(latencies),
+                'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+            }
+    return result
+
+
+if __name__ == "__main__":
+    result = run(*[int(argument) for argument in sys.argv[1:2]])
+    for name, values in result.items():
+        print(f"{name}: mediana {values['median_ms']:.2f} ms, p95 {values['p95_ms']:.2f} ms")
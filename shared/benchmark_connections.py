@@ -0,0 +1,114 @@
+"""
+Desconexión y migración de un usuario con muchas conexiones contra un DynamoDB local con latencia
+inyectada por solicitud.
+
+  - disconnect_by_user:       cada desconexión consulta connection-user-index y elimina la fila.
+  - disconnect_by_connection: cada desconexión es un único delete por clave, sin leer el índice.
+  - migration_batch:          copia sin condiciones con BatchWriteItem (como la primera versión).
+  - migration:                copia condicionada de migrate_connections (una transacción por fila).
+
+Uso: python -m shared.benchmark_connections [conexiones] [latencia en ms]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from shared.aws_clients import get_table
+from shared.connections import (
+    LAYOUT_BY_CONNECTION,
+    LAYOUT_BY_USER,
+    MIGRATION_SEGMENTS,
+    key_attributes,
+    migrate_connections,
+    remove_connection,
+)
+from shared.dynamodb_batch import BatchWriter
+from shared.dynamodb_stand_in import LocalDynamoDB
+
+PAGE_SIZE = 100
+
+
+def _row(index: int) -> dict:
+    return {'user_id': {'S': 'user-1'}, 'connection_id': {'S': f"c{index}"}}
+
+
+def _query(request: dict) -> dict:
+    # connection-user-index: la fila de la conexión consultada
+    connection_id = next(iter(request['ExpressionAttributeValues'].values()))['S']
+    return {'Items': [{'user_id': {'S': 'user-1'}, 'connection_id': {'S': connection_id}}]}
+
+
+def _scan(connections: int):
+    def scan(request: dict) -> dict:
+        indexes = range(request.get('Segment', 0), connections, request.get('TotalSegments', 1))
+        start = 0
+        if 'ExclusiveStartKey' in request:
+            last = int(request['ExclusiveStartKey']['connection_id']['S'][1:])
+            start = indexes.index(last) + 1
+        page = [_row(index) for index in indexes[start:start + PAGE_SIZE]]
+        response = {'Items': page}
+        if start + PAGE_SIZE < len(indexes):
+            response['LastEvaluatedKey'] = page[-1]
+        return response
+    return scan
+
+
+def _batch_copy(source_table: str, target_table: str, segments: int) -> int:
+    def copy_segment(segment: int) -> int:
+        table = get_table(source_table)
+        scan_kwargs = {'Segment': segment, 'TotalSegments': segments}
+        copied = 0
+        with BatchWriter(target_table, key_attributes=key_attributes(LAYOUT_BY_CONNECTION)) as writer:
+            while True:
+                response = table.scan(**scan_kwargs)
+                for item in response.get('Items', []):
+                    writer.put_item(item)
+                    copied += 1
+                if 'LastEvaluatedKey' not in response:
+                    return copied
+                scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        return sum(executor.map(copy_segment, range(segments)))
+
+
+def _measure(dynamodb, function) -> dict:
+    calls = len(dynamodb.calls)
+    started = time.perf_counter()
+    rows = function()
+    return {
+        'ms': (time.perf_counter() - started) * 1000,
+        'requests': len(dynamodb.calls) - calls,
+        'rows': rows,
+    }
+
+
+def run(connections: int = 500, delay_ms: float = 2.0, segments: int = MIGRATION_SEGMENTS) -> dict:
+    """
+    Retorna el tiempo total (ms), las solicitudes a DynamoDB y las filas afectadas de cada modo.
+    """
+    responses = {
+        'Query': _query,
+        'DeleteItem': lambda request: {'Attributes': request['Key']},
+        'Scan': _scan(connections),
+        'BatchWriteItem': {},
+        'TransactWriteItems': {},
+    }
+    connection_ids = [f"c{index}" for index in range(connections)]
+    disconnect = lambda layout: lambda: sum(
+        remove_connection(connection_id, 'connections', layout) for connection_id in connection_ids
+    )
+    with LocalDynamoDB(responses, delay=delay_ms / 1000, shared_clients=True) as dynamodb:
+        return {
+            'disconnect_by_user': _measure(dynamodb, disconnect(LAYOUT_BY_USER)),
+            'disconnect_by_connection': _measure(dynamodb, disconnect(LAYOUT_BY_CONNECTION)),
+            'migration_batch': _measure(dynamodb, lambda: _batch_copy('connections', 'connections-v2', segments)),
+            'migration': _measure(dynamodb, lambda: migrate_connections(
+                'connections', 'connections-v2', LAYOUT_BY_USER, segments
+            )),
+        }
+
+
+if __name__ == "__main__":
+    result = run(*[cast(argument) for cast, argument in zip((int, float), sys.argv[1:3])])
+    for name, values in result.items():
+        print(f"{name}: {values['ms']:.0f} ms, {values['requests']} solicitudes, {values['rows']} filas")
@@ -0,0 +1,70 @@
+"""
+Latencia y memoria pico de la lectura de 'data' de ~300 KB contra un DynamoDB local: Table.get_item
+(TypeDeserializer y Decimal) + dumps frente al cliente de bajo nivel + dynamodb_json.transcode.
+
+Uso: python -m shared.benchmark_dynamodb_json [KB] [repeticiones]
+"""
+import sys
+import time
+import tracemalloc
+import boto3
+from boto3.dynamodb.types import TypeSerializer
+from shared.aws_clients import BASE_CONFIG, get_client
+from shared.benchmark_serializer import generate_item
+from shared.dynamodb_json import transcode
+from shared.dynamodb_stand_in import LocalDynamoDB
+from shared.serializer import dumps
+
+_KEY = {'user#operation': 'user-1#op', 'file': 'libro.xlsx'}
+# Filas de generate_item por KB aproximado de DynamoDB-JSON
+_ROWS_PER_KB = 4.5
+
+
+def _wire_item(size_kb: int) -> dict:
+    data = generate_item(int(size_kb * _ROWS_PER_KB))
+    return {'Item': {
+        'user#operation': {'S': _KEY['user#operation']},
+        'file': {'S': _KEY['file']},
+        'data': TypeSerializer().serialize(data),
+    }}
+
+
+def _measure(function, repeat: int) -> dict:
+    function()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    elapsed = (time.perf_counter() - started) / repeat
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'ms': elapsed * 1000, 'peak_mb': peak / 1e6}
+
+
+def run(size_kb: int = 300, repeat: int = 20) -> dict:
+    """
+    Retorna el tamaño de la respuesta y el tiempo medio (ms) y la memoria pico (MB) de cada modo.
+    """
+    response = _wire_item(size_kb)
+    with LocalDynamoDB({'GetItem': response}) as dynamodb:
+        table = boto3.session.Session().resource(
+            'dynamodb', endpoint_url=dynamodb.endpoint_url, config=BASE_CONFIG
+        ).Table('results')
+        client = get_client('dynamodb', endpoint_url=dynamodb.endpoint_url)
+        resource_body = lambda: dumps(table.get_item(Key=_KEY)['Item']['data'])
+        raw_body = lambda: dumps(transcode(client.get_item(
+            TableName='results', Key={name: {'S': value} for name, value in _KEY.items()}
+        )['Item']['data']))
+        return {
+            'response_kb': len(dumps(response).encode('utf-8')) / 1024,
+            'resource': _measure(resource_body, repeat),
+            'raw': _measure(raw_body, repeat),
+        }
+
+
+if __name__ == "__main__":
+    result = run(*[int(argument) for argument in sys.argv[1:3]])
+    print(f"Respuesta de GetItem: {result['response_kb']:.0f} KB")
+    for name in ('resource', 'raw'):
+        print(f"{name}: {result[name]['ms']:.1f} ms, memoria pico {result[name]['peak_mb']:.1f} MB")
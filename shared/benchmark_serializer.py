@@ -0,0 +1,82 @@
+"""
+Compara la serialización anterior de las respuestas (convert_decimal + json.dumps, dos pasadas)
+con serializer.dumps (una pasada, sin copia intermedia) sobre resultados sintéticos grandes.
+
+Uso: python -m shared.benchmark_serializer [filas] [repeticiones]
+"""
+import sys
+import json
+import time
+import random
+import tracemalloc
+from decimal import Decimal
+from shared.serializer import USE_ORJSON, dumps
+
+
+def generate_item(rows: int, columns: int = 12, seed: int = 7) -> dict:
+    """
+    'data' sintética con la forma de una hoja de cálculo procesada, tal como la retorna DynamoDB.
+    """
+    generator = random.Random(seed)
+    return {
+        'format': 'xlsx',
+        'row_count': Decimal(rows),
+        'sheets': [{
+            'name': 'datos',
+            'rows': [
+                [f"texto {row}"] + [Decimal(f"{generator.uniform(-1e6, 1e6):.2f}") for _ in range(columns - 1)]
+                for row in range(rows)
+            ]
+        }],
+        'truncated': False
+    }
+
+
+def convert_decimal(obj):
+    # Conversión recursiva que usaban los servicios antes de serializer.dumps
+    if isinstance(obj, list):
+        return [convert_decimal(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {key: convert_decimal(value) for key, value in obj.items()}
+    elif isinstance(obj, Decimal):
+        return float(obj)
+    else:
+        return obj
+
+
+def _two_pass(item):
+    return json.dumps({'data': convert_decimal(item)})
+
+
+def _one_pass(item):
+    return dumps({'data': item})
+
+
+def _measure(function, item, repeat: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(item)
+    elapsed = (time.perf_counter() - started) / repeat
+    tracemalloc.start()
+    function(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'ms': elapsed * 1000, 'peak_mb': peak / 1e6}
+
+
+def run(rows: int = 20000, repeat: int = 5) -> dict:
+    """
+    Retorna el tiempo medio (ms) y la memoria pico (MB, tracemalloc) de ambos métodos.
+    """
+    item = generate_item(rows)
+    return {
+        'two_pass': _measure(_two_pass, item, repeat),
+        'one_pass': _measure(_one_pass, item, repeat),
+    }
+
+
+if __name__ == "__main__":
+    result = run(*[int(argument) for argument in sys.argv[1:3]])
+    print(f"Backend: {'orjson' if USE_ORJSON else 'json'}")
+    for name, values in result.items():
+        print(f"{name}: {values['ms']:.1f} ms, memoria pico {values['peak_mb']:.1f} MB")
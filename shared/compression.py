@@ -0,0 +1,113 @@
+import os
+import gzip
+import base64
+import logging
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional; sin él solo se usa gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Tamaño mínimo del body (en bytes) a partir del cual se comprime la respuesta.
+COMPRESSION_MIN_SIZE = int(os.environ.get('RESPONSE_COMPRESSION_MIN_SIZE', '1024'))
+# Nivel de compresión de gzip (1-9) y calidad de brotli (0-11).
+GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '5'))
+# Deben coincidir con provider.apiGateway.binaryMediaTypes de serverless.yml: API Gateway solo
+# decodifica un body con isBase64Encoded si el primer tipo del header Accept es uno de ellos.
+BINARY_MEDIA_TYPES = {'application/json'}
+
+
+def _get_header(event: dict, header: str):
+    for name, value in (event.get('headers') or {}).items():
+        if name.lower() == header:
+            return value
+    return None
+
+
+def get_accept_encoding(event: dict):
+    """
+    Retorna el header Accept-Encoding del evento de API Gateway (sin distinguir mayúsculas).
+
+    Retorna None si el primer tipo del header Accept no está en BINARY_MEDIA_TYPES: API Gateway
+    entregaría el body comprimido como texto base64, así que la respuesta no se comprime.
+    """
+    accept = _get_header(event, 'accept')
+    if not accept or accept.split(',')[0].split(';')[0].strip().lower() not in BINARY_MEDIA_TYPES:
+        return None
+    return _get_header(event, 'accept-encoding')
+
+
+def _parse_accept_encoding(accept_encoding: str) -> dict:
+    encodings = {}
+    for part in accept_encoding.split(','):
+        pieces = [piece.strip() for piece in part.split(';')]
+        name = pieces[0].lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in pieces[1:]:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        encodings[name] = quality
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str):
+    """
+    Elige la codificación a usar según el header Accept-Encoding.
+
+    Args:
+        accept_encoding (str): Valor del header Accept-Encoding de la solicitud.
+
+    Returns:
+        str: 'br', 'gzip' o None si el cliente no acepta ninguna compresión soportada.
+    """
+    if not accept_encoding:
+        return None
+    encodings = _parse_accept_encoding(accept_encoding)
+    wildcard = encodings.get('*', 0.0)
+
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_quality = None, 0.0
+    for candidate in candidates:
+        quality = encodings.get(candidate, wildcard)
+        if quality > best_quality:
+            best, best_quality = candidate, quality
+    return best
+
+
+def compress_body(body: str, accept_encoding: str, min_size: int = COMPRESSION_MIN_SIZE):
+    """
+    Comprime el body si supera 'min_size' bytes y el cliente acepta gzip o brotli.
+
+    Args:
+        body (str): Body de la respuesta ya serializado.
+        accept_encoding (str): Valor del header Accept-Encoding de la solicitud.
+        min_size (int, opcional): Tamaño mínimo en bytes para comprimir.
+
+    Returns:
+        tuple: (body en base64, codificación) o None si no corresponde comprimir.
+    """
+    encoding = negotiate_encoding(accept_encoding)
+    if encoding is None:
+        return None
+
+    raw = body.encode('utf-8')
+    if len(raw) < min_size:
+        return None
+
+    if encoding == 'br':
+        compressed = brotli.compress(raw, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+
+    if len(compressed) >= len(raw):
+        return None
+    logger.info(f"Respuesta comprimida con {encoding}: {len(raw)} -> {len(compressed)} bytes.")
+    return base64.b64encode(compressed).decode('ascii'), encoding
@@ -0,0 +1,342 @@
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+from shared.aws_clients import get_table
+from shared.dynamodb_batch import BatchWriter, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Diseños de la tabla de conexiones:
+#   'by_user':       clave (user_id, connection_id) y GSI 'connection-user-index' por connection_id.
+#   'by_connection': clave connection_id y GSI 'user-connection-index' por user_id; la desconexión
+#                    es un delete por clave, sin leer el índice.
+LAYOUT_BY_USER = 'by_user'
+LAYOUT_BY_CONNECTION = 'by_connection'
+
+CONNECTION_USER_INDEX = 'connection-user-index'
+USER_CONNECTION_INDEX = 'user-connection-index'
+
+CONNECTIONS_TABLE = os.environ.get('CONNECTIONS_TABLE')
+CONNECTIONS_LAYOUT = os.environ.get('CONNECTIONS_LAYOUT', LAYOUT_BY_USER).lower()
+# Tabla de destino durante una migración de diseño: las conexiones se escriben y eliminan en ambas
+CONNECTIONS_SHADOW_TABLE = os.environ.get('CONNECTIONS_SHADOW_TABLE')
+CONNECTIONS_SHADOW_LAYOUT = os.environ.get('CONNECTIONS_SHADOW_LAYOUT', LAYOUT_BY_CONNECTION).lower()
+
+# Segmentos del scan paralelo usado para copiar la tabla
+MIGRATION_SEGMENTS = int(os.environ.get('CONNECTIONS_MIGRATION_SEGMENTS', '8'))
+# Reintentos de la copia de una fila cuando la transacción choca con otra escritura
+MIGRATION_MAX_RETRIES = int(os.environ.get('CONNECTIONS_MIGRATION_MAX_RETRIES', '3'))
+
+# Vigencia de una conexión sin actividad, en segundos. El atributo (epoch) puede configurarse
+# además como atributo TTL de la tabla; el barrido programado elimina las filas vencidas sin
+# esperar al borrado diferido de DynamoDB.
+EXPIRY_ATTRIBUTE = 'expires_at'
+CONNECTION_TTL_SECONDS = int(os.environ.get('CONNECTION_TTL_SECONDS', '3600'))
+# La actividad solo reescribe el vencimiento cuando faltan menos de estos segundos para que venza
+CONNECTION_REFRESH_THRESHOLD_SECONDS = int(
+    os.environ.get('CONNECTION_REFRESH_THRESHOLD_SECONDS', str(CONNECTION_TTL_SECONDS // 2))
+)
+SWEEP_SEGMENTS = int(os.environ.get('CONNECTIONS_SWEEP_SEGMENTS', '8'))
+
+
+def expiry_timestamp(now: float = None) -> int:
+    """
+    Momento (epoch en segundos) en que vence una conexión activa ahora.
+    """
+    return int((now if now is not None else time.time()) + CONNECTION_TTL_SECONDS)
+
+
+def _not_expired(now: int):
+    # Las filas anteriores al atributo de vencimiento se consideran vigentes
+    return Attr(EXPIRY_ATTRIBUTE).not_exists() | Attr(EXPIRY_ATTRIBUTE).gt(now)
+
+
+def key_attributes(layout: str = CONNECTIONS_LAYOUT) -> tuple:
+    """
+    Atributos de la clave primaria de la tabla de conexiones según el diseño.
+    """
+    if layout == LAYOUT_BY_CONNECTION:
+        return ('connection_id',)
+    return ('user_id', 'connection_id')
+
+
+def connection_key(user_id: str, connection_id: str, layout: str = CONNECTIONS_LAYOUT) -> dict:
+    """
+    Clave primaria de una conexión según el diseño de la tabla.
+    """
+    if layout == LAYOUT_BY_CONNECTION:
+        return {'connection_id': connection_id}
+    return {'user_id': user_id, 'connection_id': connection_id}
+
+
+def _query_all(table_name: str, **query_kwargs):
+    table = get_table(table_name)
+    while True:
+        response = table.query(**query_kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def get_user_connections(user_id: str, table_name: str = CONNECTIONS_TABLE,
+                         layout: str = CONNECTIONS_LAYOUT) -> list:
+    """
+    Retorna todos los connection_id vigentes del usuario, siguiendo la paginación de la consulta.
+    """
+    query_kwargs = {
+        'KeyConditionExpression': Key('user_id').eq(user_id),
+        'FilterExpression': _not_expired(int(time.time())),
+        'ProjectionExpression': 'connection_id',
+    }
+    if layout == LAYOUT_BY_CONNECTION:
+        query_kwargs['IndexName'] = USER_CONNECTION_INDEX
+    return [item['connection_id'] for item in _query_all(table_name, **query_kwargs)]
+
+
+def delete_connections(user_id: str, connection_ids: list, table_name: str = CONNECTIONS_TABLE,
+                       layout: str = CONNECTIONS_LAYOUT):
+    """
+    Elimina por lotes conexiones de un usuario.
+    """
+    if not connection_ids:
+        return
+    with BatchWriter(table_name, key_attributes=key_attributes(layout)) as writer:
+        for connection_id in connection_ids:
+            writer.delete_item(connection_key(user_id, connection_id, layout))
+
+
+def get_connection_rows(connection_id: str, table_name: str = CONNECTIONS_TABLE,
+                        layout: str = CONNECTIONS_LAYOUT) -> list:
+    """
+    Retorna las filas de una conexión con su user_id y su vencimiento, en una sola lectura.
+
+    Con el diseño 'by_connection' es un get_item por clave; con 'by_user' se recorren todas las
+    páginas del índice por connection_id.
+
+    :return: Lista de {'user_id', 'connection_id', 'expires_at'} (vacía si no está registrada).
+    """
+    projection = {
+        'ProjectionExpression': '#user_id, #connection_id, #expires_at',
+        'ExpressionAttributeNames': {
+            '#user_id': 'user_id', '#connection_id': 'connection_id', '#expires_at': EXPIRY_ATTRIBUTE
+        },
+    }
+    if layout == LAYOUT_BY_CONNECTION:
+        item = get_table(table_name).get_item(Key={'connection_id': connection_id}, **projection).get('Item')
+        return [item] if item else []
+    return list(_query_all(
+        table_name,
+        IndexName=CONNECTION_USER_INDEX,
+        KeyConditionExpression=Key('connection_id').eq(connection_id),
+        **projection
+    ))
+
+
+def remove_connection(connection_id: str, table_name: str = CONNECTIONS_TABLE,
+                      layout: str = CONNECTIONS_LAYOUT) -> int:
+    """
+    Elimina todas las filas de una conexión.
+
+    Con el diseño 'by_connection' es un único delete por clave. Con 'by_user' se recorren todas
+    las páginas del índice por connection_id y las filas se eliminan por lotes.
+
+    :return: Cantidad de filas eliminadas.
+    """
+    table = get_table(table_name)
+    if layout == LAYOUT_BY_CONNECTION:
+        response = table.delete_item(Key={'connection_id': connection_id}, ReturnValues='ALL_OLD')
+        return int('Attributes' in response)
+
+    items = get_connection_rows(connection_id, table_name, layout)
+    if len(items) == 1:
+        table.delete_item(Key={'user_id': items[0]['user_id'], 'connection_id': connection_id})
+    elif items:
+        with BatchWriter(table_name, key_attributes=key_attributes(layout)) as writer:
+            for item in items:
+                writer.delete_item({'user_id': item['user_id'], 'connection_id': connection_id})
+    return len(items)
+
+
+def refresh_connection(connection_id: str, table_name: str = CONNECTIONS_TABLE,
+                       layout: str = CONNECTIONS_LAYOUT, rows: list = None) -> int:
+    """
+    Extiende el vencimiento de una conexión con actividad.
+
+    Para no reescribir la fila en cada mensaje, solo se actualizan las filas a las que les quedan
+    menos de CONNECTION_REFRESH_THRESHOLD_SECONDS de vigencia; las demás no generan ninguna
+    escritura. La condición repite la comprobación (otra invocación pudo extenderla) y evita
+    volver a crear una fila eliminada entretanto.
+
+    :param rows: Filas ya leídas con get_connection_rows; si no se indican, se leen.
+    :return: Cantidad de filas actualizadas.
+    """
+    if rows is None:
+        rows = get_connection_rows(connection_id, table_name, layout)
+    now = time.time()
+    threshold = int(now) + CONNECTION_REFRESH_THRESHOLD_SECONDS
+    table = get_table(table_name)
+    refreshed = 0
+    for row in rows:
+        if row.get(EXPIRY_ATTRIBUTE) is not None and row[EXPIRY_ATTRIBUTE] >= threshold:
+            continue
+        try:
+            table.update_item(
+                Key={name: row[name] for name in key_attributes(layout)},
+                UpdateExpression='SET #expires_at = :expires_at',
+                ConditionExpression='attribute_exists(connection_id) AND '
+                                    '(attribute_not_exists(#expires_at) OR #expires_at < :threshold)',
+                ExpressionAttributeNames={'#expires_at': EXPIRY_ATTRIBUTE},
+                ExpressionAttributeValues={
+                    ':expires_at': expiry_timestamp(now),
+                    ':threshold': threshold
+                }
+            )
+            refreshed += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+    return refreshed
+
+
+def _delete_expired(table, key: dict, now: int) -> bool:
+    # Condicional: una fila refrescada después del scan ya no está vencida y no se elimina
+    try:
+        table.delete_item(
+            Key=key,
+            ConditionExpression='#expires_at < :now',
+            ExpressionAttributeNames={'#expires_at': EXPIRY_ATTRIBUTE},
+            ExpressionAttributeValues={':now': now}
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        return False
+
+
+def _sweep_segment(table_name: str, names: tuple, now: int, segment: int, total_segments: int) -> int:
+    table = get_table(table_name)
+    aliases = {f"#k{i}": name for i, name in enumerate(names)}
+    scan_kwargs = {
+        'Segment': segment,
+        'TotalSegments': total_segments,
+        'FilterExpression': Attr(EXPIRY_ATTRIBUTE).lt(now),
+        'ProjectionExpression': ', '.join(aliases),
+        'ExpressionAttributeNames': aliases,
+    }
+    removed = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            removed += _delete_expired(table, {name: item[name] for name in names}, now)
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return removed
+
+
+def sweep_expired_rows(table_name: str, names: tuple, segments: int = SWEEP_SEGMENTS) -> int:
+    """
+    Elimina las filas vencidas de una tabla con 'expires_at', con un scan paralelo por segmentos
+    y borrados condicionados a que la fila siga vencida (BatchWriteItem no admite condiciones).
+
+    :param names: Atributos de la clave primaria de la tabla.
+    :return: Cantidad de filas eliminadas.
+    """
+    now = int(time.time())
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        removed = sum(executor.map(
+            lambda segment: _sweep_segment(table_name, names, now, segment, segments),
+            range(segments)
+        ))
+    logger.info(f"Filas vencidas eliminadas de {table_name}: {removed}")
+    return removed
+
+
+def sweep_expired(table_name: str = CONNECTIONS_TABLE, layout: str = CONNECTIONS_LAYOUT,
+                  segments: int = SWEEP_SEGMENTS) -> int:
+    """
+    Elimina las conexiones vencidas de la tabla de conexiones.
+
+    :return: Cantidad de filas eliminadas.
+    """
+    return sweep_expired_rows(table_name, key_attributes(layout), segments)
+
+
+def _copy_connection(table, item: dict, source_layout: str, target_table: str) -> bool:
+    # Copia condicionada en una transacción: la fila debe seguir en el origen (una desconexión
+    # durante el scan ya la eliminó de ambas tablas) y no existir en el destino (la tabla espejo
+    # ya tiene la versión vigente). BatchWriteItem no admite condiciones.
+    for attempt in range(MIGRATION_MAX_RETRIES + 1):
+        try:
+            table.meta.client.transact_write_items(TransactItems=[
+                {'ConditionCheck': {
+                    'TableName': table.name,
+                    'Key': {name: item[name] for name in key_attributes(source_layout)},
+                    'ConditionExpression': 'attribute_exists(connection_id)',
+                }},
+                {'Put': {
+                    'TableName': target_table,
+                    'Item': item,
+                    'ConditionExpression': 'attribute_not_exists(connection_id)',
+                }},
+            ])
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                raise
+            reasons = [reason.get('Code') for reason in e.response.get('CancellationReasons', [])]
+            if 'ConditionalCheckFailed' in reasons:
+                return False
+            if attempt < MIGRATION_MAX_RETRIES:
+                time.sleep(backoff_delay(attempt))
+    logger.error(f"No se pudo copiar la conexión {item.get('connection_id')} a {target_table}.")
+    return False
+
+
+def _copy_segment(source_table: str, source_layout: str, target_table: str, segment: int, total_segments: int) -> int:
+    table = get_table(source_table)
+    scan_kwargs = {'Segment': segment, 'TotalSegments': total_segments}
+    copied = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            copied += _copy_connection(table, item, source_layout, target_table)
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return copied
+
+
+def migrate_connections(source_table: str, target_table: str, source_layout: str = CONNECTIONS_LAYOUT,
+                        segments: int = MIGRATION_SEGMENTS) -> int:
+    """
+    Copia todas las conexiones a una tabla con otro diseño, con un scan paralelo por segmentos.
+
+    Cada fila se copia con una transacción condicionada a que siga existiendo en el origen y
+    no exista aún en el destino, para no volver a escribir una conexión que se desconectó
+    durante el scan ni pisar la fila que ya escribió la tabla espejo.
+
+    Migración sin pérdida de conexiones:
+      1. Crear la tabla de destino (para 'by_connection': clave connection_id y GSI
+         'user-connection-index' con clave user_id, connection_id).
+      2. Desplegar con CONNECTIONS_SHADOW_TABLE/CONNECTIONS_SHADOW_LAYOUT apuntando a ella, para
+         que las nuevas conexiones y desconexiones se reflejen en ambas tablas.
+      3. Ejecutar esta copia.
+      4. Desplegar con CONNECTIONS_TABLE/CONNECTIONS_LAYOUT apuntando a la nueva tabla y sin tabla
+         espejo; luego eliminar la tabla anterior.
+
+    :param source_layout: Diseño de la tabla de origen, para armar la clave de la comprobación.
+    :return: Cantidad de filas copiadas.
+    """
+    with ThreadPoolExecutor(max_workers=segments) as executor:
+        copied = sum(executor.map(
+            lambda segment: _copy_segment(source_table, source_layout, target_table, segment, segments),
+            range(segments)
+        ))
+    logger.info(f"Conexiones copiadas de {source_table} a {target_table}: {copied}")
+    return copied
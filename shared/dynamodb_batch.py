@@ -0,0 +1,240 @@
+import time
+import random
+import logging
+from collections import OrderedDict
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+from shared.aws_clients import get_resource
+
+logger = logging.getLogger(__name__)
+
+# Límite de claves por llamada a BatchGetItem impuesto por DynamoDB
+BATCH_GET_CHUNK_SIZE = 100
+# Límite de solicitudes por llamada a BatchWriteItem impuesto por DynamoDB
+BATCH_WRITE_CHUNK_SIZE = 25
+# Reintentos de claves/elementos sin procesar y espera base del backoff exponencial, en segundos
+BATCH_MAX_RETRIES = 5
+BATCH_BASE_DELAY = 0.05
+
+# Errores de DynamoDB que indican falta de capacidad y se reintentan
+THROTTLE_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+}
+# Errores transitorios que BatchWriter reintenta además de los de capacidad
+TRANSIENT_ERROR_CODES = {'InternalServerError', 'ServiceUnavailable'}
+NETWORK_ERRORS = (BotoConnectionError, HTTPClientError)
+
+# Configuración del cliente de BatchWriter: sin reintentos de botocore, para que el backoff del
+# writer sea la única capa. Con el modo 'adaptive' del cliente compartido, cada reintento del
+# writer repetiría la llamada hasta AWS_MAX_ATTEMPTS veces y los contadores no verían esos intentos.
+WRITER_CLIENT_CONFIG = {'retries': {'max_attempts': 1, 'mode': 'standard'}}
+
+
+def backoff_delay(attempt: int, base_delay: float = BATCH_BASE_DELAY) -> float:
+    """
+    Espera del reintento 'attempt' con backoff exponencial y jitter completo.
+    """
+    return random.uniform(0, base_delay * (2 ** attempt))
+
+
+def batch_get_items(table_name: str, keys: list, max_retries: int = BATCH_MAX_RETRIES, **request_options) -> tuple:
+    """
+    Lee varios elementos de una tabla con BatchGetItem.
+
+    Las claves se agrupan en bloques de 100 y las 'UnprocessedKeys' se reintentan
+    con backoff exponencial y jitter.
+
+    Args:
+        table_name (str): Nombre de la tabla de DynamoDB.
+        keys (list): Claves primarias de los elementos (sin duplicados).
+        max_retries (int, opcional): Reintentos máximos por bloque.
+        **request_options: Opciones adicionales por tabla, p. ej. ProjectionExpression,
+            ExpressionAttributeNames o ConsistentRead.
+
+    Returns:
+        tuple: (elementos encontrados, claves que siguieron sin procesar tras los reintentos).
+
+    Raises:
+        botocore.exceptions.ClientError: Si DynamoDB rechaza la solicitud.
+    """
+    dynamodb = get_resource('dynamodb')
+    items = []
+    unprocessed = []
+
+    for start in range(0, len(keys), BATCH_GET_CHUNK_SIZE):
+        request_items = {
+            table_name: dict(request_options, Keys=keys[start:start + BATCH_GET_CHUNK_SIZE])
+        }
+
+        attempt = 0
+        while request_items:
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            items.extend(response.get('Responses', {}).get(table_name, []))
+
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                break
+            if attempt >= max_retries:
+                pending = request_items.get(table_name, {}).get('Keys', [])
+                unprocessed.extend(pending)
+                logger.warning(f"{len(pending)} claves sin procesar tras {attempt} reintentos.")
+                break
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    return items, unprocessed
+
+
+class BatchWriter:
+    """
+    Escritura por lotes con BatchWriteItem para una tabla.
+
+    Las escrituras se acumulan y se envían en bloques de 25. Dentro de un bloque solo se conserva
+    la última escritura de cada clave. Los 'UnprocessedItems', los errores por falta de capacidad y
+    los errores transitorios (5xx, red) se reintentan con backoff exponencial y jitter; además, tras
+    un bloque limitado por capacidad los siguientes bloques esperan antes de enviarse, y esa espera
+    se reduce a medida que los bloques vuelven a escribirse sin limitaciones.
+
+    El cliente del writer no tiene reintentos propios (WRITER_CLIENT_CONFIG). Las escrituras que
+    siguen sin procesar tras los reintentos quedan en 'failed' y se registran como error al salir
+    del bloque 'with'.
+
+    Uso:
+        with BatchWriter(table_name, key_attributes=('user#operation', 'file')) as writer:
+            writer.put_item(item)
+            writer.delete_item(key)
+        writer.stats()
+    """
+
+    def __init__(self, table_name: str, key_attributes: tuple, max_retries: int = BATCH_MAX_RETRIES,
+                 base_delay: float = BATCH_BASE_DELAY):
+        self.table_name = table_name
+        self.key_attributes = tuple(key_attributes)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.failed = []
+        self._buffer = OrderedDict()
+        self._pressure = 0
+        self._dynamodb = get_resource('dynamodb', **WRITER_CLIENT_CONFIG)
+        self._counters = {
+            'written': 0,
+            'requests': 0,
+            'deduplicated': 0,
+            'unprocessed_retries': 0,
+            'throttled_requests': 0,
+        }
+        self._elapsed = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+        logger.info(f"Escritura por lotes en {self.table_name}: {self.stats()}")
+        if self.failed:
+            keys = [self._key(request.get('PutRequest', {}).get('Item') or request['DeleteRequest']['Key'])
+                    for request in self.failed]
+            logger.error(f"{len(keys)} escrituras en {self.table_name} no se aplicaron: {keys}")
+
+    def _key(self, item: dict) -> tuple:
+        try:
+            return tuple(item[attribute] for attribute in self.key_attributes)
+        except KeyError as e:
+            raise ValueError(f"Falta el atributo de clave {e} en la escritura.")
+
+    def _add(self, key: tuple, request: dict):
+        if key in self._buffer:
+            self._counters['deduplicated'] += 1
+            del self._buffer[key]
+        self._buffer[key] = request
+        if len(self._buffer) >= BATCH_WRITE_CHUNK_SIZE:
+            self.flush()
+
+    def put_item(self, item: dict):
+        """
+        Agrega un PutRequest (reemplaza cualquier escritura pendiente con la misma clave).
+        """
+        self._add(self._key(item), {'PutRequest': {'Item': item}})
+
+    def delete_item(self, key: dict):
+        """
+        Agrega un DeleteRequest (reemplaza cualquier escritura pendiente con la misma clave).
+        """
+        self._add(self._key(key), {'DeleteRequest': {'Key': key}})
+
+    def flush(self):
+        """
+        Envía las escrituras pendientes.
+
+        Raises:
+            botocore.exceptions.ClientError: Si DynamoDB rechaza la solicitud por un motivo distinto
+                a la falta de capacidad o a un error transitorio, o si estos persisten tras los reintentos.
+            botocore.exceptions.BotoCoreError: Si el error de red persiste tras los reintentos.
+        """
+        if not self._buffer:
+            return
+        requests = list(self._buffer.values())
+        self._buffer.clear()
+
+        started = time.perf_counter()
+        try:
+            self._send(requests)
+        finally:
+            self._elapsed += time.perf_counter() - started
+
+    def _send(self, requests: list):
+        # Espera adaptativa: si los bloques anteriores se limitaron, se espacia el siguiente
+        if self._pressure:
+            time.sleep(backoff_delay(self._pressure - 1, self.base_delay))
+
+        attempt = 0
+        throttled = False
+        while requests:
+            try:
+                response = self._dynamodb.batch_write_item(RequestItems={self.table_name: requests})
+            except (ClientError, *NETWORK_ERRORS) as e:
+                code = e.response['Error']['Code'] if isinstance(e, ClientError) else None
+                retryable = code is None or code in THROTTLE_ERROR_CODES or code in TRANSIENT_ERROR_CODES
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                if code in THROTTLE_ERROR_CODES:
+                    self._counters['throttled_requests'] += 1
+                    throttled = True
+                time.sleep(backoff_delay(attempt, self.base_delay))
+                attempt += 1
+                continue
+
+            self._counters['requests'] += 1
+            pending = (response.get('UnprocessedItems') or {}).get(self.table_name, [])
+            self._counters['written'] += len(requests) - len(pending)
+            requests = pending
+            if not requests:
+                break
+
+            throttled = True
+            if attempt >= self.max_retries:
+                self.failed.extend(requests)
+                logger.warning(f"{len(requests)} escrituras sin procesar tras {attempt} reintentos.")
+                break
+            self._counters['unprocessed_retries'] += 1
+            time.sleep(backoff_delay(attempt, self.base_delay))
+            attempt += 1
+
+        if throttled:
+            self._pressure = min(self._pressure + 1, self.max_retries)
+        elif self._pressure:
+            self._pressure -= 1
+
+    def stats(self) -> dict:
+        """
+        Contadores de la escritura: elementos escritos, llamadas, duplicados descartados,
+        reintentos, solicitudes limitadas por capacidad, fallidos y elementos por segundo.
+        """
+        return dict(
+            self._counters,
+            failed=len(self.failed),
+            elapsed=round(self._elapsed, 3),
+            items_per_second=round(self._counters['written'] / self._elapsed, 1) if self._elapsed else 0.0
+        )
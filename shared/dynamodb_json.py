@@ -0,0 +1,79 @@
+import os
+import base64
+from json.encoder import encode_basestring
+from .serializer import JSON_EXACT_DECIMALS, RawJSON
+
+# Si es verdadero, las lecturas de 'data' usan el cliente de bajo nivel y transcode.
+DYNAMODB_RAW_READS = os.environ.get('DYNAMODB_RAW_READS', 'false').lower() == 'true'
+
+
+def _write(value: dict, parts: list, exact_decimals: bool):
+    (type_code, content), = value.items()
+
+    if type_code == 'S':
+        parts.append(encode_basestring(content))
+    elif type_code == 'N':
+        parts.append(f'"{content}"' if exact_decimals else content)
+    elif type_code == 'M':
+        parts.append('{')
+        first = True
+        for key, item in content.items():
+            if not first:
+                parts.append(',')
+            first = False
+            parts.append(encode_basestring(key))
+            parts.append(':')
+            _write(item, parts, exact_decimals)
+        parts.append('}')
+    elif type_code == 'L':
+        parts.append('[')
+        first = True
+        for item in content:
+            if not first:
+                parts.append(',')
+            first = False
+            _write(item, parts, exact_decimals)
+        parts.append(']')
+    elif type_code == 'BOOL':
+        parts.append('true' if content else 'false')
+    elif type_code == 'NULL':
+        parts.append('null')
+    elif type_code == 'SS':
+        parts.append('[' + ','.join(encode_basestring(item) for item in sorted(content)) + ']')
+    elif type_code == 'NS':
+        numbers = sorted(content, key=float)
+        if exact_decimals:
+            parts.append('[' + ','.join(f'"{item}"' for item in numbers) + ']')
+        else:
+            parts.append('[' + ','.join(numbers) + ']')
+    elif type_code == 'B':
+        parts.append('"' + base64.b64encode(content).decode('ascii') + '"')
+    elif type_code == 'BS':
+        parts.append('[' + ','.join(
+            '"' + base64.b64encode(item).decode('ascii') + '"' for item in sorted(content)
+        ) + ']')
+    else:
+        raise TypeError(f"Tipo de DynamoDB no soportado: {type_code}")
+
+
+def transcode(value: dict, exact_decimals: bool = None) -> RawJSON:
+    """
+    Convierte un valor en formato DynamoDB-JSON ({"N": "1.5"}, {"M": {...}}) directamente
+    a texto JSON, sin construir objetos Python ni Decimal intermedios.
+
+    Los números se copian con su representación textual de DynamoDB, por lo que no pierden precisión.
+    El formato (compacto, UTF-8) es el mismo que el de serializer.dumps con orjson.
+
+    Args:
+        value (dict): Valor tipado tal como lo retorna el cliente de bajo nivel.
+        exact_decimals (bool, opcional): Si es True los números se emiten como cadenas.
+            Por defecto se usa JSON_EXACT_DECIMALS.
+
+    Returns:
+        RawJSON: El documento JSON.
+    """
+    if exact_decimals is None:
+        exact_decimals = JSON_EXACT_DECIMALS
+    parts = []
+    _write(value, parts, exact_decimals)
+    return RawJSON(''.join(parts))
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import threading
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from shared.aws_clients import reset_clients
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 para que los clientes puedan reutilizar la conexión (keep-alive), como con DynamoDB
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        operation = self.headers.get('X-Amz-Target', '').rsplit('.', 1)[-1]
+        self.server.calls.append(operation)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        response = self.server.responses.get(operation, {})
+        if callable(response):
+            response = response(request)
+        body = json.dumps(response).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-amz-json-1.0')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(listening_socket, responses: dict, delay: float):
+    # Proceso hijo de LocalDynamoDB(separate_process=True): atiende el socket creado por el padre
+    server = ThreadingHTTPServer(listening_socket.getsockname(), _Handler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = listening_socket
+    server.responses = responses
+    server.delay = delay
+    server.calls = []
+    server.serve_forever()
+
+
+class LocalDynamoDB:
+    """
+    Sustituto local y mínimo del endpoint de DynamoDB para pruebas y benchmarks.
+
+    Responde a cada operación (GetItem, Query, ...) con la respuesta configurada en 'responses',
+    en formato DynamoDB-JSON, después de esperar 'delay' segundos; si la respuesta es una función,
+    se llama con la solicitud decodificada (p. ej. para paginar). Se usa como context manager
+    y 'endpoint_url' se pasa a get_client.
+
+    Con shared_clients=True los clientes compartidos de shared.aws_clients (get_table,
+    get_resource) también apuntan al sustituto mientras dura el bloque.
+
+    Con separate_process=True el servidor corre en otro proceso y no compite por el GIL con los
+    hilos del código medido, como un DynamoDB real; las respuestas deben poder serializarse con
+    pickle y 'calls' queda vacío.
+    """
+
+    def __init__(self, responses: dict = None, delay: float = 0.0, shared_clients: bool = False,
+                 separate_process: bool = False):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.responses = responses or {}
+        self.server.delay = delay
+        self.server.calls = []
+        self.endpoint_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.shared_clients = shared_clients
+        self.separate_process = separate_process
+        self._process = None
+        self._previous_endpoint = None
+
+    @property
+    def calls(self) -> list:
+        return self.server.calls
+
+    def __enter__(self):
+        # El endpoint es local, pero botocore igual firma las solicitudes y resuelve la región
+        for name, value in (('AWS_DEFAULT_REGION', 'us-east-1'), ('AWS_ACCESS_KEY_ID', 'local'),
+                            ('AWS_SECRET_ACCESS_KEY', 'local')):
+            os.environ.setdefault(name, value)
+        if self.shared_clients:
+            self._previous_endpoint = os.environ.get('AWS_ENDPOINT_URL_DYNAMODB')
+            os.environ['AWS_ENDPOINT_URL_DYNAMODB'] = self.endpoint_url
+            reset_clients()
+        if self.separate_process:
+            self._process = multiprocessing.get_context('spawn').Process(
+                target=_serve, args=(self.server.socket, self.server.responses, self.server.delay), daemon=True
+            )
+            self._process.start()
+        else:
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.shared_clients:
+            if self._previous_endpoint is None:
+                os.environ.pop('AWS_ENDPOINT_URL_DYNAMODB', None)
+            else:
+                os.environ['AWS_ENDPOINT_URL_DYNAMODB'] = self._previous_endpoint
+            reset_clients()
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+        else:
+            self.server.shutdown()
+        self.server.server_close()
+        return False
@@ -0,0 +1,128 @@
+import re
+from functools import reduce
+from boto3.dynamodb.conditions import Attr, Key
+from shared.aws_clients import get_table
+
+# Un segmento de ruta: nombre de un atributo de mapa, p. ej. 'totales' en 'totales.igv'
+SEGMENT_PATTERN = re.compile(r'^[A-Za-z0-9_\-]+$')
+# Máximo de rutas aceptadas en un mismo parámetro 'fields'
+MAX_FIELDS = 50
+
+_MISSING = object()
+
+
+def _overlaps(path: str, other: str) -> bool:
+    return path == other or other.startswith(path + '.')
+
+
+def parse_fields(fields: str) -> tuple:
+    """
+    Valida el parámetro 'fields' (rutas separadas por comas dentro de 'data').
+
+    Args:
+        fields (str): Rutas solicitadas, por ejemplo "totales,detalle.proveedor".
+
+    Returns:
+        tuple: (rutas válidas, rutas inválidas). Una ruta es inválida si su sintaxis
+        no es correcta o si se superpone con otra ruta solicitada.
+    """
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+    valid, invalid = [], []
+    for path in requested[:MAX_FIELDS]:
+        if all(SEGMENT_PATTERN.match(part) for part in path.split('.')):
+            valid.append(path)
+        else:
+            invalid.append(path)
+    invalid.extend(requested[MAX_FIELDS:])
+
+    # DynamoDB rechaza rutas superpuestas ('a' y 'a.b') en una misma proyección
+    overlapping = {
+        path for path in valid
+        for other in valid
+        if path != other and (_overlaps(path, other) or _overlaps(other, path))
+    }
+    invalid.extend(path for path in valid if path in overlapping)
+    valid = [path for path in valid if path not in overlapping]
+    return valid, invalid
+
+
+def build_projection(paths: list, root: str = 'data', key_attributes: tuple = ()) -> tuple:
+    """
+    Construye un ProjectionExpression para las rutas indicadas dentro del atributo 'root'.
+
+    Todos los nombres se usan con alias para evitar conflictos con palabras reservadas.
+
+    Args:
+        paths (list): Rutas válidas retornadas por parse_fields.
+        root (str): Atributo que contiene la data (por defecto 'data').
+        key_attributes (tuple): Atributos adicionales a proyectar, p. ej. la clave del elemento,
+            para distinguir un elemento inexistente de uno sin las rutas pedidas.
+
+    Returns:
+        tuple: (ProjectionExpression, ExpressionAttributeNames).
+    """
+    names = {'#root': root}
+    aliases = {}
+    expressions = []
+
+    for i, attribute in enumerate(key_attributes):
+        names[f"#k{i}"] = attribute
+        expressions.append(f"#k{i}")
+
+    for path in paths:
+        expression = '#root'
+        for name in path.split('.'):
+            alias = aliases.get(name)
+            if alias is None:
+                alias = f"#f{len(aliases)}"
+                aliases[name] = alias
+                names[alias] = name
+            expression += '.' + alias
+        expressions.append(expression)
+
+    return ', '.join(expressions), names
+
+
+def find_missing(data, paths: list, raw: bool = False) -> list:
+    """
+    Retorna las rutas solicitadas que no existen en la data proyectada.
+
+    Con raw=True la data está en formato DynamoDB-JSON ({"M": {...}}), tal como
+    la retorna el cliente de bajo nivel.
+    """
+    missing = []
+    for path in paths:
+        current = data
+        for name in path.split('.'):
+            if raw:
+                current = current.get('M') if isinstance(current, dict) else None
+            if not isinstance(current, dict):
+                current = _MISSING
+                break
+            current = current.get(name, _MISSING)
+            if current is _MISSING:
+                break
+        if current is _MISSING:
+            missing.append(path)
+    return missing
+
+
+def attribute_exists(table_name: str, key: dict, attribute: str = 'data') -> bool:
+    """
+    Indica si el elemento tiene el atributo 'attribute', sin leerlo.
+
+    Con una proyección de rutas DynamoDB omite el atributo raíz tanto si no existe como si no
+    contiene ninguna de las rutas pedidas; esta consulta distingue ambos casos. El filtro se
+    evalúa en DynamoDB y con Select='COUNT' no se transfiere el elemento.
+
+    Args:
+        table_name (str): Nombre de la tabla de DynamoDB.
+        key (dict): Clave primaria completa del elemento.
+        attribute (str): Atributo a verificar (por defecto 'data').
+    """
+    response = get_table(table_name).query(
+        KeyConditionExpression=reduce(lambda a, b: a & b, (Key(name).eq(value) for name, value in key.items())),
+        FilterExpression=Attr(attribute).exists(),
+        Select='COUNT'
+    )
+    return response.get('Count', 0) > 0
@@ -0,0 +1,138 @@
+import os
+import json
+import base64
+from decimal import Decimal
+from boto3.dynamodb.types import Binary
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa el módulo json estándar
+    orjson = None
+
+# Si es verdadero, los Decimal se serializan como cadenas para no perder precisión.
+JSON_EXACT_DECIMALS = os.environ.get('JSON_EXACT_DECIMALS', 'false').lower() == 'true'
+# Backend de JSON: 'auto' usa orjson si está instalado, 'json' fuerza la librería estándar.
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto').lower()
+USE_ORJSON = orjson is not None and JSON_BACKEND != 'json'
+
+# datetime y dataclass pasan por el hook 'default' (como en la librería estándar) en lugar de
+# serializarse con el formato propio de orjson.
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None else 0
+)
+
+
+class RawJSON:
+    """
+    Documento JSON ya serializado (por ejemplo, el resultado de dynamodb_json.transcode).
+
+    Como valor completo, dumps retorna su texto sin volver a serializarlo. Anidado dentro de otro
+    valor, el hook 'default' lo decodifica para insertarlo; no es una subclase de str para que no
+    se serialice como una cadena JSON (doble codificación).
+    """
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __repr__(self):
+        return f"RawJSON({self.text!r})"
+
+
+def _default_float(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return _default_common(obj)
+
+
+def _default_exact(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    return _default_common(obj)
+
+
+def _sort_key(value):
+    # Binary no define orden: los conjuntos binarios (BS) se ordenan por sus bytes, como en dynamodb_json
+    return value.value if isinstance(value, Binary) else value
+
+
+def _default_common(obj):
+    if isinstance(obj, RawJSON):
+        return loads(obj.text)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=_sort_key)
+    if isinstance(obj, Binary):
+        return base64.b64encode(obj.value).decode('ascii')
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode('ascii')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def default_hook(exact_decimals: bool = None):
+    """
+    Retorna el hook 'default' que convierte los tipos de DynamoDB a tipos JSON.
+
+    Args:
+        exact_decimals (bool, opcional): Si es True los Decimal se convierten a cadena;
+            si es False a float. Por defecto se usa JSON_EXACT_DECIMALS.
+    """
+    if exact_decimals is None:
+        exact_decimals = JSON_EXACT_DECIMALS
+    return _default_exact if exact_decimals else _default_float
+
+
+def dumps(obj, exact_decimals: bool = None) -> str:
+    """
+    Serializa a JSON valores leídos de DynamoDB en una sola pasada.
+
+    Los Decimal, sets y Binary se convierten durante la codificación, sin construir
+    una copia intermedia del objeto. Usa orjson si está disponible; si no, json.dumps
+    con sus opciones por defecto. orjson escribe JSON compacto y en UTF-8, es decir,
+    el mismo texto que json.dumps con separators=(',', ':') y ensure_ascii=False
+    (ver shared/test_serializer.py), salvo en estos casos:
+
+      - Floats en notación exponencial: orjson escribe 1e16 y 1e-7, la librería
+        estándar 1e+16 y 1e-07. El valor numérico es el mismo.
+      - NaN e infinito: orjson escribe null, la librería estándar NaN/Infinity
+        (DynamoDB no admite estos valores, por lo que no llegan desde las tablas).
+      - UUID: orjson los serializa como cadena; la librería estándar falla.
+
+    Los enteros de más de 64 bits, que orjson no admite, se serializan con la
+    librería estándar.
+
+    Args:
+        obj: Valor a serializar.
+        exact_decimals (bool, opcional): Ver default_hook.
+
+    Returns:
+        str: El documento JSON.
+    """
+    if isinstance(obj, RawJSON):
+        return obj.text
+    if USE_ORJSON:
+        try:
+            return orjson.dumps(obj, default=default_hook(exact_decimals), option=_ORJSON_OPTIONS).decode('utf-8')
+        except TypeError:
+            # Enteros de más de 64 bits u otros valores que orjson rechaza; si la librería
+            # estándar tampoco los admite, lanza su propio TypeError
+            pass
+    return json.dumps(obj, default=default_hook(exact_decimals))
+
+
+def loads(data):
+    """
+    Deserializa un documento JSON (str o bytes), usando orjson si está disponible.
+
+    Args:
+        data (str | bytes): Documento JSON, por ejemplo el body de la solicitud.
+
+    Returns:
+        El objeto Python resultante.
+
+    Raises:
+        ValueError: Si el documento no es JSON válido (ambos backends lanzan una subclase).
+    """
+    if USE_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,107 @@
+import os
+import time
+import logging
+from boto3.dynamodb.conditions import Attr, Key
+from shared.aws_clients import get_table
+from shared.connections import EXPIRY_ATTRIBUTE, sweep_expired_rows
+from shared.dynamodb_batch import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+# Índice de suscripciones: clave ('user#operation', connection_id) y GSI 'connection-subscription-index'
+# por connection_id (proyección KEYS_ONLY), usado al desconectar. Si no se configura, las
+# notificaciones de una operación se envían a todas las conexiones del usuario.
+SUBSCRIPTIONS_TABLE = os.environ.get('SUBSCRIPTIONS_TABLE')
+SUBSCRIPTION_KEY = ('user#operation', 'connection_id')
+CONNECTION_SUBSCRIPTION_INDEX = 'connection-subscription-index'
+# Una conexión WebSocket de API Gateway dura como máximo 2 horas; la suscripción no la sobrevive
+SUBSCRIPTION_TTL_SECONDS = int(os.environ.get('SUBSCRIPTION_TTL_SECONDS', '7200'))
+
+
+def is_enabled() -> bool:
+    return bool(SUBSCRIPTIONS_TABLE)
+
+
+def subscribe(user_id: str, operation: str, connection_id: str, table_name: str = SUBSCRIPTIONS_TABLE):
+    """
+    Suscribe una conexión a las notificaciones de una operación del usuario.
+    """
+    get_table(table_name).put_item(Item={
+        'user#operation': f"{user_id}#{operation}",
+        'connection_id': connection_id,
+        'user_id': user_id,
+        EXPIRY_ATTRIBUTE: int(time.time()) + SUBSCRIPTION_TTL_SECONDS
+    })
+
+
+def unsubscribe(user_id: str, operation: str, connection_id: str, table_name: str = SUBSCRIPTIONS_TABLE):
+    """
+    Cancela la suscripción de una conexión a una operación.
+    """
+    get_table(table_name).delete_item(Key={
+        'user#operation': f"{user_id}#{operation}",
+        'connection_id': connection_id
+    })
+
+
+def get_subscribers(user_id: str, operation: str, table_name: str = SUBSCRIPTIONS_TABLE) -> list:
+    """
+    Retorna los connection_id suscritos a la operación, siguiendo la paginación de la consulta.
+    """
+    table = get_table(table_name)
+    query_kwargs = {
+        'KeyConditionExpression': Key('user#operation').eq(f"{user_id}#{operation}"),
+        'FilterExpression': Attr(EXPIRY_ATTRIBUTE).gt(int(time.time())),
+        'ProjectionExpression': 'connection_id',
+    }
+    connection_ids = []
+    while True:
+        response = table.query(**query_kwargs)
+        connection_ids.extend(item['connection_id'] for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return connection_ids
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def remove_subscriptions(user_id: str, operation: str, connection_ids: list, table_name: str = SUBSCRIPTIONS_TABLE):
+    """
+    Elimina por lotes las suscripciones de conexiones que ya no existen.
+    """
+    if not connection_ids:
+        return
+    with BatchWriter(table_name, key_attributes=SUBSCRIPTION_KEY) as writer:
+        for connection_id in connection_ids:
+            writer.delete_item({'user#operation': f"{user_id}#{operation}", 'connection_id': connection_id})
+
+
+def remove_connection_subscriptions(connection_id: str, table_name: str = SUBSCRIPTIONS_TABLE) -> int:
+    """
+    Elimina por lotes todas las suscripciones de una conexión (al desconectarse), recorriendo
+    todas las páginas del índice por connection_id.
+
+    :return: Cantidad de suscripciones eliminadas.
+    """
+    table = get_table(table_name)
+    query_kwargs = {
+        'IndexName': CONNECTION_SUBSCRIPTION_INDEX,
+        'KeyConditionExpression': Key('connection_id').eq(connection_id),
+    }
+    removed = 0
+    with BatchWriter(table_name, key_attributes=SUBSCRIPTION_KEY) as writer:
+        while True:
+            response = table.query(**query_kwargs)
+            for item in response.get('Items', []):
+                writer.delete_item({name: item[name] for name in SUBSCRIPTION_KEY})
+                removed += 1
+            if 'LastEvaluatedKey' not in response:
+                return removed
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def sweep_expired_subscriptions(table_name: str = SUBSCRIPTIONS_TABLE) -> int:
+    """
+    Elimina las suscripciones vencidas.
+
+    :return: Cantidad de filas eliminadas.
+    """
+    return sweep_expired_rows(table_name, SUBSCRIPTION_KEY)
@@ -0,0 +1,47 @@
+# Métricas que el resumen de una operación (atributo 'data' de SUMMARY_TABLE) acumula
+# a partir de los resultados por archivo de RESULT_TABLE
+SUMMARY_METRICS = (
+    'files',
+    'files_processed',
+    'files_error',
+    'files_truncated',
+    'rows',
+    'pages',
+    'paragraphs',
+)
+
+
+def split_user_operation(user_operation: str):
+    """
+    Separa la clave 'user#operation' de RESULT_TABLE en (user_id, operation); None si no es válida.
+    """
+    user_id, separator, operation = user_operation.partition('#')
+    if not separator or not user_id or not operation:
+        return None
+    return user_id, operation
+
+
+def file_metrics(item: dict) -> dict:
+    """
+    Aporte de un elemento de RESULT_TABLE (ya deserializado) a cada métrica del resumen.
+
+    Un elemento inexistente (None) no aporta nada.
+    """
+    metrics = dict.fromkeys(SUMMARY_METRICS, 0)
+    if not item:
+        return metrics
+
+    status = item.get('status')
+    data = item.get('data') if isinstance(item.get('data'), dict) else {}
+    metrics['files'] = 1
+    metrics['files_processed'] = int(status == 'processed')
+    metrics['files_error'] = int(status == 'error')
+    metrics['files_truncated'] = int(bool(data.get('truncated')))
+    if 'row_count' in data:
+        metrics['rows'] = int(data['row_count'])
+    else:
+        # Resultados guardados antes de que se agregara 'row_count' al nivel de 'data'
+        metrics['rows'] = int(sum(sheet.get('row_count', 0) for sheet in data.get('sheets', [])))
+    metrics['pages'] = int(data.get('page_count', 0))
+    metrics['paragraphs'] = int(data.get('paragraph_count', 0))
+    return metrics
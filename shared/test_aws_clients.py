@@ -0,0 +1,26 @@
+from shared import benchmark_aws_clients
+from shared.aws_clients import get_client, get_resource, get_table
+
+
+def test_clients_are_reused_per_configuration():
+    assert get_client('s3') is get_client('s3')
+    assert get_client('s3', read_timeout=15) is not get_client('s3')
+
+
+def test_nested_overrides_keep_the_cache_key():
+    overrides = {'retries': {'max_attempts': 1, 'mode': 'standard'}}
+
+    assert get_client('s3', **overrides) is get_client('s3', **overrides)
+    assert overrides == {'retries': {'max_attempts': 1, 'mode': 'standard'}}
+
+
+def test_tables_are_reused_by_name():
+    assert get_table('results') is get_table('results')
+    assert get_table('results').meta.client is get_resource('dynamodb').meta.client
+
+
+def test_benchmark_runs():
+    result = benchmark_aws_clients.run(requests=5)
+
+    assert set(result) == {'per_request', 'shared'}
+    assert all(values['median_ms'] > 0 for values in result.values())
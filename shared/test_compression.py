@@ -0,0 +1,24 @@
+import base64
+import gzip
+from shared.compression import compress_body, get_accept_encoding
+
+
+def test_accept_encoding_requires_a_binary_accept_type():
+    headers = {'Accept-Encoding': 'gzip, br'}
+
+    assert get_accept_encoding({'headers': {**headers, 'Accept': 'application/json'}}) == 'gzip, br'
+    assert get_accept_encoding({'headers': {**headers, 'accept': 'Application/JSON; q=1, */*'}}) == 'gzip, br'
+    assert get_accept_encoding({'headers': {**headers, 'Accept': '*/*'}}) is None
+    assert get_accept_encoding({'headers': headers}) is None
+    assert get_accept_encoding({'headers': None}) is None
+
+
+def test_large_bodies_are_gzipped():
+    body = '{"data": "' + 'x' * 4096 + '"}'
+
+    encoded, encoding = compress_body(body, 'gzip')
+
+    assert encoding == 'gzip'
+    assert gzip.decompress(base64.b64decode(encoded)).decode('utf-8') == body
+    assert compress_body('{}', 'gzip') is None
+    assert compress_body(body, 'identity') is None
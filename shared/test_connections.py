@@ -0,0 +1,128 @@
+import time
+import pytest
+from botocore.stub import ANY, Stubber
+from shared import benchmark_connections, connections
+from shared.aws_clients import get_resource
+
+
+@pytest.fixture
+def dynamodb():
+    with Stubber(get_resource('dynamodb').meta.client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def _row(expires_at: int = None) -> dict:
+    row = {'user_id': 'user-1', 'connection_id': 'c1'}
+    if expires_at is not None:
+        row[connections.EXPIRY_ATTRIBUTE] = expires_at
+    return row
+
+
+def _expect_refresh(dynamodb):
+    dynamodb.add_response('update_item', {}, {
+        'TableName': 'connections',
+        'Key': {'user_id': 'user-1', 'connection_id': 'c1'},
+        'UpdateExpression': 'SET #expires_at = :expires_at',
+        'ConditionExpression': ANY,
+        'ExpressionAttributeNames': {'#expires_at': 'expires_at'},
+        'ExpressionAttributeValues': ANY,
+    })
+
+
+def test_refresh_skips_rows_far_from_expiry(dynamodb):
+    rows = [_row(int(time.time()) + connections.CONNECTION_TTL_SECONDS)]
+
+    assert connections.refresh_connection('c1', 'connections', connections.LAYOUT_BY_USER, rows=rows) == 0
+
+
+def test_refresh_extends_rows_close_to_expiry(dynamodb):
+    _expect_refresh(dynamodb)
+    _expect_refresh(dynamodb)
+    rows = [_row(int(time.time()) + 10), _row()]
+
+    assert connections.refresh_connection('c1', 'connections', connections.LAYOUT_BY_USER, rows=rows) == 2
+
+
+def test_sweeper_deletes_only_rows_that_are_still_expired(dynamodb):
+    dynamodb.add_response('scan', {'Items': [
+        {'user_id': {'S': 'user-1'}, 'connection_id': {'S': 'c1'}},
+        {'user_id': {'S': 'user-1'}, 'connection_id': {'S': 'c2'}},
+    ]}, {
+        'TableName': 'connections',
+        'Segment': 0,
+        'TotalSegments': 1,
+        'FilterExpression': ANY,
+        'ProjectionExpression': '#k0, #k1',
+        'ExpressionAttributeNames': {'#k0': 'user_id', '#k1': 'connection_id'},
+    })
+    for connection_id in ('c1', 'c2'):
+        expected = {
+            'TableName': 'connections',
+            'Key': {'user_id': 'user-1', 'connection_id': connection_id},
+            'ConditionExpression': '#expires_at < :now',
+            'ExpressionAttributeNames': {'#expires_at': 'expires_at'},
+            'ExpressionAttributeValues': {':now': ANY},
+        }
+        if connection_id == 'c1':
+            dynamodb.add_response('delete_item', {}, expected)
+        else:
+            # Refrescada por una acción después del scan
+            dynamodb.add_client_error('delete_item', 'ConditionalCheckFailedException', expected_params=expected)
+
+    assert connections.sweep_expired('connections', connections.LAYOUT_BY_USER, segments=1) == 1
+
+
+def _expect_copy(dynamodb, connection_id: str, cancelled: str = None):
+    expected = {'TransactItems': [
+        {'ConditionCheck': {
+            'TableName': 'connections',
+            'Key': {'user_id': 'user-1', 'connection_id': connection_id},
+            'ConditionExpression': 'attribute_exists(connection_id)',
+        }},
+        {'Put': {
+            'TableName': 'connections-v2',
+            'Item': {'user_id': 'user-1', 'connection_id': connection_id},
+            'ConditionExpression': 'attribute_not_exists(connection_id)',
+        }},
+    ]}
+    if cancelled is None:
+        dynamodb.add_response('transact_write_items', {}, expected)
+    else:
+        dynamodb.add_client_error(
+            'transact_write_items', 'TransactionCanceledException', expected_params=expected,
+            modeled_fields={'CancellationReasons': [{'Code': cancelled}, {'Code': 'None'}]}
+        )
+
+
+def test_migration_skips_connections_removed_during_the_scan(dynamodb, monkeypatch):
+    monkeypatch.setattr(connections.time, 'sleep', lambda seconds: None)
+    dynamodb.add_response('scan', {'Items': [
+        {'user_id': {'S': 'user-1'}, 'connection_id': {'S': 'c1'}},
+        {'user_id': {'S': 'user-1'}, 'connection_id': {'S': 'c2'}},
+    ]}, {'TableName': 'connections', 'Segment': 0, 'TotalSegments': 1})
+    _expect_copy(dynamodb, 'c1')
+    # c2 se desconectó después del scan: la comprobación sobre el origen cancela la copia
+    _expect_copy(dynamodb, 'c2', cancelled='ConditionalCheckFailed')
+
+    assert connections.migrate_connections('connections', 'connections-v2', connections.LAYOUT_BY_USER,
+                                           segments=1) == 1
+
+
+def test_migration_retries_transaction_conflicts(dynamodb, monkeypatch):
+    monkeypatch.setattr(connections.time, 'sleep', lambda seconds: None)
+    dynamodb.add_response('scan', {'Items': [{'user_id': {'S': 'user-1'}, 'connection_id': {'S': 'c1'}}]},
+                          {'TableName': 'connections', 'Segment': 0, 'TotalSegments': 1})
+    _expect_copy(dynamodb, 'c1', cancelled='TransactionConflict')
+    _expect_copy(dynamodb, 'c1')
+
+    assert connections.migrate_connections('connections', 'connections-v2', connections.LAYOUT_BY_USER,
+                                           segments=1) == 1
+
+
+def test_benchmark_runs():
+    result = benchmark_connections.run(connections=5, delay_ms=0, segments=2)
+
+    assert result['disconnect_by_connection']['requests'] == 5
+    assert result['disconnect_by_user']['requests'] == 10
+    assert result['migration']['rows'] == 5
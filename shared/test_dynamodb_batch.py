@@ -0,0 +1,129 @@
+import logging
+import pytest
+from botocore.exceptions import ClientError, ReadTimeoutError
+from botocore.stub import Stubber
+from shared import dynamodb_batch
+from shared.aws_clients import get_resource
+from shared.dynamodb_batch import BatchWriter
+
+KEY = ('user#operation', 'file')
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    delays = []
+    monkeypatch.setattr(dynamodb_batch.time, 'sleep', delays.append)
+    client = get_resource('dynamodb', **dynamodb_batch.WRITER_CLIENT_CONFIG).meta.client
+    with Stubber(client) as stubber:
+        stubber.delays = delays
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def _item(file: str, status: str = 'processed') -> dict:
+    return {'user#operation': 'user-1#op', 'file': file, 'status': status}
+
+
+def _put(file: str, status: str = 'processed') -> dict:
+    return {'PutRequest': {'Item': _item(file, status)}}
+
+
+def _wire_put(file: str) -> dict:
+    # Formato de la respuesta de DynamoDB, que el recurso deserializa
+    return {'PutRequest': {'Item': {'user#operation': {'S': 'user-1#op'}, 'file': {'S': file}, 'status': {'S': 'processed'}}}}
+
+
+def _expect(stubber, requests: list, unprocessed: list = None):
+    response = {'UnprocessedItems': {'results': unprocessed} if unprocessed else {}}
+    stubber.add_response('batch_write_item', response, {'RequestItems': {'results': requests}})
+
+
+def test_writes_are_sent_in_chunks_of_25(dynamodb):
+    files = [f"{index}.pdf" for index in range(30)]
+    _expect(dynamodb, [_put(file) for file in files[:25]])
+    _expect(dynamodb, [_put(file) for file in files[25:]])
+
+    with BatchWriter('results', key_attributes=KEY) as writer:
+        for file in files:
+            writer.put_item(_item(file))
+
+    assert writer.stats()['written'] == 30
+    assert writer.stats()['requests'] == 2
+
+
+def test_only_the_last_write_per_key_is_sent(dynamodb):
+    _expect(dynamodb, [_put('b.pdf'), _put('a.pdf', 'error')])
+
+    with BatchWriter('results', key_attributes=KEY) as writer:
+        writer.put_item(_item('a.pdf'))
+        writer.put_item(_item('b.pdf'))
+        writer.put_item(_item('a.pdf', 'error'))
+
+    assert writer.stats()['deduplicated'] == 1
+
+
+def test_unprocessed_items_are_retried_with_jittered_backoff(dynamodb, monkeypatch):
+    monkeypatch.setattr(dynamodb_batch.random, 'uniform', lambda low, high: high)
+    _expect(dynamodb, [_put('a.pdf'), _put('b.pdf')], unprocessed=[_wire_put('b.pdf')])
+    _expect(dynamodb, [_put('b.pdf')], unprocessed=[_wire_put('b.pdf')])
+    _expect(dynamodb, [_put('b.pdf')])
+
+    with BatchWriter('results', key_attributes=KEY, base_delay=0.1) as writer:
+        writer.put_item(_item('a.pdf'))
+        writer.put_item(_item('b.pdf'))
+
+    assert writer.stats()['written'] == 2
+    assert writer.stats()['unprocessed_retries'] == 2
+    assert dynamodb.delays == [0.1, 0.2]
+
+
+def test_backoff_delay_is_bounded_by_the_exponential_cap():
+    for attempt in range(5):
+        assert 0 <= dynamodb_batch.backoff_delay(attempt, 0.05) <= 0.05 * 2 ** attempt
+
+
+def test_throttling_and_network_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(dynamodb_batch.time, 'sleep', lambda seconds: None)
+    outcomes = [
+        ClientError({'Error': {'Code': 'ProvisionedThroughputExceededException'}}, 'BatchWriteItem'),
+        ReadTimeoutError(endpoint_url='https://dynamodb.us-east-1.amazonaws.com'),
+        {'UnprocessedItems': {}},
+    ]
+    calls = []
+
+    def batch_write_item(**kwargs):
+        calls.append(kwargs)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    writer = BatchWriter('results', key_attributes=KEY)
+    monkeypatch.setattr(writer._dynamodb, 'batch_write_item', batch_write_item)
+    with writer:
+        writer.put_item(_item('a.pdf'))
+
+    assert len(calls) == 3
+    assert writer.stats()['throttled_requests'] == 1
+    assert writer.stats()['written'] == 1
+
+
+def test_other_errors_are_raised(dynamodb):
+    dynamodb.add_client_error('batch_write_item', 'ValidationException', http_status_code=400)
+
+    with pytest.raises(ClientError):
+        with BatchWriter('results', key_attributes=KEY) as writer:
+            writer.put_item(_item('a.pdf'))
+            writer.flush()
+
+
+def test_items_left_unprocessed_are_logged(dynamodb, caplog):
+    for _ in range(2):
+        _expect(dynamodb, [_put('a.pdf')], unprocessed=[_wire_put('a.pdf')])
+
+    with caplog.at_level(logging.ERROR, logger=dynamodb_batch.__name__):
+        with BatchWriter('results', key_attributes=KEY, max_retries=1) as writer:
+            writer.put_item(_item('a.pdf'))
+
+    assert writer.stats()['failed'] == 1
+    assert "('user-1#op', 'a.pdf')" in caplog.text
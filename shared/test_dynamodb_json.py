@@ -0,0 +1,33 @@
+import json
+from decimal import Decimal
+from boto3.dynamodb.types import Binary, TypeSerializer
+from shared import benchmark_dynamodb_json
+from shared.dynamodb_json import transcode
+from shared.serializer import RawJSON, dumps
+
+VALUE = {
+    'texto': 'ñandú "x"',
+    'numeros': [Decimal('1.50'), Decimal('-2')],
+    'mapa': {'activo': True, 'vacio': None},
+    'set_textos': {'b', 'a'},
+    'binario': Binary(b'\x00\xff'),
+}
+
+
+def test_transcode_matches_deserialized_value():
+    raw = transcode(TypeSerializer().serialize(VALUE))
+
+    assert isinstance(raw, RawJSON)
+    assert json.loads(raw.text) == json.loads(dumps(VALUE))
+
+
+def test_transcoded_data_nested_in_a_response_is_embedded_as_json():
+    body = dumps({'files': [{'data': transcode({'M': {'total': {'N': '3'}}})}]})
+
+    assert json.loads(body) == {'files': [{'data': {'total': 3}}]}
+
+
+def test_benchmark_runs():
+    result = benchmark_dynamodb_json.run(size_kb=5, repeat=1)
+
+    assert result['resource']['ms'] > 0 and result['raw']['ms'] > 0
@@ -0,0 +1,109 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from boto3.dynamodb.types import Binary
+from shared import benchmark_serializer, serializer
+
+orjson = pytest.importorskip('orjson')
+
+# Valores con la forma que retorna DynamoDB (Decimal, sets, Binary) y casos límite de texto
+PARITY_CASES = [
+    {},
+    [],
+    {'texto': 'ñandú "comillas" \\ barra \n salto \t tab \x1f control \x7f del', 'emoji': '😀'},
+    {'entero': Decimal('42'), 'negativo': Decimal('-7'), 'decimal': Decimal('3.14'), 'cero': Decimal('0')},
+    {'floats': [1.5, 0.1, -0.0, 123456789.0, 1e15, 5e-4]},
+    {'grande': 2 ** 63 - 1, 'minimo': -2 ** 63},
+    {'set_numeros': {Decimal('3'), Decimal('1')}, 'set_textos': {'b', 'a'}},
+    {'binario': Binary(b'\x00\x01\xff'), 'bytes': b'abc'},
+    {'set_binarios': {Binary(b'b'), Binary(b'a'), Binary(b'\x00')}},
+    {1: 'clave entera', 'anidado': {'lista': [None, True, False, {'x': [Decimal('1.0')]}]}},
+    {'totales': {'igv': Decimal('18'), 'base': Decimal('100.25')}, 'filas': [['a', Decimal('1')], []]},
+]
+
+# orjson y la librería estándar escriben distinto el exponente; el valor numérico es el mismo
+EXPONENT_CASES = [1.2345678901234567e19, 1e16, 1e-7, Decimal('1E+20'), Decimal('1.5E-9')]
+
+
+def _dumps(monkeypatch, use_orjson: bool, value, **kwargs) -> str:
+    monkeypatch.setattr(serializer, 'USE_ORJSON', use_orjson)
+    return serializer.dumps(value, **kwargs)
+
+
+def _compact_stdlib(value, exact_decimals: bool = None) -> str:
+    # Configuración de json.dumps que produce el mismo texto que orjson
+    return json.dumps(value, default=serializer.default_hook(exact_decimals), separators=(',', ':'), ensure_ascii=False)
+
+
+@pytest.mark.parametrize('value', PARITY_CASES)
+@pytest.mark.parametrize('exact_decimals', [False, True])
+def test_orjson_matches_compact_stdlib_byte_for_byte(monkeypatch, value, exact_decimals):
+    fast = _dumps(monkeypatch, True, value, exact_decimals=exact_decimals)
+
+    assert fast.encode('utf-8') == _compact_stdlib(value, exact_decimals).encode('utf-8')
+
+
+@pytest.mark.parametrize('value', PARITY_CASES)
+@pytest.mark.parametrize('exact_decimals', [False, True])
+def test_backends_decode_to_the_same_value(monkeypatch, value, exact_decimals):
+    fast = _dumps(monkeypatch, True, value, exact_decimals=exact_decimals)
+    standard = _dumps(monkeypatch, False, value, exact_decimals=exact_decimals)
+
+    assert json.loads(fast) == json.loads(standard)
+
+
+def test_stdlib_fallback_keeps_json_dumps_defaults(monkeypatch):
+    value = {'texto': 'ñandú', 'total': Decimal('1.5'), 'filas': [1, 2]}
+
+    assert _dumps(monkeypatch, False, value) == json.dumps(value, default=serializer.default_hook())
+    assert _dumps(monkeypatch, False, value) == '{"texto": "\\u00f1and\\u00fa", "total": 1.5, "filas": [1, 2]}'
+
+
+@pytest.mark.parametrize('value', EXPONENT_CASES)
+def test_exponent_floats_are_numerically_equal(monkeypatch, value):
+    fast = _dumps(monkeypatch, True, [value])
+    standard = _dumps(monkeypatch, False, [value])
+
+    assert json.loads(fast) == json.loads(standard)
+
+
+def test_integers_wider_than_64_bits_fall_back_to_stdlib(monkeypatch):
+    value = {'grande': 2 ** 64, 'negativo': -2 ** 70}
+
+    assert _dumps(monkeypatch, True, value) == _dumps(monkeypatch, False, value) == json.dumps(value)
+
+
+def test_binary_sets_are_sorted_by_bytes(monkeypatch):
+    value = {'a': {Binary(b'b'), Binary(b'a')}}
+
+    for use_orjson in (True, False):
+        assert json.loads(_dumps(monkeypatch, use_orjson, value)) == {'a': ['YQ==', 'Yg==']}
+
+
+def test_benchmark_runs():
+    result = benchmark_serializer.run(rows=50, repeat=1)
+
+    assert set(result) == {'two_pass', 'one_pass'}
+
+
+def test_unsupported_types_raise_type_error_in_both_backends(monkeypatch):
+    for use_orjson in (True, False):
+        with pytest.raises(TypeError):
+            _dumps(monkeypatch, use_orjson, {'fecha': datetime(2024, 1, 1)})
+
+
+def test_raw_json_is_returned_unchanged(monkeypatch):
+    raw = serializer.RawJSON('{"ya":"serializado"}')
+
+    assert _dumps(monkeypatch, True, raw) is raw.text
+    assert _dumps(monkeypatch, False, raw) is raw.text
+
+
+def test_nested_raw_json_is_not_double_encoded(monkeypatch):
+    value = {'files': [{'file': 'a.xlsx', 'data': serializer.RawJSON('{"total":1.5,"filas":[1,2]}')}]}
+
+    for use_orjson in (True, False):
+        assert json.loads(_dumps(monkeypatch, use_orjson, value)) == {
+            'files': [{'file': 'a.xlsx', 'data': {'total': 1.5, 'filas': [1, 2]}}]
+        }
@@ -0,0 +1,92 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+import pytest
+from botocore.exceptions import EndpointConnectionError
+from shared import websocket_notifier
+from shared.websocket_notifier import FAILED, GONE, SENT, notify_user, send_to_connections
+
+
+class ManagementAPIHandler(BaseHTTPRequestHandler):
+    """
+    Sustituto local de la API de administración del WebSocket (POST /@connections/{id}).
+
+    Las conexiones 'gone-*' responden 410 (GoneException) y las 'drop-*' cierran el socket sin
+    responder, como un error de red.
+    """
+
+    def do_POST(self):
+        connection_id = unquote(self.path.rsplit('/', 1)[-1])
+        payload = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if connection_id.startswith('drop-'):
+            self.close_connection = True
+            return
+        self.server.received.append((connection_id, payload))
+        if connection_id.startswith('gone-'):
+            body = json.dumps({'message': 'Gone'}).encode()
+            self.send_response(410)
+            self.send_header('x-amzn-ErrorType', 'GoneException')
+        else:
+            body = b''
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def management_api():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ManagementAPIHandler)
+    server.received = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_network_errors_mark_connection_as_failed(management_api):
+    server, endpoint = management_api
+
+    outcome = send_to_connections(['ok-1', 'drop-1'], {'type': 'progress'}, endpoint)
+
+    assert outcome == {'ok-1': SENT, 'drop-1': FAILED}
+
+
+def test_notify_user_reports_network_errors(monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise EndpointConnectionError(endpoint_url='https://dynamodb.us-east-1.amazonaws.com')
+
+    monkeypatch.setattr(websocket_notifier, 'get_user_connections', unreachable)
+
+    result = notify_user('user-1', {'type': 'progress'}, table_name='connections', endpoint_url='http://localhost')
+
+    assert result['status'] == 'error'
+
+
+def test_messages_are_posted_to_each_connection(management_api):
+    server, endpoint = management_api
+
+    outcome = send_to_connections(['ok-1', 'gone-1', 'ok-2'], {'type': 'progress', 'done': 3}, endpoint)
+
+    assert outcome == {'ok-1': SENT, 'gone-1': GONE, 'ok-2': SENT}
+    assert sorted(connection_id for connection_id, _ in server.received) == ['gone-1', 'ok-1', 'ok-2']
+    assert {json.loads(payload)['done'] for _, payload in server.received} == {3}
+
+
+def test_notify_user_removes_gone_connections(management_api, monkeypatch):
+    _, endpoint = management_api
+    removed = []
+    monkeypatch.setattr(websocket_notifier, 'get_user_connections', lambda user_id, table_name: ['ok-1', 'gone-1'])
+    monkeypatch.setattr(websocket_notifier, 'remove_connections',
+                        lambda user_id, connection_ids, table_name: removed.extend(connection_ids))
+
+    result = notify_user('user-1', {'type': 'result'}, table_name='connections', endpoint_url=endpoint)
+
+    assert result == {"status": "success", "sent": 1, "gone": 1, "failed": 0}
+    assert removed == ['gone-1']
@@ -0,0 +1,126 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import BotoCoreError, ClientError
+from shared.aws_clients import get_client
+from shared.connections import (
+    CONNECTIONS_SHADOW_LAYOUT,
+    CONNECTIONS_SHADOW_TABLE,
+    CONNECTIONS_TABLE,
+    delete_connections,
+    get_user_connections,
+)
+from shared.serializer import dumps
+from shared import subscriptions
+
+logger = logging.getLogger(__name__)
+
+# Endpoint de la API de administración del WebSocket (https://{api}.execute-api.{región}.amazonaws.com/{stage}).
+# Si no se configura, las notificaciones quedan deshabilitadas.
+WEBSOCKET_ENDPOINT = os.environ.get('WEBSOCKET_ENDPOINT')
+# Máximo de envíos simultáneos a post_to_connection por notificación
+NOTIFY_WORKERS = int(os.environ.get('NOTIFY_WORKERS', '16'))
+
+SENT = 'sent'
+GONE = 'gone'
+FAILED = 'failed'
+
+
+def send_to_connections(connection_ids: list, message, endpoint_url: str = WEBSOCKET_ENDPOINT) -> dict:
+    """
+    Envía el mismo mensaje a varias conexiones en paralelo (hasta NOTIFY_WORKERS a la vez).
+
+    :param connection_ids: Conexiones destino.
+    :param message: Mensaje a enviar; se serializa a JSON si no es bytes.
+    :param endpoint_url: Endpoint de la API de administración del WebSocket.
+    :return: {connection_id: 'sent' | 'gone' | 'failed'}.
+    """
+    if not connection_ids:
+        return {}
+    payload = message if isinstance(message, bytes) else dumps(message).encode('utf-8')
+    client = get_client('apigatewaymanagementapi', endpoint_url=endpoint_url)
+
+    def post(connection_id: str) -> str:
+        try:
+            client.post_to_connection(ConnectionId=connection_id, Data=payload)
+            return SENT
+        except client.exceptions.GoneException:
+            return GONE
+        except (ClientError, BotoCoreError) as e:
+            # Incluye errores de red (EndpointConnectionError, ReadTimeoutError): la conexión queda como fallida
+            logger.warning(f"No se pudo enviar a la conexión {connection_id}: {e}")
+            return FAILED
+
+    with ThreadPoolExecutor(max_workers=min(NOTIFY_WORKERS, len(connection_ids))) as executor:
+        return dict(zip(connection_ids, executor.map(post, connection_ids)))
+
+
+def remove_connections(user_id: str, connection_ids: list, table_name: str = CONNECTIONS_TABLE):
+    """
+    Elimina por lotes las conexiones que ya no existen en API Gateway.
+    """
+    delete_connections(user_id, connection_ids, table_name)
+    if CONNECTIONS_SHADOW_TABLE and table_name == CONNECTIONS_TABLE:
+        delete_connections(user_id, connection_ids, CONNECTIONS_SHADOW_TABLE, CONNECTIONS_SHADOW_LAYOUT)
+
+
+def notify_user(user_id: str, message, table_name: str = CONNECTIONS_TABLE,
+                endpoint_url: str = WEBSOCKET_ENDPOINT) -> dict:
+    """
+    Envía un mensaje a todas las conexiones WebSocket abiertas del usuario.
+
+    Las conexiones que responden GoneException se eliminan de la tabla de conexiones.
+
+    Retorna:
+      dict: {"status": "success", "sent": n, "gone": n, "failed": n},
+            {"status": "skipped"} si las notificaciones no están configuradas, o
+            {"status": "error", "error": <detalle>} si falla la consulta o la limpieza
+            (errores de servicio o de red).
+    """
+    if not endpoint_url or not table_name:
+        return {"status": "skipped"}
+
+    try:
+        outcome = send_to_connections(get_user_connections(user_id, table_name), message, endpoint_url)
+        gone = [connection_id for connection_id, result in outcome.items() if result == GONE]
+        remove_connections(user_id, gone, table_name)
+    except (ClientError, BotoCoreError) as e:
+        logger.error(f"Error al notificar al usuario {user_id}: {e}")
+        return {"status": "error", "error": str(e)}
+    return _summarize(outcome, gone)
+
+
+def notify_operation(user_id: str, operation: str, message, endpoint_url: str = WEBSOCKET_ENDPOINT) -> dict:
+    """
+    Envía un mensaje solo a las conexiones suscritas a la operación.
+
+    Si el índice de suscripciones no está configurado, se envía a todas las conexiones del usuario.
+    Las conexiones que responden GoneException se eliminan del índice y de la tabla de conexiones.
+
+    Retorna:
+      dict: Igual que notify_user.
+    """
+    if not subscriptions.is_enabled():
+        return notify_user(user_id, message, endpoint_url=endpoint_url)
+    if not endpoint_url:
+        return {"status": "skipped"}
+
+    try:
+        outcome = send_to_connections(subscriptions.get_subscribers(user_id, operation), message, endpoint_url)
+        gone = [connection_id for connection_id, result in outcome.items() if result == GONE]
+        subscriptions.remove_subscriptions(user_id, operation, gone)
+        remove_connections(user_id, gone)
+    except (ClientError, BotoCoreError) as e:
+        logger.error(f"Error al notificar la operación {user_id}/{operation}: {e}")
+        return {"status": "error", "error": str(e)}
+    return _summarize(outcome, gone)
+
+
+def _summarize(outcome: dict, gone: list) -> dict:
+    results = list(outcome.values())
+    return {
+        "status": "success",
+        "sent": results.count(SENT),
+        "gone": len(gone),
+        "failed": results.count(FAILED)
+    }